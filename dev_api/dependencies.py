@@ -13,6 +13,7 @@ from email_exporter.shared.dependencies import Context
 from email_exporter.config import Config
 from email_exporter.parsers import ParserSelector
 from email_exporter.voice_provider import VoiceProvider
+from email_exporter.pronunciation_provider import PronunciationProvider
 
 from .services.storage import DevStorage, AudioCache
 from .services.email_loader import EmailLoader
@@ -80,7 +81,8 @@ def parser_service_resolver(context: Context) -> ParserService:
 
 def parser_selector_resolver(context: Context) -> ParserSelector:
     logger = context.dependencies.get(logging.Logger)
-    return ParserSelector(logger)
+    pronunciation_provider = context.dependencies.get(PronunciationProvider)
+    return ParserSelector(logger, pronunciation_provider)
 
 
 def dev_logger_resolver(context: Context) -> logging.Logger:
@@ -6,7 +6,8 @@ from dataclasses import dataclass
 import hashlib
 import logging
 
-from email_exporter.inbox import InboxItem, Inbox, InboxProcessor
+from email_exporter.inbox import InboxItem, Inbox, InboxProcessor, InboxStateStore
+from email_exporter.inbox.inbox_item import DEFAULT_HTML_PARSER
 from email_exporter.config import Config
 
 from .storage import DevStorage
@@ -65,7 +66,7 @@ class EmailLoader:
                 if not all([self._config.get("EMAIL_SERVER"), self._config.get("EMAIL_LOGIN"), self._config.get("EMAIL_PASSWORD")]):
                     self._logger.warning("Gmail config not available")
                     return None
-                self._inbox = Inbox(self._config, self._logger)
+                self._inbox = Inbox(self._config, self._logger, InboxStateStore.disabled())
             except Exception as e:
                 self._logger.warning(f"Failed to create inbox: {e}")
                 return None
@@ -180,9 +181,7 @@ class EmailLoader:
         return self._message_to_inbox_item(message)
 
     def _message_to_inbox_item(self, message: Message) -> InboxItem:
-        from bs4 import BeautifulSoup
         html_body = self._get_html_body(message)
-        soup = BeautifulSoup(html_body, "html.parser") if html_body else None
         sender = self._extract_sender_from_message(message)
         recipient = message.get("To", "")
         if "<" in recipient and ">" in recipient:
@@ -192,8 +191,9 @@ class EmailLoader:
             date=message.get("Date", ""),
             html=html_body,
             mime=str(message),
-            soup=soup,
-            addresses=(recipient, sender)
+            soup=None,
+            addresses=(recipient, sender),
+            html_parser=self._config.get("HTML_PARSER", DEFAULT_HTML_PARSER)
         )
 
     def _get_html_body(self, message: Message) -> str:
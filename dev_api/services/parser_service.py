@@ -1,14 +1,20 @@
+from collections import OrderedDict
 from typing import Optional
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 import logging
+import threading
 import traceback
 
 from email_exporter.inbox import InboxItem
-from email_exporter.parsers import ParserSelector
+from email_exporter.parsers import ParseCache, ParserSelector
 from email_exporter.parsers.emitter_parser import EmitterParser
+from email_exporter.parsers.parser_abc import DEFAULT_SPEECH_LIMIT
 from email_exporter.parsers.content_item import ContentItemABC
+from email_exporter.parsers.content_item.substack.tweet import Tweet
 from email_exporter.voice_provider import VoiceProvider
 
+RESULTS_CACHE_SIZE = 32
+
 
 @dataclass
 class ContentSection:
@@ -91,6 +97,9 @@ class ParserService:
         self._logger = logger
         self._parser_selector = parser_selector
         self._voice_provider = voice_provider
+        # Parse results by ParseCache key; the audio routes parse the same email on every request
+        self._results: OrderedDict[str, ParseResult] = OrderedDict()
+        self._results_lock = threading.Lock()
 
     def _get_content_item_html(self, content_item: ContentItemABC) -> str:
         """Extract HTML from a content item."""
@@ -127,7 +136,8 @@ class ParserService:
         except Exception as e:
             return f"Error: {e}", "error"
 
-    def _create_ssml_chunks(self, sections: list[ContentSection], speech_limit: int = 4500) -> list[SsmlChunk]:
+    def _create_ssml_chunks(
+            self, sections: list[ContentSection], speech_limit: int = DEFAULT_SPEECH_LIMIT) -> list[SsmlChunk]:
         """Create SSML chunks from content sections, matching production logic."""
         from ssml import SpeechBuilder
 
@@ -142,15 +152,17 @@ class ParserService:
                 speech.add_text(tag_str)
             return speech.speak().to_string()
 
+        # Raw text renders as itself, so a chunk is as long as its tags plus the <speak> wrapper, in UTF-8 bytes
+        frame_size = SpeechBuilder().speak().byte_length()
+        current_size = frame_size
+
         for section in sections:
             if section.is_removed:
                 continue
 
             for tag_str in section.ssml_tags:
-                test_tags = current_tags + [tag_str]
-                test_ssml = build_ssml(test_tags)
-
-                if len(test_ssml) > speech_limit and current_tags:
+                tag_size = len(tag_str.encode())
+                if current_size + tag_size > speech_limit and current_tags:
                     # Save current chunk
                     chunks.append(SsmlChunk(
                         index=len(chunks),
@@ -159,8 +171,10 @@ class ParserService:
                     ))
                     current_tags = [tag_str]
                     current_section_indices = [section.index]
+                    current_size = frame_size + tag_size
                 else:
                     current_tags.append(tag_str)
+                    current_size += tag_size
                     if section.index not in current_section_indices:
                         current_section_indices.append(section.index)
 
@@ -196,7 +210,16 @@ class ParserService:
         try:
             # Get parser
             parser = self._parser_selector.get_parser(inbox_item)
-            
+
+            key = ParseCache.key(parser, inbox_item)
+            with self._results_lock:
+                cached = self._results.get(key)
+                if cached is not None:
+                    self._results.move_to_end(key)
+            if cached is not None:
+                voice, voice_reason = self._get_voice_with_reason(inbox_item)
+                return replace(cached, voice=voice, voice_reason=voice_reason)
+
             # Get parser name - for EmitterParser, use the emitter's class name
             if isinstance(parser, EmitterParser):
                 emitter = parser._emitter
@@ -219,6 +242,13 @@ class ParserService:
                     ssml_tags = self._get_ssml_tag_strings(item)
                     desc_html, desc_type = self._get_description_html(item)
 
+                    debug_info = {
+                        "componentName": getattr(item._component, 'name', 'unknown'),
+                        "textPreview": item._get_text_content()[:100] if item._get_text_content() else ""
+                    }
+                    if isinstance(item, Tweet):
+                        debug_info["tweet"] = item.record.to_dict() if item.record else None
+
                     section = ContentSection(
                         index=i,
                         content_type=item._get_repr_name(),
@@ -226,10 +256,7 @@ class ParserService:
                         ssml_tags=ssml_tags,
                         description_html=desc_html,
                         description_content_type=desc_type,
-                        debug_info={
-                            "componentName": getattr(item._component, 'name', 'unknown'),
-                            "textPreview": item._get_text_content()[:100] if item._get_text_content() else ""
-                        }
+                        debug_info=debug_info
                     )
                     sections.append(section)
 
@@ -256,7 +283,7 @@ class ParserService:
                     for i, ssml in enumerate(parsed.ssml if hasattr(parsed, 'ssml') else [])
                 ]
 
-            return ParseResult(
+            result = ParseResult(
                 success=True,
                 email_info=email_info,
                 parser_name=parser_name,
@@ -265,6 +292,11 @@ class ParserService:
                 sections=sections,
                 ssml_chunks=ssml_chunks
             )
+            with self._results_lock:
+                self._results[key] = result
+                if len(self._results) > RESULTS_CACHE_SIZE:
+                    self._results.popitem(last=False)
+            return result
 
         except Exception as e:
             return ParseResult(
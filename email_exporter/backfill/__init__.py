@@ -0,0 +1,2 @@
+from .archive_inbox import ArchiveInbox, read_archive                           # noqa: F401
+from .backfill_parser import BackfillParser, BackfillReport, BackfillResult     # noqa: F401
@@ -0,0 +1,42 @@
+from email import message_from_bytes
+from email.message import Message
+from email_exporter.config import Config
+from email_exporter.inbox.inbox_abc import HeaderFilter, InboxABC
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+
+
+def read_archive(folder: str) -> Iterator[Tuple[str, bytes]]:
+    """The raw bytes of every .eml file under folder, in path order"""
+    for path in sorted(Path(folder).rglob("*.eml")):
+        yield str(path), path.read_bytes()
+
+
+class ArchiveInbox(InboxABC):
+    """Emails already on disk, as exported .eml files. Messages are never discarded from an archive"""
+
+    def __init__(self, config: Config, folder: Optional[str] = None):
+        self._email_address = config.get("EMAIL_LOGIN")
+        self._folder = folder
+
+    def get_messages(
+            self,
+            search_criteria: str = 'UNFLAGGED',
+            header_filter: Optional[HeaderFilter] = None) -> Iterator[Tuple[int, Message]]:
+        if self._folder is None:
+            return
+        # Read one file at a time, so an archive never has to fit in memory
+        for idx, (_, raw) in enumerate(read_archive(self._folder)):
+            message = message_from_bytes(raw)
+            if header_filter is None or idx in header_filter([(idx, message)]):
+                yield idx, message
+
+    def discard_message(self, idx: int) -> None:
+        pass
+
+    def commit(self) -> None:
+        pass
+
+    @property
+    def email_address(self) -> str:
+        return self._email_address
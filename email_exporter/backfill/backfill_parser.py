@@ -0,0 +1,154 @@
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from email import message_from_bytes
+from email_exporter.config import Config
+from email_exporter.inbox import InboxProcessor
+from email_exporter.parsers import ParseCache, ParsedItem, ParserSelector
+from email_exporter.shared import Dependencies
+from firebase_admin import firestore
+from logging import Logger
+from typing import Callable, Iterable, Iterator, NamedTuple, Optional, Tuple, TypeVar
+from .archive_inbox import ArchiveInbox
+import itertools
+import os
+import time
+import traceback
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class BackfillResult(NamedTuple):
+    position: int
+    source: str
+    size: int
+    parse_seconds: float
+    parsed_item: Optional[ParsedItem] = None
+    error: Optional[str] = None
+
+
+class BackfillReport:
+    def __init__(self, results: list[BackfillResult], elapsed: float, workers: int):
+        self.results = results
+        self.elapsed = elapsed
+        self.workers = workers
+
+    @property
+    def failed(self) -> list[BackfillResult]:
+        return [result for result in self.results if result.error is not None]
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(result.size for result in self.results)
+
+    @property
+    def emails_per_second(self) -> float:
+        return len(self.results) / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def megabytes_per_second(self) -> float:
+        return self.total_bytes / 1e6 / self.elapsed if self.elapsed else 0.0
+
+    def __str__(self) -> str:
+        # The time spent parsing, summed over the workers, against the wall clock time of the whole run
+        busy = sum(result.parse_seconds for result in self.results)
+        return "\n".join([
+            f"Parsed {len(self.results)} emails ({self.total_bytes / 1e6:.1f} MB) in {self.elapsed:.2f}s "
+            f"with {self.workers} workers; {len(self.failed)} failed",
+            f"{self.emails_per_second:.1f} emails/s, {self.megabytes_per_second:.2f} MB/s, "
+            f"{busy / self.elapsed if self.elapsed else 0.0:.1f} workers busy on average",
+            *(f"Failed: {result.source}: {result.error.strip().splitlines()[-1]}"   # type: ignore
+              for result in self.failed),
+        ])
+
+
+# Each worker process builds these once, in _init_worker
+_processor: Optional[InboxProcessor] = None
+_parser_selector: Optional[ParserSelector] = None
+_parse_cache: Optional[ParseCache] = None
+
+
+def _worker_dependencies(config: Config) -> Dependencies:
+    dependencies = Dependencies.default().add_cached_resolver(Config, lambda _: config)
+    if not config.get("PRONUNCIATIONS_COLLECTION"):
+        # Only the built in pronunciations apply, so the workers don't need Firestore credentials
+        dependencies.add_resolver(firestore.Client, lambda _: None)     # type: ignore
+    return dependencies
+
+
+def _init_worker(config: Config) -> None:
+    global _processor, _parser_selector, _parse_cache
+    dependencies = _worker_dependencies(config)
+    logger = dependencies.get(Logger)
+    # The processor only asks the inbox for its address
+    _processor = InboxProcessor(config, logger, ArchiveInbox(config))     # type: ignore
+    _parser_selector = dependencies.get(ParserSelector)
+    _parse_cache = ParseCache(config, logger)
+
+
+def _parse_email(job: Tuple[int, str, bytes]) -> BackfillResult:
+    position, source, raw = job
+    assert _processor is not None and _parser_selector is not None and _parse_cache is not None, \
+        "Worker not initialised"
+    start = time.perf_counter()
+    try:
+        inbox_item = _processor.process_email(message_from_bytes(raw))
+        # A ParsedItem only holds strings, so the soup and the content items stay in the worker
+        parsed_item = _parse_cache.parse(_parser_selector.get_parser(inbox_item), inbox_item)
+        return BackfillResult(position, source, len(raw), time.perf_counter() - start, parsed_item)
+    except Exception:
+        return BackfillResult(position, source, len(raw), time.perf_counter() - start, error=traceback.format_exc())
+
+
+def _parse_emails(jobs: list[Tuple[int, str, bytes]]) -> list[BackfillResult]:
+    return [_parse_email(job) for job in jobs]
+
+
+def _batches(items: Iterable[T], size: int) -> Iterator[list[T]]:
+    iterator = iter(items)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+def _ordered_map(executor: Executor, fn: Callable[[T], list[R]], batches: Iterable[T], window: int) -> Iterator[R]:
+    """fn over the batches on executor, in order, with at most window batches submitted and not yet collected:
+    Executor.map would read every batch up front"""
+    pending: deque[Future] = deque()
+    for batch in batches:
+        if len(pending) >= window:
+            yield from pending.popleft().result()
+        pending.append(executor.submit(fn, batch))
+    while pending:
+        yield from pending.popleft().result()
+
+
+class BackfillParser:
+    """Re-parses an archive of emails, for example after a parser change, on a pool of processes: parsing is CPU
+    bound, and threads would share one core. Only the raw bytes go to the workers and only the ParsedItems come back,
+    in the order of the input. An email that fails to parse is reported instead of stopping the run.
+    Emails are read as the workers need them, BACKFILL_IN_FLIGHT batches of BACKFILL_CHUNK_SIZE per worker at most."""
+
+    def __init__(self, config: Config, logger: Logger):
+        self._config = config
+        self._logger = logger
+        self._workers = max(1, config.get_int("BACKFILL_WORKERS", os.cpu_count() or 1))
+        self._chunk_size = max(1, config.get_int("BACKFILL_CHUNK_SIZE", 4))
+        self._in_flight = max(1, config.get_int("BACKFILL_IN_FLIGHT", 2))
+
+    def parse(self, messages: Iterable[Tuple[str, bytes]]) -> BackfillReport:
+        jobs = ((position, source, raw) for position, (source, raw) in enumerate(messages))
+        self._logger.info(f"Parsing the archive with {self._workers} workers")
+        start = time.perf_counter()
+
+        if self._workers == 1:
+            _init_worker(self._config)
+            results = list(map(_parse_email, jobs))
+        else:
+            with ProcessPoolExecutor(self._workers, initializer=_init_worker, initargs=(self._config,)) as executor:
+                # The results come in the order of the jobs, whichever worker finishes first
+                results = list(_ordered_map(
+                    executor, _parse_emails, _batches(jobs, self._chunk_size), self._workers * self._in_flight))
+
+        report = BackfillReport(results, time.perf_counter() - start, self._workers)
+        self._logger.info(str(report))
+        return report
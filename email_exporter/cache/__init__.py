@@ -0,0 +1,4 @@
+from .blob_cache import BlobCache                                                                   # noqa: F401
+from .cache_backend import (
+    BucketCacheBackend, CacheBackendABC, DiskCacheBackend, NullCacheBackend                         # noqa: F401
+)
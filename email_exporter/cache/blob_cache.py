@@ -0,0 +1,111 @@
+from __future__ import annotations
+from email_exporter.config import Config
+from logging import Logger
+from typing import TYPE_CHECKING, Callable, Optional, TypeVar
+from .cache_backend import BucketCacheBackend, CacheBackendABC, DiskCacheBackend, NullCacheBackend
+import os
+import tempfile
+import threading
+
+if TYPE_CHECKING:
+    from email_exporter.cloud.storage import StorageProvider
+
+DEFAULT_MAX_AGE_DAYS = 30
+
+T = TypeVar("T")
+
+
+class BlobCache:
+    """
+    A cache of named blobs in a backend, counting its hits and misses. Read and write failures are logged and
+    treated as misses, so a broken cache never fails the work it caches.
+
+    Configured with <NAME>_CACHE ("disk", or "bucket" when given a storage provider; disabled when not set),
+    <NAME>_CACHE_FOLDER, <NAME>_CACHE_BUCKET, <NAME>_CACHE_PREFIX, <NAME>_CACHE_MAX_SIZE_MB and
+    <NAME>_CACHE_MAX_AGE_DAYS.
+    """
+
+    def __init__(
+            self,
+            config: Config,
+            logger: Logger,
+            name: str,
+            label: str,
+            storage_provider: Optional[StorageProvider] = None) -> None:
+        self._logger = logger
+        self._label = label
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._backend = self._create_backend(config, name, storage_provider)
+
+    def _create_backend(
+            self, config: Config, name: str, storage_provider: Optional[StorageProvider]) -> CacheBackendABC:
+        key = f"{name.upper()}_CACHE"
+        backend = config.get(key, "")
+        max_size = config.get_int(f"{key}_MAX_SIZE_MB", 0) * 1024 * 1024
+        max_age = config.get_int(f"{key}_MAX_AGE_DAYS", DEFAULT_MAX_AGE_DAYS) * 24 * 60 * 60
+
+        if not backend:
+            return NullCacheBackend()
+        if backend == "disk":
+            folder = config.get(f"{key}_FOLDER", os.path.join(tempfile.gettempdir(), f"podfwd_{name}_cache"))
+            self._logger.info(f"Using disk {self._label}: {folder}")
+            return DiskCacheBackend(folder, max_size, max_age)
+        if backend == "bucket" and storage_provider is not None:
+            bucket_name = config.get(f"{key}_BUCKET")
+            self._logger.info(f"Using bucket {self._label}: {bucket_name}")
+            return BucketCacheBackend(
+                storage_provider.get_bucket(bucket_name),
+                config.get(f"{key}_PREFIX", f"{name}_cache/"),
+                max_size,
+                max_age)
+        raise ValueError(f"Unknown {self._label} backend: {backend}")
+
+    @property
+    def enabled(self) -> bool:
+        return not isinstance(self._backend, NullCacheBackend)
+
+    @property
+    def backend(self) -> CacheBackendABC:
+        return self._backend
+
+    def get(self, blob_name: str, decode: Callable[[bytes], T]) -> Optional[T]:
+        """The decoded blob, or None; a blob that fails to decode is a miss"""
+        if not self.enabled:
+            return None
+        try:
+            data = self._backend.get(blob_name)
+            value = None if data is None else decode(data)
+        except Exception:
+            self._logger.exception(f"Failed to read from {self._label}")
+            value = None
+        with self._lock:
+            if value is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+        return value
+
+    def put(self, blob_name: str, data: bytes) -> None:
+        if not self.enabled:
+            return
+        try:
+            self._backend.put(blob_name, data)
+        except Exception:
+            self._logger.exception(f"Failed to write to {self._label}")
+
+    def evict(self) -> int:
+        if not self.enabled:
+            return 0
+        evicted = self._backend.evict()
+        self._logger.info(f"Evicted {evicted} entries from {self._label}")
+        return evicted
+
+    @property
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+            }
@@ -0,0 +1,138 @@
+from __future__ import annotations
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Optional
+import os
+import tempfile
+import time
+
+if TYPE_CHECKING:
+    # Only for annotations: email_exporter.cloud uses this module, so importing it here would be circular
+    from email_exporter.cloud.storage import Storage
+
+
+class CacheBackendABC(ABC):
+    @abstractmethod
+    def get(self, blob_name: str) -> Optional[bytes]:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def put(self, blob_name: str, data: bytes) -> None:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def evict(self) -> int:
+        raise NotImplementedError()
+
+
+class NullCacheBackend(CacheBackendABC):
+    def get(self, blob_name: str) -> Optional[bytes]:
+        return None
+
+    def put(self, blob_name: str, data: bytes) -> None:
+        pass
+
+    def evict(self) -> int:
+        return 0
+
+
+def _select_evicted(entries: list[tuple[str, float, int]], max_size: int, max_age: int) -> list[str]:
+    """Given (name, timestamp, size) entries, returns the names to remove: everything older than max_age,
+    then the entries with the oldest timestamps until the total size is under max_size. 0 disables a limit."""
+    now = time.time()
+    evicted = []
+    kept = []
+    for name, timestamp, size in sorted(entries, key=lambda e: e[1]):
+        if max_age and now - timestamp > max_age:
+            evicted.append(name)
+        else:
+            kept.append((name, size))
+
+    total_size = sum(size for _, size in kept)
+    for name, size in kept:
+        if not max_size or total_size <= max_size:
+            break
+        evicted.append(name)
+        total_size -= size
+
+    return evicted
+
+
+class DiskCacheBackend(CacheBackendABC):
+    def __init__(self, folder: str, max_size: int = 0, max_age: int = 0):
+        self._folder = folder
+        self._max_size = max_size
+        self._max_age = max_age
+        os.makedirs(folder, exist_ok=True)
+
+    def _path(self, blob_name: str) -> str:
+        return os.path.join(self._folder, blob_name)
+
+    def get(self, blob_name: str) -> Optional[bytes]:
+        path = self._path(blob_name)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        if self._max_age and time.time() - os.path.getmtime(path) > self._max_age:
+            return None
+        # Touching the file makes size eviction least-recently-used rather than oldest-first
+        os.utime(path)
+        return data
+
+    def put(self, blob_name: str, data: bytes) -> None:
+        path = self._path(blob_name)
+        # Write then rename, so concurrent readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=self._folder, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def evict(self) -> int:
+        entries = []
+        for name in os.listdir(self._folder):
+            if name.endswith(".tmp"):
+                continue
+            stat = os.stat(self._path(name))
+            entries.append((name, stat.st_mtime, stat.st_size))
+
+        evicted = _select_evicted(entries, self._max_size, self._max_age)
+        for name in evicted:
+            try:
+                os.remove(self._path(name))
+            except FileNotFoundError:
+                pass
+        return len(evicted)
+
+
+class BucketCacheBackend(CacheBackendABC):
+    """Blobs under a prefix of a bucket. Reads don't update a blob, so ages are from its creation and size eviction
+    removes the oldest blobs first, rather than the least recently used."""
+
+    def __init__(self, bucket: Storage, prefix: str, max_size: int = 0, max_age: int = 0):
+        self._bucket = bucket
+        self._prefix = prefix
+        self._max_size = max_size
+        self._max_age = max_age
+
+    def get(self, blob_name: str) -> Optional[bytes]:
+        blob = self._bucket.get_blob(f"{self._prefix}{blob_name}")
+        if blob is None:
+            return None
+        if self._max_age and blob.time_created and time.time() - blob.time_created.timestamp() > self._max_age:
+            return None
+        return blob.download_as_bytes()
+
+    def put(self, blob_name: str, data: bytes) -> None:
+        self._bucket.upload_bytes(f"{self._prefix}{blob_name}", data)
+
+    def evict(self) -> int:
+        blobs = {blob.name: blob for blob in self._bucket.list_blobs(self._prefix)}
+        entries = [
+            (name, blob.time_created.timestamp() if blob.time_created else time.time(), blob.size or 0)
+            for name, blob in blobs.items()
+        ]
+        evicted = _select_evicted(entries, self._max_size, self._max_age)
+        for name in evicted:
+            self._bucket.delete_blob(name)
+        return len(evicted)
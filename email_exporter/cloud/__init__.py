@@ -1,2 +1,3 @@
 from .t2s import TextToSpeech           # noqa: F401
 from .storage import StorageProvider    # noqa: F401
+from .t2s_cache import T2SCache         # noqa: F401
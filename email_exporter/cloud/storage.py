@@ -30,6 +30,19 @@ class Storage:
             blob.upload_from_file(f)
         return blob.public_url
 
+    def download_bytes(self, blob_name: str) -> Optional[bytes]:
+        blob = self._bucket.get_blob(blob_name)
+        if blob is None:
+            return None
+        return blob.download_as_bytes()
+
+    def get_blob(self, blob_name: str):
+        """The blob with its metadata, or None"""
+        return self._bucket.get_blob(blob_name)
+
+    def list_blobs(self, prefix: str) -> list:
+        return list(self._bucket.list_blobs(prefix=prefix))
+
     def download_xml(self, blob_name: str) -> str:
         blob = self._bucket.blob(blob_name)
         return blob.download_as_string()  # .decode("utf-8")
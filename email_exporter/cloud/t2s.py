@@ -1,11 +1,15 @@
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from google.cloud import texttospeech
 from functools import reduce
 from email_exporter.config import Config
+from .t2s_cache import T2SCache
 from logging import Logger
-from typing import Union, List
+from typing import Iterable, Iterator, Sized, Union
+from ssml import parse, to_prose
 from google import genai
 from google.genai import types
+import threading
 import wave
 import io
 
@@ -19,10 +23,23 @@ class T2SOutput(ABC):
     def audio_content(self) -> bytes:
         raise NotImplementedError
 
+    @property
+    @abstractmethod
+    def raw_content(self) -> bytes:
+        raise NotImplementedError
+
     @abstractmethod
     def __add__(self, other: 'T2SOutput') -> 'T2SOutput':
         raise NotImplementedError
 
+    @staticmethod
+    def from_raw(extension: str, raw_content: bytes) -> 'T2SOutput':
+        if extension == "mp3":
+            return Mp3T2SOutput(raw_content)
+        if extension == "wav":
+            return WaveT2SOutput(raw_content)
+        raise ValueError(f"Unknown T2S output extension: {extension}")
+
 
 class Mp3T2SOutput(T2SOutput):
     def __init__(self, audio_content: bytes):
@@ -33,6 +50,10 @@ class Mp3T2SOutput(T2SOutput):
     def audio_content(self) -> bytes:
         return self._audio_content
 
+    @property
+    def raw_content(self) -> bytes:
+        return self._audio_content
+
     def __add__(self, other: 'T2SOutput') -> 'T2SOutput':
         if not isinstance(other, Mp3T2SOutput):
             raise TypeError("Can only add Mp3T2SOutput instances")
@@ -54,6 +75,10 @@ class WaveT2SOutput(T2SOutput):
             wf.writeframes(self._raw_audio)
         return buffer.getvalue()
 
+    @property
+    def raw_content(self) -> bytes:
+        return self._raw_audio
+
     def __add__(self, other: 'T2SOutput') -> 'T2SOutput':
         if not isinstance(other, WaveT2SOutput):
             raise TypeError("Can only add WaveT2SOutput instances")
@@ -112,7 +137,27 @@ class TextToSpeech:
         "Sulafat",          # Female *
     ]
 
-    def __init__(self, config: Config, logger: Logger) -> None:
+    # Maximum number of chunks of a single lines_to_speech call synthesised at the same time
+    default_concurrency = 4
+    # Maximum number of requests in flight to each provider, shared by every caller
+    default_provider_concurrency = {
+        "CLASSIC": 8,
+        "GEMINI": 2,
+    }
+
+    # The largest request, in UTF-8 bytes of SSML, sent to each provider. Cloud TTS rejects anything over 5000 bytes
+    default_speech_limit = {
+        "CLASSIC": 5000,
+        "GEMINI": 5000,
+    }
+
+    # Providers that read plain text rather than SSML: the chunks are sent to them as prose, packed into requests of
+    # up to this many UTF-8 bytes. Gemini's bound is the audio it returns (about 10 minutes), not its input window
+    default_prose_limit = {
+        "GEMINI": 6000,
+    }
+
+    def __init__(self, config: Config, logger: Logger, cache: T2SCache) -> None:
         json = config.get("SA_FILE")
         if json:
             self._t2s_client = texttospeech.TextToSpeechClient.from_service_account_json(json, *[])
@@ -120,18 +165,57 @@ class TextToSpeech:
             self._t2s_client = texttospeech.TextToSpeechClient()
         self._gemini_client = genai.Client(api_key=config.get("GEMINI_API_KEY"))
         self._logger = logger
+        self._cache = cache
+        self._concurrency = max(1, config.get_int("T2S_CONCURRENCY", self.default_concurrency))
+        self._provider_limits = {
+            provider: threading.BoundedSemaphore(max(1, config.get_int(f"T2S_CONCURRENCY_{provider}", default)))
+            for provider, default in self.default_provider_concurrency.items()
+        }
+        self._speech_limits = {
+            provider: config.get_int(f"T2S_SPEECH_LIMIT_{provider}", default)
+            for provider, default in self.default_speech_limit.items()
+        }
+        # 0 sends the provider SSML chunks as they are
+        self._prose_limits = {
+            provider: config.get_int(f"T2S_PROSE_LIMIT_{provider}", default)
+            for provider, default in self.default_prose_limit.items()
+        }
+
+    def _provider(self, voice: str) -> str:
+        if voice in self.classic_voices:
+            return "CLASSIC"
+        if voice in self.gemini_voices:
+            return "GEMINI"
+        raise ValueError(
+            f"Voice {voice} is not supported by TTS. Supported voices: {self.classic_voices + self.gemini_voices}")
+
+    def speech_limit(self, voice: Union[str, None] = None) -> int:
+        """How many bytes of SSML a single request for voice may hold"""
+        return self._speech_limits[self._provider(voice or "en-US-Wavenet-A")]
 
     def t2s(self, text: str, voice: Union[str, None] = None) -> T2SOutput:
+        return self._t2s(text, voice)[0]
+
+    def _t2s(self, text: str, voice: Union[str, None] = None) -> tuple[T2SOutput, bool]:
+        """The speech, and whether it came from the cache"""
         if voice is None:
             voice = "en-US-Wavenet-A"
 
-        if voice in self.classic_voices:
-            return self._classical_t2s(text, voice)
-        elif voice in self.gemini_voices:
-            return self._gemini_t2s(text, voice)
+        provider = self._provider(voice)
+        if provider == "CLASSIC":
+            extension, synthesise = "mp3", self._classical_t2s
         else:
-            raise ValueError(
-                f"Voice {voice} is not supported by TTS. Supported voices: {self.classic_voices + self.gemini_voices}")
+            extension, synthesise = "wav", self._gemini_t2s
+
+        if (cached := self._cache.get(text, voice, extension)) is not None:
+            self._logger.info(f"Using cached speech for {len(text)} characters of text, voice: {voice}")
+            return T2SOutput.from_raw(extension, cached), True
+
+        with self._provider_limits[provider]:
+            output = synthesise(text, voice)
+
+        self._cache.put(text, voice, output.extension, output.raw_content)
+        return output, False
 
     def _classical_t2s(self, text: str, voice: str) -> T2SOutput:
         assert voice in self.classic_voices, f"Voice {voice} is not supported by TTS"
@@ -180,8 +264,57 @@ class TextToSpeech:
         with open(path, encoding="utf-8") as f:
             return self.t2s(f.read())
 
-    def lines_to_speech(self, lines: List[str], voice: Union[str, None] = None) -> T2SOutput:
-        self._logger.info(f"Converting {len(lines)} blocks of text to speech")
-        # TODO: Gemini has different limits, so it may be possible to merge lines in text before syntesising
-        snippets = [self.t2s(line, voice) for line in lines]
-        return reduce(lambda a, b: a + b, snippets)
+    def _to_prose(self, line: str) -> list[str]:
+        try:
+            return to_prose(parse(line)).split("\n\n")
+        except ValueError:
+            # Text that reads as markup, such as "a<b", can't be parsed; it is sent as it is, as it was before
+            self._logger.warning(f"Sending {len(line)} characters of SSML that could not be read as prose")
+            return [line]
+
+    def _pack_prose(self, lines: Iterable[str], limit: int) -> Iterator[str]:
+        """The SSML lines as prose, their paragraphs packed into texts of up to limit bytes. A paragraph over the
+        limit is sent on its own. Lazy, so packing keeps up with the lines as they are produced"""
+        packed: list[str] = []
+        size = 0
+        for line in lines:
+            for paragraph in self._to_prose(line):
+                if not paragraph:
+                    continue
+                paragraph_size = len(paragraph.encode())
+                # Paragraphs are joined by a blank line
+                if packed and size + 2 + paragraph_size > limit:
+                    yield "\n\n".join(packed)
+                    packed, size = [], 0
+                size += paragraph_size + (2 if packed else 0)
+                packed.append(paragraph)
+        if packed:
+            yield "\n\n".join(packed)
+
+    def lines_to_speech(self, lines: Iterable[str], voice: Union[str, None] = None) -> T2SOutput:
+        """Lines may be a generator: each one is submitted as soon as it is produced, so synthesis of the first
+        chunks overlaps with producing the rest. Providers reading prose get the lines packed into fewer requests"""
+        if prose_limit := self._prose_limits.get(self._provider(voice or "en-US-Wavenet-A"), 0):
+            packed = self._pack_prose(lines, prose_limit)
+            lines = list(packed) if isinstance(lines, Sized) else packed
+        workers = min(self._concurrency, len(lines)) if isinstance(lines, Sized) else self._concurrency
+        self._logger.info(f"Converting text to speech, using {workers} workers")
+        if workers <= 1:
+            results = [self._t2s(line, voice) for line in lines]
+        else:
+            executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="t2s")
+            try:
+                # map submits the lines as they are read and keeps their order, regardless of which finishes first
+                results = list(executor.map(lambda line: self._t2s(line, voice), lines))
+            finally:
+                # If a chunk failed, don't pay for the ones that haven't started yet
+                executor.shutdown(cancel_futures=True)
+        self._logger.info(f"Converted {len(results)} blocks of text to speech")
+        if self._cache.enabled:
+            # Counted here rather than read from the cache's totals, which other calls add to at the same time
+            hits = sum(cached for _, cached in results)
+            self._logger.info(f"T2S cache: {hits} hits, {len(results) - hits} misses")
+        return reduce(lambda a, b: a + b, (snippet for snippet, _ in results))
+
+    def evict_cache(self) -> None:
+        self._cache.evict()
@@ -0,0 +1,44 @@
+from email_exporter.cache import BlobCache
+from email_exporter.config import Config
+from logging import Logger
+from typing import Optional
+from .storage import StorageProvider
+import hashlib
+
+
+class T2SCache:
+    """
+    Content addressed cache of synthesised chunks, keyed by the voice and the exact text sent to the provider.
+
+    Configured with T2S_CACHE ("disk" or "bucket"; disabled when not set), T2S_CACHE_FOLDER,
+    T2S_CACHE_BUCKET, T2S_CACHE_MAX_SIZE_MB and T2S_CACHE_MAX_AGE_DAYS.
+    """
+
+    def __init__(self, config: Config, logger: Logger, storage_provider: StorageProvider) -> None:
+        self._cache = BlobCache(config, logger, "t2s", "T2S cache", storage_provider)
+
+    @property
+    def enabled(self) -> bool:
+        return self._cache.enabled
+
+    @staticmethod
+    def _blob_name(text: str, voice: str, extension: str) -> str:
+        key = hashlib.sha256(f"{voice}:{text}".encode()).hexdigest()
+        return f"{key}.{extension}"
+
+    def get(self, text: str, voice: str, extension: str) -> Optional[bytes]:
+        return self._cache.get(self._blob_name(text, voice, extension), lambda data: data)
+
+    def put(self, text: str, voice: str, extension: str, data: bytes) -> None:
+        self._cache.put(self._blob_name(text, voice, extension), data)
+
+    def evict(self) -> int:
+        return self._cache.evict()
+
+    @property
+    def stats(self) -> dict[str, int]:
+        return self._cache.stats
+
+    def __repr__(self):
+        stats = self.stats
+        return f"T2SCache({type(self._cache.backend).__name__}, hits={stats['hits']}, misses={stats['misses']})"
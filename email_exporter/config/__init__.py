@@ -49,3 +49,6 @@ class Config:
         if type(value) is bool:
             return value
         return value == "true"
+
+    def get_int(self, key, default=0):
+        return int(self._data.get(key, default))
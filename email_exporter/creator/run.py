@@ -13,7 +13,8 @@ def export_inbox():
     email_exporter = deps.get(EmailExporter)
     inbox = deps.get(InboxProcessor)
 
-    inbox.process_inbox(email_exporter.message_handler)
+    inbox.process_inbox(
+        email_exporter.message_handler, email_exporter.routable_owners, email_exporter.pipeline_stages())
 
     email_exporter.apply_feeds()
 
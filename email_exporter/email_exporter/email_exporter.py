@@ -1,10 +1,21 @@
 from email_exporter.config import Config
-from email_exporter.feed_management import FeedProvider
+from email_exporter.feed_management import Feed, FeedProvider
 from email_exporter.cloud import TextToSpeech
-from email_exporter.inbox import InboxItem
-from email_exporter.parsers import ParserSelector
+from email_exporter.cloud.t2s import T2SOutput
+from email_exporter.inbox import InboxItem, PipelineStages
+from email_exporter.parsers import ParseCache, ParsedItem, ParserSelector
 from email_exporter.voice_provider import VoiceProvider
 from logging import Logger
+from typing import Iterable, Optional, Set, Union
+
+
+class PreparedMessage:
+    def __init__(self, inbox_item: InboxItem, feed: Feed, parsed_item: ParsedItem, voice: str):
+        self.inbox_item = inbox_item
+        self.feed = feed
+        self.parsed_item = parsed_item
+        self.voice = voice
+        self.t2s_output: Optional[T2SOutput] = None
 
 
 class EmailExporter:
@@ -15,15 +26,22 @@ class EmailExporter:
             t2s: TextToSpeech,
             parser_selector: ParserSelector,
             logger: Logger,
-            voice_provider: VoiceProvider) -> None:
+            voice_provider: VoiceProvider,
+            parse_cache: ParseCache) -> None:
         self._config = config
         self._feed_provider = feed_provider
         self._t2s = t2s
         self._parser_selector = parser_selector
         self._logger = logger
         self._voice_provider = voice_provider
+        self._parse_cache = parse_cache
 
-    def message_handler(self, inbox_item: InboxItem):
+    def routable_owners(self, owners: Iterable[str]) -> Set[str]:
+        return self._feed_provider.existing_feeds(owners)
+
+    def prepare_message(self, inbox_item: InboxItem, stream: bool = False) -> Union[bool, PreparedMessage]:
+        """Everything before text to speech. Returns whether to discard the message when there is nothing to publish.
+        When streaming, the parse is left to run while the message is synthesised"""
         self._logger.info(f"Handling message: {inbox_item}")
         feed = self._feed_provider.get_feed(inbox_item.owner)
 
@@ -41,14 +59,31 @@ class EmailExporter:
         self._logger.info(f"Feed found: {feed.key}")
 
         parser = self._parser_selector.get_parser(inbox_item)
-        parsed_item = parser.parse(inbox_item)
         voice = self._voice_provider.get_voice(inbox_item)
+        # Chunks are packed up to the limit of the provider that synthesises them
+        parser.speech_limit = self._t2s.speech_limit(voice)
+        if stream:
+            parsed_item = self._parse_cache.parse_stream(parser, inbox_item)
+        else:
+            parsed_item = self._parse_cache.parse(parser, inbox_item)
+            inbox_item.release()
 
-        t2s_output = self._t2s.lines_to_speech(parsed_item.ssml, voice)
+        return PreparedMessage(inbox_item, feed, parsed_item, voice)
 
-        feed.add_item_bytes(
+    def synthesise_message(self, prepared: PreparedMessage) -> PreparedMessage:
+        prepared.t2s_output = self._t2s.lines_to_speech(prepared.parsed_item.ssml, prepared.voice)
+        return prepared
+
+    def publish_message(self, prepared: PreparedMessage) -> bool:
+        t2s_output = prepared.t2s_output
+        assert t2s_output is not None, "Message not synthesised"
+        inbox_item = prepared.inbox_item
+        description = prepared.parsed_item.combined_description
+        # A streamed parse needs the soup until the description is built
+        inbox_item.release()
+        prepared.feed.add_item_bytes(
             title=inbox_item.title,
-            description=parsed_item.combined_description,
+            description=description,
             date=inbox_item.date,
             sender=inbox_item.sender,
             data=t2s_output.audio_content,
@@ -57,5 +92,20 @@ class EmailExporter:
 
         return True
 
+    def message_handler(self, inbox_item: InboxItem):
+        prepared = self.prepare_message(inbox_item, stream=True)
+        if isinstance(prepared, bool):
+            return prepared
+        return self.publish_message(self.synthesise_message(prepared))
+
+    def pipeline_stages(self) -> PipelineStages:
+        return PipelineStages(
+            self.prepare_message,
+            self.synthesise_message,
+            self.publish_message,
+            lambda prepared: prepared.feed.key)
+
     def apply_feeds(self):
         self._feed_provider.apply_feeds()
+        self._t2s.evict_cache()
+        self._parse_cache.evict()
@@ -3,7 +3,8 @@ from email_exporter.cloud import StorageProvider
 from google.cloud.firestore import Client as FirestoreClient
 from logging import Logger
 from .feed import Feed
-from typing import Dict
+from typing import Dict, Iterable, Set
+import threading
 
 
 class FeedProvider:
@@ -20,8 +21,14 @@ class FeedProvider:
         self._logger = logger
         self._feed_cache: Dict[str, Feed] = {}
         self._items_collection = "items"
+        # Held while fetching, so concurrent lookups of a feed share the same cached Feed
+        self._feed_lock = threading.Lock()
 
     def get_feed(self, key: str) -> Feed:
+        with self._feed_lock:
+            return self._get_cached_feed(key)
+
+    def _get_cached_feed(self, key: str) -> Feed:
         self._logger.info(f"Getting feed for key: {key}")
         if key in self._feed_cache:
             self._logger.info(f"Key {key} found in feed cache. Using cached feed")
@@ -34,6 +41,19 @@ class FeedProvider:
                     self._feed_cache[c_key] = feed
             return feed
 
+    def existing_feeds(self, keys: Iterable[str]) -> Set[str]:
+        """Returns the keys that have a feed or an alias, reading the uncached ones in a single request"""
+        keys = set(keys)
+        existing = {key for key in keys if key in self._feed_cache}
+        refs = [
+            self.db.collection(self.collection).document(key)
+            for key in keys - existing
+            if key and "/" not in key
+        ]
+        if refs:
+            existing.update(snapshot.id for snapshot in self.db.get_all(refs) if snapshot.exists)
+        return existing
+
     def _get_feed_doc(self, key: str):
         ref = self.db.collection(self.collection).document(key)
         snapshot = ref.get()
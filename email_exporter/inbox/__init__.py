@@ -1,3 +1,5 @@
 from .gmail_inbox import GmailInbox as Inbox        # noqa: F401
 from .inbox_processor import InboxProcessor     # noqa: F401
 from .inbox_item import InboxItem               # noqa: F401
+from .inbox_state import InboxStateStore        # noqa: F401
+from .inbox_pipeline import PipelineStages      # noqa: F401
@@ -0,0 +1,115 @@
+from email.message import Message
+from typing import Optional, Union
+import email
+import re
+
+Atom = Union[str, None, list]
+
+_token_re = re.compile(rb'\s*(?:(?P<open>\()|(?P<close>\))|"(?P<quoted>(?:[^"\\]|\\.)*)"|(?P<atom>[^\s()"]+))')
+
+
+class BodyPart:
+    """A leaf of a BODYSTRUCTURE, with the section number to fetch it by"""
+
+    def __init__(self, section: str, content_type: str, params: dict[str, str], encoding: str,
+                 disposition: Optional[str]):
+        self.section = section
+        self.content_type = content_type
+        self.params = params
+        self.encoding = encoding
+        self.disposition = disposition
+
+    def __repr__(self):
+        return f"BodyPart({self.section}, {self.content_type}, {self.encoding})"
+
+
+def parse_list(data: bytes, start: int = 0) -> tuple[Atom, int]:
+    """Parses one parenthesised IMAP list (or atom) starting at start. NIL is returned as None, everything else as
+    strings. Returns the value and the position after it."""
+    stack: list[list] = []
+    position = start
+    while (match := _token_re.match(data, position)):
+        position = match.end()
+        value: Atom
+        if match.group("open"):
+            stack.append([])
+            continue
+        elif match.group("close"):
+            value = stack.pop()
+        elif match.group("quoted") is not None:
+            value = re.sub(rb"\\(.)", rb"\1", match.group("quoted")).decode(errors="replace")
+        else:
+            atom = match.group("atom").decode(errors="replace")
+            value = None if atom.upper() == "NIL" else atom
+
+        if not stack:
+            return value, position
+        stack[-1].append(value)
+    raise ValueError(f"Unterminated list in {data[start:start + 80]!r}")
+
+
+def find_body_structure(text: bytes) -> Optional[Atom]:
+    position = text.upper().find(b"BODYSTRUCTURE ")
+    if position < 0:
+        return None
+    value, _ = parse_list(text, position + len(b"BODYSTRUCTURE "))
+    return value
+
+
+def _params(value: Atom) -> dict[str, str]:
+    if not isinstance(value, list):
+        return {}
+    return {str(key).lower(): str(param) for key, param in zip(value[::2], value[1::2])}
+
+
+def _walk(structure: list, section: str) -> list[BodyPart]:
+    if structure and isinstance(structure[0], list):
+        # The children are the lists before the subtype; the extension data after it can also hold lists
+        subtype_index = next((i for i, child in enumerate(structure) if not isinstance(child, list)), len(structure))
+        children = structure[:subtype_index]
+        prefix = f"{section}." if section else ""
+        return [part for i, child in enumerate(children, start=1) for part in _walk(child, f"{prefix}{i}")]
+
+    main_type, sub_type = (str(structure[0]).lower(), str(structure[1]).lower())
+    # Text parts carry a line count after the size, so their disposition is one field further
+    disposition_index = 9 if main_type == "text" else 8
+    disposition = structure[disposition_index] if len(structure) > disposition_index else None
+    return [BodyPart(
+        section or "1",
+        f"{main_type}/{sub_type}",
+        _params(structure[2]),
+        str(structure[5] or "7bit").lower(),
+        str(disposition[0]).lower() if isinstance(disposition, list) and disposition else None)]
+
+
+def body_parts(structure: list) -> list[BodyPart]:
+    return _walk(structure, "")
+
+
+def text_parts(structure: list) -> list[BodyPart]:
+    """The inline text/html and text/plain parts of a message. Attached messages (message/rfc822) are not entered."""
+    return [
+        part for part in body_parts(structure)
+        if part.content_type in ("text/html", "text/plain") and part.disposition != "attachment"
+    ]
+
+
+def rebuild_message(header: bytes, parts: list[tuple[BodyPart, bytes]]) -> Message:
+    """Builds a message from its header and the raw (still transfer encoded) bodies of some of its parts"""
+    message = email.message_from_bytes(header)
+    for name in ("Content-Type", "Content-Transfer-Encoding"):
+        del message[name]
+
+    payloads: list[Union[Message, str]] = []
+    for part, raw in parts:
+        payload = Message()
+        payload["Content-Type"] = part.content_type
+        for key, value in part.params.items():
+            payload.set_param(key, value)
+        payload["Content-Transfer-Encoding"] = part.encoding
+        payload.set_payload(raw.decode("ascii", "surrogateescape"))
+        payloads.append(payload)
+
+    message["Content-Type"] = "multipart/mixed"
+    message.set_payload(payloads)
+    return message
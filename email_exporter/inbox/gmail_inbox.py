@@ -1,22 +1,39 @@
+from collections import defaultdict
 from email.message import Message
 from email_exporter.config import Config
-from typing import Iterator, Tuple, Union
+from typing import Iterator, Optional, Sequence, Tuple, Union
 from logging import Logger
 import imaplib
 import email
 import re
-from .inbox_abc import InboxABC
+from .inbox_abc import HeaderFilter, InboxABC
+from .imap_fetch import FetchedMessage, batched, parse_fetch_response
+from .body_structure import BodyPart, find_body_structure, rebuild_message, text_parts
+from .inbox_state import InboxCheckpoint, InboxStateStore
+
+DEFAULT_SEARCH_CRITERIA = 'UNFLAGGED'
+HEADER_FIELDS = "From To Subject Date Message-ID"
+# rfc822 downloads whole messages, text_parts only their text/html and text/plain sections
+FETCH_MODES = ("rfc822", "text_parts")
 
 
 class GmailInbox(InboxABC):
-    def __init__(self, config: Config, logger: Logger) -> None:
+    def __init__(self, config: Config, logger: Logger, state_store: InboxStateStore) -> None:
         self._server = config.get("EMAIL_SERVER")
         self._email_address = config.get("EMAIL_LOGIN")
         self._password = config.get("EMAIL_PASSWORD")
         self._disable_discard = config.get_bool("DISABLE_DISCARDING")
+        self._fetch_batch_size = max(1, config.get_int("IMAP_FETCH_BATCH_SIZE", 20))
+        self._fetch_mode = config.get("IMAP_FETCH_MODE", "rfc822")
+        if self._fetch_mode not in FETCH_MODES:
+            raise ValueError(f"Unknown IMAP_FETCH_MODE {self._fetch_mode}; Expected one of {FETCH_MODES}")
         self._logger = logger
+        self._state_store = state_store
 
         self._mail: Union[imaplib.IMAP4_SSL, None] = None
+        self._discarded: set[str] = set()
+        # The checkpoint of the current run, saved by commit once its messages are discarded
+        self._checkpoint: Optional[InboxCheckpoint] = None
 
     def _login(self):
         server = imaplib.IMAP4_SSL(self._server)
@@ -32,6 +49,7 @@ class GmailInbox(InboxABC):
             return
 
         _ = self._ensure_success(self._mail.uid('STORE', idx, '+FLAGS', '(\\FLAGGED)'))
+        self._discarded.add(idx)
 
     def _ensure_success(self, action_result, success="OK"):
         status, result = action_result
@@ -60,18 +78,211 @@ class GmailInbox(InboxABC):
 
         return all_folder[0][1]
 
-    def get_messages(self, search_criteria: str = 'UNFLAGGED') -> Iterator[Tuple[int, Message]]:
-        if self._mail is None:
-            self._mail = self._login()
+    def _select_all_mail_folder(self, checkpoint: Optional[InboxCheckpoint]) -> str:
+        if checkpoint is not None:
+            status, _ = self._mail.select(checkpoint.all_mail_folder)     # type: ignore
+            if status == "OK":
+                return checkpoint.all_mail_folder
+            self._logger.warning(f"Could not select {checkpoint.all_mail_folder}; Looking up the All Mail folder")
 
         all_folder = self._get_all_mail_folder()
+        self._ensure_success(self._mail.select(all_folder))   # type: ignore
+        return all_folder
 
-        self._ensure_success(self._mail.select(all_folder))
+    def _response_code(self, code: str) -> Optional[str]:
+        _, data = self._mail.response(code)     # type: ignore
+        if not data or data[-1] is None:
+            return None
+        return data[-1].decode()
 
+    def _search(self, search_criteria: str) -> list[str]:
         ids = self._ensure_success(self._mail.uid('search', None, search_criteria))  # type: ignore
-        ids = ids[0].decode().split()
-        for idx in ids:
-            messageRaw = self._ensure_success(self._mail.uid('fetch', idx, '(RFC822)'))
-            message = email.message_from_bytes(messageRaw[0][1])
+        # Searches with MODSEQ append the highest mod-sequence of the results, e.g. "1 2 (MODSEQ 917162500)"
+        return re.sub(r"\(.*\)", "", ids[0].decode()).split()
+
+    def _search_since(
+            self,
+            search_criteria: str,
+            checkpoint: InboxCheckpoint,
+            uid_next: Optional[int],
+            highest_modseq: Optional[int]) -> list[str]:
+        unchanged = (checkpoint.highest_modseq, checkpoint.uid_next) == (highest_modseq, uid_next)
+        if highest_modseq is not None and unchanged:
+            self._logger.info("Mailbox unchanged since the last run; Skipping search")
+            return list(checkpoint.pending)
+
+        uid_set = ','.join([*checkpoint.pending, f"{checkpoint.last_uid + 1}:*"])
+        if highest_modseq is not None and checkpoint.highest_modseq is not None:
+            # Also picks up older messages whose flags changed since the last run, e.g. unflagged by hand
+            return self._search(f"{search_criteria} OR UID {uid_set} MODSEQ {checkpoint.highest_modseq + 1}")
+        return self._search(f"UID {uid_set} {search_criteria}")
+
+    def get_messages(
+            self,
+            search_criteria: str = DEFAULT_SEARCH_CRITERIA,
+            header_filter: Optional[HeaderFilter] = None) -> Iterator[Tuple[int, Message]]:
+        if self._mail is None:
+            self._mail = self._login()
+
+        checkpointing = search_criteria == DEFAULT_SEARCH_CRITERIA and self._state_store.enabled
+        checkpoint = self._state_store.load(self.email_address) if checkpointing else None
+
+        all_folder = self._select_all_mail_folder(checkpoint)
+        uid_validity = self._response_code("UIDVALIDITY")
+        uid_next = int(code) if (code := self._response_code("UIDNEXT")) else None
+        highest_modseq = int(code) if (code := self._response_code("HIGHESTMODSEQ")) else None
+
+        if checkpoint is not None and checkpoint.uid_validity != uid_validity:
+            self._logger.info(
+                f"UIDVALIDITY changed from {checkpoint.uid_validity} to {uid_validity}; Scanning the whole folder")
+            checkpoint = None
+
+        if checkpoint is None:
+            ids = self._search(search_criteria)
+        else:
+            self._logger.info(f"Searching since {checkpoint}")
+            ids = self._search_since(search_criteria, checkpoint, uid_next, highest_modseq)
+        self._logger.info(f"Found {len(ids)} emails")
+
+        self._discarded = set()
+        self._checkpoint = None
+        if checkpointing and uid_validity is not None:
+            self._checkpoint = InboxCheckpoint(
+                all_folder,
+                uid_validity,
+                max([checkpoint.last_uid if checkpoint else 0, (uid_next or 1) - 1, *map(int, ids)]),
+                ids,
+                uid_next,
+                highest_modseq)
+        yield from self._fetch_messages(ids, header_filter)    # type: ignore
+
+    def commit(self) -> None:
+        """Saves the checkpoint of the last get_messages, once its messages are discarded.
+        Messages that were not discarded, reached or not, stay pending."""
+        checkpoint, self._checkpoint = self._checkpoint, None
+        if checkpoint is None:
+            return
+
+        checkpoint.pending = [idx for idx in checkpoint.pending if idx not in self._discarded]
+        try:
+            checkpoint.highest_modseq = self._modseq_after_discards(checkpoint.highest_modseq)
+        except Exception:
+            self._logger.exception("While reading the mod-sequence after discarding, an exception occured")
+        self._save_checkpoint(checkpoint)
+
+    def _modseq_after_discards(self, highest_modseq: Optional[int]) -> Optional[int]:
+        """Discarding raises the mod-sequence of the folder. When nothing else changed since the SELECT, the
+        checkpoint records the raised one, so the next run can still skip its search."""
+        if highest_modseq is None or not self._discarded:
+            return highest_modseq
+
+        ids = self._ensure_success(self._mail.uid('search', None, f"MODSEQ {highest_modseq + 1}"))  # type: ignore
+        response = ids[0].decode()
+        changed = set(re.sub(r"\(.*\)", "", response).split())
+        modseq = re.search(r"\(MODSEQ (\d+)\)", response)
+        if modseq is None or not changed <= self._discarded:
+            return highest_modseq
+        return int(modseq.group(1))
+
+    def _save_checkpoint(self, checkpoint: InboxCheckpoint):
+        try:
+            self._state_store.save(self.email_address, checkpoint)
+            self._logger.info(f"Saved {checkpoint}")
+        except Exception:
+            self._logger.exception("While saving the inbox checkpoint, an exception occured")
+
+    def _select_by_headers(
+            self,
+            batch: Sequence[str],
+            headers: dict[str, bytes],
+            header_filter: Optional[HeaderFilter]) -> Sequence[str]:
+        if header_filter is None:
+            return batch
+        selected = header_filter([
+            (idx, email.message_from_bytes(headers[idx])) for idx in batch if idx in headers     # type: ignore
+        ])
+        return [idx for idx in batch if idx in selected]
+
+    def _fetch_rfc822(
+            self,
+            batch: Sequence[str],
+            header_filter: Optional[HeaderFilter]) -> Tuple[Sequence[str], dict[str, Union[bytes, Message]]]:
+        if header_filter is not None:
+            fetched = self._fetch(batch, f'(BODY.PEEK[HEADER.FIELDS ({HEADER_FIELDS})])')
+            headers = {
+                idx: header
+                for idx, message in fetched.items()
+                for name, header in message.items.items()
+                if name.startswith("BODY[HEADER")
+            }
+            batch = self._select_by_headers(batch, headers, header_filter)
+        if not batch:
+            return batch, {}
+
+        fetched = self._fetch(batch, '(RFC822)')
+        # Parsed when yielded, so only one message of the batch is held parsed at a time
+        return batch, {idx: message.items["RFC822"] for idx, message in fetched.items() if "RFC822" in message.items}
+
+    def _fetch_text_parts(
+            self,
+            batch: Sequence[str],
+            header_filter: Optional[HeaderFilter]) -> Tuple[Sequence[str], dict[str, Union[bytes, Message]]]:
+        """Fetches the header and structure of the batch, then only the text/html and text/plain sections.
+        Messages whose structure can't be used are fetched whole."""
+        fetched = self._fetch(batch, '(BODYSTRUCTURE BODY.PEEK[HEADER])')
+        headers = {
+            idx: message.items["BODY[HEADER]"] for idx, message in fetched.items() if "BODY[HEADER]" in message.items
+        }
+        batch = self._select_by_headers(batch, headers, header_filter)
+
+        parts: dict[str, list[BodyPart]] = {}
+        by_sections: dict[Tuple[str, ...], list[str]] = defaultdict(list)
+        whole: list[str] = []
+        for idx in batch:
+            try:
+                parts[idx] = text_parts(find_body_structure(fetched[idx].text))     # type: ignore
+            except (KeyError, ValueError, IndexError, TypeError):
+                self._logger.warning(f"Could not read the structure of email {idx}; Fetching it whole")
+                parts[idx] = []
+            if parts[idx] and idx in headers:
+                by_sections[tuple(part.section for part in parts[idx])].append(idx)
+            else:
+                whole.append(idx)
+
+        messages: dict[str, Union[bytes, Message]] = {}
+        if whole:
+            _, messages = self._fetch_rfc822(whole, None)
+        for sections, uids in by_sections.items():
+            bodies = self._fetch(uids, f"({' '.join(f'BODY.PEEK[{section}]' for section in sections)})")
+            for idx in uids:
+                if idx not in bodies:
+                    continue
+                messages[idx] = rebuild_message(headers[idx], [
+                    (part, bodies[idx].items.get(f"BODY[{part.section}]", b""))
+                    for part in parts[idx]
+                ])
+        return batch, messages
+
+    def _fetch_messages(
+            self,
+            ids: Sequence[str],
+            header_filter: Optional[HeaderFilter] = None) -> Iterator[Tuple[str, Message]]:
+        fetch_batch = self._fetch_text_parts if self._fetch_mode == "text_parts" else self._fetch_rfc822
+        for batch in batched(ids, self._fetch_batch_size):
+            batch, messages = fetch_batch(batch, header_filter)
+            for idx in batch:
+                if idx not in messages:
+                    self._logger.warning(f"Email {idx} was not returned by the inbox")
+                    continue
+                message = messages.pop(idx)
+
+                yield idx, email.message_from_bytes(message) if isinstance(message, bytes) else message
 
-            yield idx, message
+    def _fetch(self, uids: Sequence[str], message_parts: str) -> dict[str, FetchedMessage]:
+        """Fetches a batch of messages in a single round trip, keyed by UID"""
+        data = self._ensure_success(self._mail.uid('fetch', ','.join(uids), message_parts))  # type: ignore
+        return {
+            fetched.uid: fetched
+            for fetched in parse_fetch_response(data)
+            if fetched.uid is not None
+        }
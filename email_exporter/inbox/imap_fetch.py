@@ -0,0 +1,63 @@
+from typing import Iterable, Iterator, Optional, Sequence, Union
+import re
+
+FetchData = Sequence[Union[bytes, tuple[bytes, bytes], None]]
+
+_response_start_re = re.compile(rb"^\d+ \(")
+_literal_item_re = re.compile(rb"(?P<name>[A-Z0-9.]+(?:\[[^\]]*\])?(?:<\d+>)?) \{\d+\}$", re.IGNORECASE)
+_uid_re = re.compile(rb"(?:^|[\s(])UID (?P<uid>\d+)", re.IGNORECASE)
+
+
+class FetchedMessage:
+    """A single FETCH response. Literal items (RFC822, BODY[...]) are kept by their upper cased item name,
+    everything else stays in the text with the literals left out."""
+
+    def __init__(self, uid: Optional[str], items: dict[str, bytes], text: bytes):
+        self.uid = uid
+        self.items = items
+        self.text = text
+
+    def __repr__(self):
+        return f"FetchedMessage({self.uid}, {list(self.items)})"
+
+
+def _split_responses(data: FetchData) -> Iterator[list[Union[bytes, tuple[bytes, bytes]]]]:
+    response: list[Union[bytes, tuple[bytes, bytes]]] = []
+    for part in data:
+        if part is None:
+            continue
+        head = part[0] if isinstance(part, tuple) else part
+        if _response_start_re.match(head) and response:
+            yield response
+            response = []
+        response.append(part)
+    if response:
+        yield response
+
+
+def _parse_response(response: list[Union[bytes, tuple[bytes, bytes]]]) -> FetchedMessage:
+    items: dict[str, bytes] = {}
+    text: list[bytes] = []
+    for part in response:
+        if isinstance(part, tuple):
+            head, literal = part
+            if (match := _literal_item_re.search(head)):
+                items[match.group("name").decode().upper()] = literal
+                head = head[:match.start()]
+            text.append(head)
+        else:
+            text.append(part)
+
+    joined = b" ".join(text)
+    uid = _uid_re.search(joined)
+    return FetchedMessage(uid.group("uid").decode() if uid else None, items, joined)
+
+
+def parse_fetch_response(data: FetchData) -> list[FetchedMessage]:
+    """Splits the data returned by imaplib for a FETCH command into one FetchedMessage per message."""
+    return [_parse_response(response) for response in _split_responses(data)]
+
+
+def batched(uids: Sequence[str], size: int) -> Iterable[Sequence[str]]:
+    for start in range(0, len(uids), size):
+        yield uids[start:start + size]
@@ -1,18 +1,28 @@
 from abc import ABC, abstractmethod
 from email.message import Message
-from typing import Iterator, Tuple
+from typing import Callable, Collection, Iterator, Optional, Tuple
+
+# Given the header-only messages of a batch, returns the ids of the messages to download in full
+HeaderFilter = Callable[[list[Tuple[int, Message]]], Collection[int]]
 
 
 class InboxABC(ABC):
 
     @abstractmethod
-    def get_messages(self, search_criteria: str = 'UNFLAGGED') -> Iterator[Tuple[int, Message]]:
+    def get_messages(
+            self,
+            search_criteria: str = 'UNFLAGGED',
+            header_filter: Optional[HeaderFilter] = None) -> Iterator[Tuple[int, Message]]:
         raise NotImplementedError()
 
     @abstractmethod
     def discard_message(self, idx: int) -> None:
         raise NotImplementedError()
 
+    @abstractmethod
+    def commit(self) -> None:
+        raise NotImplementedError()
+
     @property
     @abstractmethod
     def email_address(self) -> str:
@@ -1,5 +1,8 @@
-from typing import Tuple, Union
-from bs4 import BeautifulSoup
+from typing import Optional, Tuple, Union
+from bs4 import BeautifulSoup, SoupStrainer
+
+# BeautifulSoup tree builder used for the email html; "html.parser" is the pure Python one
+DEFAULT_HTML_PARSER = "lxml"
 
 
 class InboxItem:
@@ -8,15 +11,50 @@ class InboxItem:
                  date: str,
                  html: str,
                  mime: str,
-                 soup: BeautifulSoup,
-                 addresses: Tuple[str, Union[str, None]]):
+                 soup: Optional[BeautifulSoup],
+                 addresses: Tuple[str, Union[str, None]],
+                 html_parser: str = DEFAULT_HTML_PARSER):
         self.title = subject
         self.date = date
         self.html = html
         self.mime = mime
-        self.soup = soup
+        self._soup = soup
         self.owner = addresses[0]
         self.sender: str = addresses[1] or ""
+        self.html_parser = html_parser
+
+    @property
+    def soup(self) -> BeautifulSoup:
+        """Parsed from html on first access. None when the email has no html."""
+        if self._soup is None and self.html:
+            self._soup = BeautifulSoup(self.html, self.html_parser)
+        return self._soup      # type: ignore
+
+    @soup.setter
+    def soup(self, soup: Optional[BeautifulSoup]):
+        self._soup = soup
+
+    @property
+    def parsed(self) -> bool:
+        """Whether the soup has been built, by a strain or a full parse"""
+        return self._soup is not None
+
+    def strain(self, strainer: SoupStrainer) -> bool:
+        """Parses only the parts of the html matched by strainer, when the soup has not been built yet.
+        Returns False, leaving the full parse to happen on access, when nothing matched."""
+        if self._soup is not None or not self.html:
+            return False
+        soup = BeautifulSoup(self.html, self.html_parser, parse_only=strainer)
+        if soup.find() is None:
+            return False
+        self._soup = soup
+        return True
+
+    def release(self):
+        """Drops the raw html, text bodies and soup once the item has been parsed"""
+        self.html = ""
+        self.mime = ""
+        self._soup = None
 
     def __repr__(self):
         return f"InboxItem({self.title}, {self.date}, from={self.sender}, to={self.owner})"
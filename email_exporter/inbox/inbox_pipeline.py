@@ -0,0 +1,198 @@
+from email.message import Message
+from email_exporter.config import Config
+from logging import Logger
+from typing import Any, Callable, Optional, Union
+import heapq
+import queue
+import threading
+from .inbox_item import InboxItem
+
+_STOP = object()
+
+
+class PipelineStages:
+    """The per message work of the pipeline, split by what bounds it.
+    prepare (CPU) returns either the final discard decision, or a job for synthesise (TTS) then publish (upload),
+    which returns the discard decision. Jobs with the same publish_key are published one at a time, in inbox order."""
+
+    def __init__(
+            self,
+            prepare: Callable[[InboxItem], Union[bool, Any]],
+            synthesise: Callable[[Any], Any],
+            publish: Callable[[Any], bool],
+            publish_key: Callable[[Any], str]):
+        self.prepare = prepare
+        self.synthesise = synthesise
+        self.publish = publish
+        self.publish_key = publish_key
+
+
+class _Job:
+    def __init__(self, seq: int, idx, message: Message):
+        self.seq = seq
+        self.idx = idx
+        self.message: Optional[Message] = message
+        self.payload: Any = None
+        self.discard: Optional[bool] = None
+
+    def __lt__(self, other: "_Job"):
+        return self.seq < other.seq
+
+
+class InboxPipeline:
+    """Runs the stages of process_inbox concurrently: the inbox is read and discarded on the calling thread (IMAP
+    connections are not thread safe), while parsing, synthesis and publishing run on their own worker threads,
+    connected with bounded queues. A message is discarded only once its last stage succeeded."""
+
+    def __init__(
+            self,
+            config: Config,
+            logger: Logger,
+            process_email: Callable[[Message], InboxItem],
+            discard_message: Callable[[Any], None]):
+        self._logger = logger
+        self._process_email = process_email
+        self._discard_message = discard_message
+        self._parse_workers = max(1, config.get_int("PIPELINE_PARSE_WORKERS", 2))
+        self._synthesise_workers = max(1, config.get_int("PIPELINE_SYNTHESISE_WORKERS", 2))
+        self._publish_workers = max(1, config.get_int("PIPELINE_PUBLISH_WORKERS", 2))
+        self._queue_size = max(1, config.get_int("PIPELINE_QUEUE_SIZE", 4))
+        self._max_in_flight = max(1, config.get_int("PIPELINE_MAX_IN_FLIGHT", 8))
+
+    def run(self, messages, stages: PipelineStages) -> None:
+        self._stages = stages
+        self._parse_queue: queue.Queue = queue.Queue(self._queue_size)
+        self._synthesise_queue: queue.Queue = queue.Queue(self._queue_size)
+        self._sequence_queue: queue.Queue = queue.Queue()
+        self._publish_queues: list[queue.Queue] = [queue.Queue(self._queue_size) for _ in range(self._publish_workers)]
+        self._done_queue: queue.Queue = queue.Queue()
+        # Set when a discard fails: the workers drop the jobs they haven't started, and run stops waiting for them
+        self._aborted = threading.Event()
+
+        parse_threads = [
+            threading.Thread(target=self._parse, name=f"pipeline-parse-{i}") for i in range(self._parse_workers)]
+        synthesise_threads = [
+            threading.Thread(target=self._synthesise, name=f"pipeline-synthesise-{i}")
+            for i in range(self._synthesise_workers)]
+        publish_threads = [
+            threading.Thread(target=self._sequence, name="pipeline-sequence"),
+            *(threading.Thread(target=self._publish, args=(publish_queue,), name=f"pipeline-publish-{i}")
+              for i, publish_queue in enumerate(self._publish_queues)),
+        ]
+        for thread in (*parse_threads, *synthesise_threads, *publish_threads):
+            thread.daemon = True
+            thread.start()
+
+        in_flight = 0
+        seq = 0
+        try:
+            for idx, message in messages:
+                while in_flight >= self._max_in_flight:
+                    in_flight -= 1
+                    self._complete(self._done_queue.get())
+                while not self._done_queue.empty():
+                    in_flight -= 1
+                    self._complete(self._done_queue.get())
+
+                self._logger.info(f"Processing email {idx}")
+                self._parse_queue.put(_Job(seq, idx, message))
+                seq += 1
+                in_flight += 1
+        finally:
+            for _ in range(self._parse_workers):
+                self._parse_queue.put(_STOP)
+            # The messages already read are finished even if reading the inbox failed, unless discarding did
+            while in_flight > 0 and not self._aborted.is_set():
+                in_flight -= 1
+                self._complete(self._done_queue.get())
+            # Each stage is stopped once the one feeding it has, so no job is queued behind a stop
+            for thread in parse_threads:
+                thread.join()
+            for _ in range(self._synthesise_workers):
+                self._synthesise_queue.put(_STOP)
+            for thread in synthesise_threads:
+                thread.join()
+            self._sequence_queue.put(_STOP)
+            for thread in publish_threads:
+                thread.join()
+
+    def _complete(self, job: _Job):
+        if job.discard:
+            self._logger.info(f"Discarding message {job.idx}")
+            try:
+                self._discard_message(job.idx)
+            except Exception:
+                self._aborted.set()
+                raise
+
+    def _fail(self, job: _Job):
+        self._logger.exception(f"While processing email {job.idx}, an exception occured")
+        job.discard = False
+        job.payload = None
+
+    def _parse(self):
+        while (job := self._parse_queue.get()) is not _STOP:
+            if self._aborted.is_set():
+                continue
+            try:
+                inbox_item = self._process_email(job.message)    # type: ignore
+                job.message = None
+                self._logger.info(f"Email {job.idx} processed: {inbox_item}")
+                prepared = self._stages.prepare(inbox_item)
+                if isinstance(prepared, bool):
+                    job.discard = prepared
+                else:
+                    job.payload = prepared
+            except Exception:
+                self._fail(job)
+
+            if job.payload is None:
+                # Sequenced anyway, so the jobs after it are not held back waiting for it
+                self._sequence_queue.put(job)
+            else:
+                self._synthesise_queue.put(job)
+
+    def _synthesise(self):
+        while (job := self._synthesise_queue.get()) is not _STOP:
+            if self._aborted.is_set():
+                continue
+            try:
+                job.payload = self._stages.synthesise(job.payload)
+            except Exception:
+                self._fail(job)
+            self._sequence_queue.put(job)
+
+    def _sequence(self):
+        """Releases jobs to the publishers in inbox order. Each publish key always goes to the same publisher,
+        so a feed's items are published one at a time, in order."""
+        pending: list[_Job] = []
+        next_seq = 0
+        while (job := self._sequence_queue.get()) is not _STOP:
+            heapq.heappush(pending, job)
+            while pending and pending[0].seq == next_seq:
+                job = heapq.heappop(pending)
+                next_seq += 1
+                if job.payload is None:
+                    self._done_queue.put(job)
+                    continue
+                try:
+                    key = self._stages.publish_key(job.payload)
+                except Exception:
+                    self._fail(job)
+                    self._done_queue.put(job)
+                    continue
+                self._publish_queues[hash(key) % len(self._publish_queues)].put(job)
+
+        for publish_queue in self._publish_queues:
+            publish_queue.put(_STOP)
+
+    def _publish(self, publish_queue: queue.Queue):
+        while (job := publish_queue.get()) is not _STOP:
+            if self._aborted.is_set():
+                continue
+            try:
+                job.discard = self._stages.publish(job.payload)
+            except Exception:
+                self._fail(job)
+            job.payload = None
+            self._done_queue.put(job)
@@ -4,9 +4,11 @@ from email_exporter.inbox import Inbox
 from logging import Logger
 import re
 import email
-from bs4 import BeautifulSoup
-from .inbox_item import InboxItem
-from typing import Callable, Iterator, Tuple, Union
+from .inbox_item import DEFAULT_HTML_PARSER, InboxItem
+from .inbox_pipeline import InboxPipeline, PipelineStages
+from typing import Callable, Iterable, Iterator, Optional, Tuple, Union
+
+_paragraph_re = re.compile(r"<p[\s>]", re.IGNORECASE)
 
 
 class InboxProcessor:
@@ -14,6 +16,7 @@ class InboxProcessor:
         self._config = config
         self._logger = logger
         self._inbox = inbox
+        self._html_parser = config.get("HTML_PARSER", DEFAULT_HTML_PARSER)
 
     def _decode_header(self, header: str) -> str:
         default_charset = "utf-8"
@@ -52,18 +55,15 @@ class InboxProcessor:
 
         return (sender, None)
 
-    def _get_payload(self, message: Message) -> Iterator[bytes]:
-        if message.is_multipart():
-            for m in message.get_payload():
-                yield from self._get_payload(m)     # type: ignore
-        else:
-            yield message.get_payload(decode=True)  # type: ignore
-
-    def _to_soup(self, raw: str) -> Union[BeautifulSoup, None]:
-        soup = BeautifulSoup(raw, 'html.parser')
-        if soup.find("p") is None:
-            return None
-        return soup
+    def _get_text_payloads(self, message: Message) -> Iterator[Tuple[str, bytes]]:
+        for part in message.walk():
+            if part.is_multipart() or part.get_content_maintype() != "text":
+                continue
+            if part.get_content_disposition() == "attachment":
+                continue
+            payload = part.get_payload(decode=True)
+            if payload is not None:
+                yield part.get_content_type(), payload      # type: ignore
 
     def _try_decode(self, payload: bytes) -> Tuple[str, str]:
         encodings = ("utf-8", "windows-1252")
@@ -80,36 +80,88 @@ class InboxProcessor:
         subject, sender, recipient, date = self._get_message_data(message)
         mime = ""
         html = ""
-        soup: BeautifulSoup = None      # type: ignore
 
-        for i, payload in enumerate(self._get_payload(message)):
+        for content_type, payload in self._get_text_payloads(message):
             decode, _ = self._try_decode(payload)
-            try_soup = self._to_soup(decode)
-            if try_soup is None:
-                mime = decode
-            else:
+            if content_type == "text/html":
                 html = decode
-                soup = try_soup
+            else:
+                mime = decode
+
+        # Some senders label their html as text/plain
+        if not html and _paragraph_re.search(mime):
+            html, mime = mime, ""
 
         addresses = self._identify_participants(sender, recipient, mime)
 
-        return InboxItem(subject, date, html, mime, soup, addresses)
+        # The soup is only built when a parser asks for it
+        return InboxItem(subject, date, html, mime, None, addresses, self._html_parser)
 
-    def process_inbox(self, callback: Callable[[InboxItem], bool]) -> None:
-        self._logger.info("Processing inbox")
-        for idx, message in self._inbox.get_messages():
-            self._logger.info(f"Processing email {idx}")
-            inbox_item = self.process_email(message)
-            self._logger.info(f"Email {idx} processed: {inbox_item}")
+    def _get_owner(self, message: Message) -> Optional[str]:
+        try:
+            _, sender, recipient, _ = self._get_message_data(message)
+        except Exception:
+            self._logger.exception(f"Could not read the headers of {message['Message-ID']}")
+            return None
+        owner, _ = self._identify_participants(sender, recipient, "")
+        return owner
 
-            discard_message = False
+    def _routable_filter(self, is_routable: Callable[[Iterable[str]], set[str]]):
+        def header_filter(headers: list[Tuple[int, Message]]) -> set[int]:
+            owners = {idx: self._get_owner(message) for idx, message in headers}
             try:
-                discard_message = callback(inbox_item)
+                routable_owners = is_routable({owner for owner in owners.values() if owner is not None})
             except Exception:
-                self._logger.exception(
-                    f"While processing email {idx}, an exception occured"
-                )
-
-            if discard_message:
-                self._logger.info(f"Discarding message {idx}")
+                self._logger.exception("While resolving the owners of a batch, an exception occured")
+                return set(owners)
+
+            routable = set()
+            for idx, message in headers:
+                # Owners that could not be read from the headers are left to the full processing
+                if owners[idx] is None or owners[idx] in routable_owners:
+                    routable.add(idx)
+                    continue
+                self._logger.warning(
+                    "Unrecognised email address: [{}] has no feed. Subject: [{}]; Discarding message {}".format(
+                        owners[idx], message["Subject"], idx))
                 self._inbox.discard_message(idx)
+            return routable
+
+        return header_filter
+
+    def process_inbox(
+            self,
+            callback: Callable[[InboxItem], bool],
+            is_routable: Optional[Callable[[Iterable[str]], set[str]]] = None,
+            stages: Optional[PipelineStages] = None) -> None:
+        """When is_routable is given, it receives the owners of each batch of emails, read from their headers,
+        and returns the ones that have a feed. The others are discarded without downloading their bodies.
+        When stages are given and PIPELINE_ENABLED is set, they are run by an InboxPipeline instead of callback."""
+        self._logger.info("Processing inbox")
+        header_filter = self._routable_filter(is_routable) if is_routable is not None else None
+        messages = self._inbox.get_messages(header_filter=header_filter)
+        try:
+            if stages is not None and self._config.get_bool("PIPELINE_ENABLED"):
+                pipeline = InboxPipeline(self._config, self._logger, self.process_email, self._inbox.discard_message)
+                pipeline.run(messages, stages)
+                return
+
+            for idx, message in messages:
+                self._logger.info(f"Processing email {idx}")
+                inbox_item = self.process_email(message)
+                self._logger.info(f"Email {idx} processed: {inbox_item}")
+
+                discard_message = False
+                try:
+                    discard_message = callback(inbox_item)
+                except Exception:
+                    self._logger.exception(
+                        f"While processing email {idx}, an exception occured"
+                    )
+
+                if discard_message:
+                    self._logger.info(f"Discarding message {idx}")
+                    self._inbox.discard_message(idx)
+        finally:
+            # After the pipeline drained, so its in-flight messages are not saved as pending
+            self._inbox.commit()
@@ -0,0 +1,77 @@
+from __future__ import annotations
+from email_exporter.config import Config
+from google.cloud.firestore import Client as FirestoreClient
+from typing import Optional
+
+
+class InboxCheckpoint:
+    """Where the previous run left the All Mail folder. Messages up to last_uid were all seen, pending are the ones
+    that were seen but not discarded, so they have to be offered again."""
+
+    def __init__(
+            self,
+            all_mail_folder: str,
+            uid_validity: str,
+            last_uid: int,
+            pending: list[str],
+            uid_next: Optional[int] = None,
+            highest_modseq: Optional[int] = None):
+        self.all_mail_folder = all_mail_folder
+        self.uid_validity = uid_validity
+        self.last_uid = last_uid
+        self.pending = pending
+        self.uid_next = uid_next
+        self.highest_modseq = highest_modseq
+
+    @staticmethod
+    def from_dict(data: dict) -> InboxCheckpoint:
+        return InboxCheckpoint(
+            data["all_mail_folder"],
+            data["uid_validity"],
+            data["last_uid"],
+            data.get("pending", []),
+            data.get("uid_next"),
+            data.get("highest_modseq"))
+
+    def to_dict(self) -> dict:
+        return {
+            "all_mail_folder": self.all_mail_folder,
+            "uid_validity": self.uid_validity,
+            "last_uid": self.last_uid,
+            "pending": self.pending,
+            "uid_next": self.uid_next,
+            "highest_modseq": self.highest_modseq,
+        }
+
+    def __repr__(self):
+        return (f"InboxCheckpoint({self.all_mail_folder}, uidvalidity={self.uid_validity}, last={self.last_uid}, "
+                f"pending={len(self.pending)}, modseq={self.highest_modseq})")
+
+
+class InboxStateStore:
+    """Keeps an InboxCheckpoint per inbox address in Firestore. Disabled when INBOX_STATE_COLLECTION is not set."""
+
+    def __init__(self, config: Config, firestore_client: FirestoreClient) -> None:
+        self.collection = config.get("INBOX_STATE_COLLECTION")
+        self._db = firestore_client
+
+    @staticmethod
+    def disabled() -> InboxStateStore:
+        return InboxStateStore(Config(), None)     # type: ignore
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.collection)
+
+    def load(self, address: str) -> Optional[InboxCheckpoint]:
+        if not self.enabled:
+            return None
+        snapshot = self._db.collection(self.collection).document(address).get()
+        if not snapshot.exists:
+            return None
+        return InboxCheckpoint.from_dict(snapshot.to_dict() or {})
+
+    def save(self, address: str, checkpoint: InboxCheckpoint) -> None:
+        if not self.enabled:
+            return
+        self._db.collection(self.collection).document(address).set(checkpoint.to_dict())
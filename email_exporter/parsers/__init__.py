@@ -1,3 +1,4 @@
 from .parser_selector import ParserSelector                     # noqa: F401
 from .creator_parser_selector import CreatorParserSelector      # noqa: F401
-from .parsed_item import ParsedItem                             # noqa: F401
+from .parsed_item import ParsedItem, StreamedParsedItem         # noqa: F401
+from .parse_cache import ParseCache                             # noqa: F401
@@ -0,0 +1,47 @@
+from functools import lru_cache
+from types import ModuleType
+import hashlib
+import inspect
+import sys
+
+_PROJECT_PACKAGES = ("email_exporter", "ssml")
+
+
+def _is_project_module(name: str) -> bool:
+    return any(name == package or name.startswith(f"{package}.") for package in _PROJECT_PACKAGES)
+
+
+def _referenced_modules(module: ModuleType):
+    for value in vars(module).values():
+        if inspect.ismodule(value):
+            yield value
+        elif isinstance(getattr(value, "__module__", None), str) and value.__module__ in sys.modules:
+            yield sys.modules[value.__module__]
+        # A submodule is an attribute of its package once it has been imported
+        name = getattr(value, "__name__", None)
+        if isinstance(name, str) and f"{module.__name__}.{name}" in sys.modules:
+            yield sys.modules[f"{module.__name__}.{name}"]
+
+
+@lru_cache(maxsize=None)
+def code_fingerprint(*classes: type) -> str:
+    """A hash of the source of the modules defining classes and every project module they reach through their
+    globals, so it changes with any code that could change what the classes do"""
+    modules: dict[str, ModuleType] = {}
+    stack = [sys.modules[cls.__module__] for cls in classes]
+    while stack:
+        module = stack.pop()
+        if module.__name__ in modules:
+            continue
+        modules[module.__name__] = module
+        stack.extend(
+            referenced for referenced in _referenced_modules(module)
+            if _is_project_module(referenced.__name__) and referenced.__name__ not in modules)
+
+    digest = hashlib.sha256()
+    for name in sorted(modules):
+        digest.update(name.encode())
+        if (path := getattr(modules[name], "__file__", None)) is not None:
+            with open(path, "rb") as f:
+                digest.update(f.read())
+    return digest.hexdigest()
@@ -1,3 +1,4 @@
+from collections import defaultdict
 from email_exporter.inbox import InboxItem
 from .content_item_abc import ContentItemABC
 from . import generic
@@ -5,6 +6,61 @@ from . import substack
 from . import tc
 from . import mailgun
 from . import ghost
+import time
+
+
+class MatchStats:
+    """Per matcher call, hit and time counters for ContentItem.to_item. Disabled by default, as timing every
+    match_component call is not free."""
+
+    def __init__(self):
+        self.enabled = False
+        self.reset()
+
+    def reset(self):
+        self._calls: dict[type[ContentItemABC], int] = defaultdict(int)
+        self._hits: dict[type[ContentItemABC], int] = defaultdict(int)
+        self._seconds: dict[type[ContentItemABC], float] = defaultdict(float)
+
+    def record(self, content_item: type[ContentItemABC], hit: bool, seconds: float):
+        self._calls[content_item] += 1
+        self._hits[content_item] += int(hit)
+        self._seconds[content_item] += seconds
+
+    def report(self) -> list[dict]:
+        return sorted([
+            {
+                "matcher": f"{content_item.__module__.split('.')[-2]}.{content_item.__name__}",
+                "calls": calls,
+                "hits": self._hits[content_item],
+                "seconds": self._seconds[content_item],
+            }
+            for content_item, calls in self._calls.items()
+        ], key=lambda row: row["seconds"], reverse=True)
+
+    def __str__(self):
+        return '\n'.join(
+            f"{row['matcher']:<40} {row['calls']:>8} calls {row['hits']:>8} hits {row['seconds'] * 1000:>10.2f}ms"
+            for row in self.report())
+
+
+class ContentItemIndex:
+    """Candidate content items by tag name, keeping the priority order of the content item list.
+    Items that don't declare match_tags are candidates for every node."""
+
+    def __init__(self, content_items: list[type[ContentItemABC]]):
+        self._any = [item for item in content_items if item.match_tags is None]
+        tag_names = {name for item in content_items for name in (item.match_tags or ())}
+        self._by_tag_name = {
+            name: [item for item in content_items if item.match_tags is None or name in item.match_tags]
+            for name in tag_names
+        }
+
+    def candidates(self, component) -> list[type[ContentItemABC]]:
+        name = getattr(component, "name", None)
+        if name is None:
+            return self._any
+        return self._by_tag_name.get(name, self._any)
 
 
 class ContentItem:
@@ -16,10 +72,23 @@ class ContentItem:
         *generic.items
     ]
 
+    match_stats = MatchStats()
+
+    _index = ContentItemIndex(content_items)
+
+    @staticmethod
+    def _match(content_item: type[ContentItemABC], component) -> bool:
+        if not ContentItem.match_stats.enabled:
+            return content_item.match_component(component)
+        start = time.perf_counter()
+        matched = content_item.match_component(component)
+        ContentItem.match_stats.record(content_item, matched, time.perf_counter() - start)
+        return matched
+
     @staticmethod
     def to_item(component):
-        for content_item in ContentItem.content_items:
-            if content_item.match_component(component):
+        for content_item in ContentItem._index.candidates(component):
+            if ContentItem._match(content_item, component):
                 return content_item(component, ContentItem.to_item)
         raise RuntimeError(f"No content item was matched to component: {component}")
 
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Any, Callable, Iterable
+from typing import Any, Callable, Iterable, Optional
 
 from ..description_item import DescriptionItemABC
 from ssml import SsmlTagABC
@@ -8,6 +8,8 @@ from bs4.element import PageElement
 
 
 class ContentItemABC(ABC):
+    # Tag names match_component can accept, used to skip impossible matches. None means any node
+    match_tags: Optional[frozenset[str]] = None
 
     def __init__(self, component, to_item: Callable[[Any], "ContentItemABC"]):
         self._component = component
@@ -3,6 +3,7 @@ from ssml import tags
 
 
 class Blockquote(ContentItemABC):
+    match_tags = frozenset({"blockquote"})
 
     def _get_inner_ssml(self):
         for component in self._component.contents:
@@ -2,6 +2,7 @@ from .null_content_item import NullContentItem
 
 
 class EmptyParagraph(NullContentItem):
+    match_tags = frozenset({"p"})
 
     @staticmethod
     def match_component(component):
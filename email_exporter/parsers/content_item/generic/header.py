@@ -4,6 +4,7 @@ from ... import description_item
 
 
 class Header(ContentItemABC):
+    match_tags = frozenset({"h1", "h2", "h3", "h4", "h5", "h6"})
 
     pause_duration = {
         "h1": "750ms",
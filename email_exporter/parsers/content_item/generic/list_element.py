@@ -5,6 +5,7 @@ from ... import description_item
 
 
 class List(ContentItemABC):
+    match_tags = frozenset({"ul", "ol"})
 
     def get_ssml(self):
         return [
@@ -4,6 +4,7 @@ from ... import description_item
 
 
 class Paragraph(ContentItemABC):
+    match_tags = frozenset({"p"})
 
     def get_ssml(self):
         return [
@@ -8,6 +8,8 @@ class ButtonCard(NullContentItem):
     call-to-action buttons.
     """
 
+    match_tags = frozenset({"table"})
+
     @staticmethod
     def match_component(component):
         if not hasattr(component, "attrs"):
@@ -8,6 +8,8 @@ class CtaCard(NullContentItem):
     Typically table elements with class "kg-cta-card".
     """
 
+    match_tags = frozenset({"table"})
+
     @staticmethod
     def match_component(component):
         if not hasattr(component, "attrs"):
@@ -8,6 +8,8 @@ class FeedbackButtons(NullContentItem):
     comment/share/like buttons.
     """
 
+    match_tags = frozenset({"table"})
+
     @staticmethod
     def match_component(component):
         if not hasattr(component, "attrs"):
@@ -7,6 +7,8 @@ class Footer(NullContentItem):
     These are td elements with class "footer".
     """
 
+    match_tags = frozenset({"td"})
+
     @staticmethod
     def match_component(component):
         if not hasattr(component, "attrs"):
@@ -7,6 +7,8 @@ class HorizontalRule(NullContentItem):
     These are table elements with class "kg-hr-card" used as section dividers.
     """
 
+    match_tags = frozenset({"table"})
+
     @staticmethod
     def match_component(component):
         if not hasattr(component, "attrs"):
@@ -20,6 +20,8 @@ class ImageCard(ContentItemABC):
     </div>
     """
 
+    match_tags = frozenset({"div"})
+
     def get_ssml(self):
         # Images don't produce speech, but we could read alt text if desired
         return []
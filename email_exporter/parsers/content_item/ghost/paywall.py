@@ -7,6 +7,8 @@ class Paywall(NullContentItem):
     These are div elements with class "kg-paywall" that show upgrade prompts.
     """
 
+    match_tags = frozenset({"div"})
+
     @staticmethod
     def match_component(component):
         if not hasattr(component, "attrs"):
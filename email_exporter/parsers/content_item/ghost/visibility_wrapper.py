@@ -9,6 +9,8 @@ class VisibilityWrapper(NullContentItem):
     they usually wrap promotional content.
     """
 
+    match_tags = frozenset({"div"})
+
     @staticmethod
     def match_component(component):
         if not hasattr(component, "attrs"):
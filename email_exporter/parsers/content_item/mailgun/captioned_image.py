@@ -8,6 +8,8 @@ class CaptionedImage(ContentItemABC):
     These are typically tables with class "img-container" containing an image and caption.
     """
 
+    match_tags = frozenset({"table"})
+
     def get_ssml(self):
         # Images don't produce speech
         return []
@@ -7,6 +7,8 @@ class HeaderLogo(NullContentItem):
     These are typically td elements with class "header-logo".
     """
 
+    match_tags = frozenset({"td"})
+
     @staticmethod
     def match_component(component):
         if not hasattr(component, "attrs"):
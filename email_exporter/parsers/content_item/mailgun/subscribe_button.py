@@ -7,6 +7,8 @@ class SubscribeButton(NullContentItem):
     These are typically tables with class "button" containing a call-to-action.
     """
 
+    match_tags = frozenset({"table", "td"})
+
     @staticmethod
     def match_component(component):
         if not hasattr(component, "attrs"):
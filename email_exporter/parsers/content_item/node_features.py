@@ -0,0 +1,76 @@
+from bs4 import Tag
+from typing import Optional
+import re
+
+_retweets_re = re.compile(r"\d*\sRetweets")
+_likes_re = re.compile(r"\d*\sLikes")
+# Kept in the tag's __dict__: attribute lookups on a Tag fall back to searching its children
+_MEMO = "_node_features"
+
+
+class NodeFeatures:
+    """What the match_component predicates ask about a tag's subtree. Built from the children's features, so a
+    region is walked once however many predicates look at it. The soup must not change once these are computed."""
+
+    __slots__ = ("name", "child_names", "classes", "tag_counts", "img_alts", "has_retweets", "has_likes")
+
+    def __init__(self, tag: Tag):
+        self.name = tag.name
+        # The children's names, ignoring newlines; None for text
+        self.child_names = tuple(getattr(child, "name", None) for child in tag.contents if child != "\n")
+        classes = tag.get("class") or ()
+        self.classes = frozenset(classes.split() if isinstance(classes, str) else classes)
+
+        # Of the descendants, not the tag itself, as find_all counts
+        self.tag_counts: dict[str, int] = {}
+        self.img_alts: tuple[str, ...] = ()
+        img_alts: list[str] = []
+        self.has_retweets = False
+        self.has_likes = False
+
+        for child in tag.contents:
+            if not isinstance(child, Tag):
+                continue
+            features: NodeFeatures = child.__dict__[_MEMO]
+            self.tag_counts[child.name] = self.tag_counts.get(child.name, 0) + 1
+            for name, count in features.tag_counts.items():
+                self.tag_counts[name] = self.tag_counts.get(name, 0) + count
+
+            if child.name == "img" and (alt := child.get("alt")):
+                img_alts.append(str(alt))
+            img_alts.extend(features.img_alts)
+
+            if child.name == "span":
+                text = child.get_text()
+                self.has_retweets = self.has_retweets or _retweets_re.match(text) is not None
+                self.has_likes = self.has_likes or _likes_re.match(text) is not None
+            self.has_retweets = self.has_retweets or features.has_retweets
+            self.has_likes = self.has_likes or features.has_likes
+
+        self.img_alts = tuple(img_alts)
+
+    def count(self, name: str) -> int:
+        return self.tag_counts.get(name, 0)
+
+    def has_children(self, name: str, n: int = 1) -> bool:
+        return self.child_names == (name,) * n
+
+
+def node_features(node) -> Optional[NodeFeatures]:
+    """The features of a tag, computing them for its whole subtree on first use. None for anything but a tag"""
+    if not isinstance(node, Tag):
+        return None
+    if _MEMO in node.__dict__:
+        return node.__dict__[_MEMO]
+
+    # Children before their parent; subtrees that already have features are not entered again
+    stack: list[tuple[Tag, bool]] = [(node, False)]
+    while stack:
+        tag, children_done = stack.pop()
+        if children_done:
+            tag.__dict__[_MEMO] = NodeFeatures(tag)
+            continue
+        stack.append((tag, True))
+        stack.extend((child, False) for child in tag.contents if isinstance(child, Tag) and _MEMO not in child.__dict__)
+
+    return node.__dict__[_MEMO]
@@ -1,4 +1,5 @@
 from ..content_item_abc import ContentItemABC
+from ..node_features import node_features
 from ... import description_item
 
 
@@ -15,20 +16,16 @@ class CaptionedImage(ContentItemABC):
 
     @staticmethod
     def match_component(component):
-        if not hasattr(component, "attrs"):
+        if (features := node_features(component)) is None:
             return False
         # Directly received
-        if "class" in component.attrs and "captioned-image-container-static" in component["class"]:
+        if "captioned-image-container-static" in features.classes:
             return True
 
-        try:
-            if component.name == "div" and \
-                    len(component.find_all("table")) == 1 and \
-                    len(component.table.find_all("td")) == 3 and \
-                    len(component.table.find_all("img")) == 1:
+        if component.name == "div" and features.count("table") == 1:
+            table = node_features(component.table)
+            if table.count("td") == 3 and table.count("img") == 1:     # type: ignore
                 # Image fingerprint: Forwarded, gmail sanitised
                 return True
-        except AttributeError:
-            return False
 
         return False
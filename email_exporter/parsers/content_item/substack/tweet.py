@@ -1,10 +1,15 @@
 from ..content_item_abc import ContentItemABC
 from ssml import tags
 from abc import ABC, abstractmethod
+from ..node_features import node_features
 from ..util import get_text_content
+from typing import NamedTuple, Optional, Union
 import re
 from ... import description_item
 
+_tco_re = re.compile(r"https://t.co/\w+")
+_UNPARSED = object()
+
 
 class TweetComponent(ABC):
     def __init__(self, component):
@@ -148,82 +153,97 @@ class RetweetHeader(TweetComponent):
             return False
 
 
-class RegularTweet:
-    def __init__(self, header, contents, footer):
-        self._header = header
-        self._contents = contents
-        self._footer = footer
+class TweetRecord(NamedTuple):
+    """A decomposed tweet. quoted is set when this tweet replies to (quotes) another one"""
+    name: Optional[str]
+    username: Optional[str]
+    date: Optional[str]
+    retweet_count: Optional[int]
+    like_count: Optional[int]
+    text: str
+    embed_titles: tuple[str, ...]
+    quoted: Optional["TweetRecord"] = None
 
     def _content_to_ssml(self):
-        text_content = [item for item in self._contents if isinstance(item, (Text, FakeLink))]
-
-        text = ' '.join([get_text_content(item.component, nl_char=" ") for item in text_content]).strip()
-
-        text = re.sub(r"https://t.co/\w+", "", text)
-
-        if text:
-            yield tags.PText(text)
-
-        if len(embeds := [item for item in self._contents if isinstance(item, Embed)]) > 0:
-            for embed in embeds:
-                if (title := embed.title):
-                    yield tags.PText(f"Linking to: {title}.")
+        if self.text:
+            yield tags.PText(self.text)
+        for title in self.embed_titles:
+            yield tags.PText(f"Linking to: {title}.")
 
     def to_ssml(self):
+        if self.quoted is None:
+            return [
+                tags.Break(time="500ms"),
+                tags.PSText(f"Tweet by {self.username}:"),
+                *self._content_to_ssml(),
+                tags.Break(time="500ms"),
+            ]
         return [
             tags.Break(time="500ms"),
-            tags.PSText(f"Tweet by {self.username}:"),
-            *list(self._content_to_ssml()),
+            tags.PSText(f"Tweet by {self.quoted.username}:"),
+            *self.quoted._content_to_ssml(),
+            tags.PSText(f"To which {self.username} replied:"),
+            *self._content_to_ssml(),
             tags.Break(time="500ms"),
         ]
 
-    @property
-    def name(self):
-        if not self._header:
-            return None
-        return self._header.component.find_all("span")[0].text.strip()
+    def to_dict(self):
+        return {**self._asdict(), "quoted": self.quoted.to_dict() if self.quoted else None}
 
-    @property
-    def username(self):
-        if not self._header:
-            return None
-        return self._header.component.find_all("span")[-1].text.strip()
 
-    @property
-    def date(self):
-        if not self._footer:
-            return None
-        return self._footer.component.div.find_all("p")[0].text.strip()
+def _count(span) -> int:
+    return int(span.span.text.replace(",", ""))
 
-    @property
-    def retweet_count(self):
-        if not self._footer:
-            return None
-        spans = self._footer.component.div.find_all("span", recursive=False)
-        if len(spans) == 0:
-            return 0
 
-        if len(spans) == 2:
-            return int(spans[0].span.text.replace(",", ""))
+class RegularTweet:
+    def __init__(self, header, contents, footer):
+        self._header = header
+        self._contents = contents
+        self._footer = footer
+
+    def _get_text(self) -> str:
+        text_content = [item for item in self._contents if isinstance(item, (Text, FakeLink))]
+        text = ' '.join([get_text_content(item.component, nl_char=" ") for item in text_content]).strip()
+        return _tco_re.sub("", text)
 
-        if "Likes" in spans[0].text:
-            return 0
-        return int(spans[0].span.text.replace(",", ""))
+    def _footer_div(self):
+        # As Footer.match_component reads it
+        component = self._footer.component
+        return component if component.name == "div" else component.div
 
-    @property
-    def like_count(self):
+    def _get_counts(self) -> tuple[Optional[int], Optional[int]]:
+        """Retweets and likes; the footer holds a span for each one that is not zero"""
         if not self._footer:
+            return None, None
+        spans = self._footer_div().find_all("span", recursive=False)
+        try:
+            if len(spans) == 0:
+                return 0, 0
+            if len(spans) == 2:
+                return _count(spans[0]), _count(spans[1])
+            if "Likes" in spans[0].text:
+                return 0, _count(spans[0])
+            return _count(spans[0]), 0
+        except (AttributeError, ValueError):
+            return None, None
+
+    def _get_date(self) -> Optional[str]:
+        if not self._footer or not (ps := self._footer_div().find_all("p")):
             return None
-        spans = self._footer.component.div.find_all("span", recursive=False)
-        if len(spans) == 0:
-            return 0
-
-        if len(spans) == 2:
-            return int(spans[1].span.text.replace(",", ""))
-
-        if "Likes" in spans[0].text:
-            return int(spans[0].span.text.replace(",", ""))
-        return 0
+        return ps[0].text.strip()
+
+    def to_record(self, quoted: Optional[TweetRecord] = None) -> TweetRecord:
+        header_spans = self._header.component.find_all("span") if self._header else []
+        retweet_count, like_count = self._get_counts()
+        return TweetRecord(
+            name=header_spans[0].text.strip() if header_spans else None,
+            username=header_spans[-1].text.strip() if header_spans else None,
+            date=self._get_date(),
+            retweet_count=retweet_count,
+            like_count=like_count,
+            text=self._get_text(),
+            embed_titles=tuple(title for item in self._contents if isinstance(item, Embed) and (title := item.title)),
+            quoted=quoted)
 
 
 class QuoteTweet(RegularTweet):
@@ -231,18 +251,14 @@ class QuoteTweet(RegularTweet):
         super().__init__(header, contents, footer)
         self._quoted_tweet = quoted_tweet
 
-    def to_ssml(self):
-        return [
-            tags.Break(time="500ms"),
-            tags.PSText(f"Tweet by {self._quoted_tweet.username}:"),
-            *list(self._quoted_tweet._content_to_ssml()),
-            tags.PSText(f"To which {self.username} replied:"),
-            *list(self._content_to_ssml()),
-            tags.Break(time="500ms"),
-        ]
+    def to_record(self, quoted: Optional[TweetRecord] = None) -> TweetRecord:
+        return super().to_record(self._quoted_tweet.to_record())
 
 
 class Tweet(ContentItemABC):
+    def __init__(self, component, to_item):
+        super().__init__(component, to_item)
+        self._record: Union[Optional[TweetRecord], object] = _UNPARSED
 
     tweet_components = [
         Footer,
@@ -331,15 +347,23 @@ class Tweet(ContentItemABC):
             footer
         )
 
+    @property
+    def record(self) -> Optional[TweetRecord]:
+        """The tweet, decomposed on first use. None when it is malformed"""
+        if self._record is _UNPARSED:
+            try:
+                self._record = Tweet.to_tweet(self._component).to_record()
+            except RuntimeError:
+                self._record = None
+        return self._record     # type: ignore
+
     def get_ssml(self):
-        try:
-            tweet = Tweet.to_tweet(self._component)
-            return tweet.to_ssml()
-        except RuntimeError:
+        if (record := self.record) is None:
             return [
                 tags.Break(time="500ms"),
                 tags.PSText(f"Broken tweet: Fix me.")
             ]
+        return record.to_ssml()
 
     def get_description(self):
         return [
@@ -348,16 +372,13 @@ class Tweet(ContentItemABC):
 
     @staticmethod
     def match_component(component):
-        if not hasattr(component, "attrs"):
+        if (features := node_features(component)) is None:
             return False
 
-        if "class" in component.attrs and "tweet" in component["class"]:    # Directly received
+        if "tweet" in features.classes:    # Directly received
             return True
 
-        if component.name == "div" and any([
-                img["alt"].startswith("Twitter avatar for")
-                for img in component.find_all("img")
-                if "alt" in img.attrs and img["alt"]]):
+        if component.name == "div" and any(alt.startswith("Twitter avatar for") for alt in features.img_alts):
             return True
 
         return False
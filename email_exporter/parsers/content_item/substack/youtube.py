@@ -5,6 +5,7 @@ from ... import description_item
 
 
 class Youtube(ContentItemABC):
+    match_tags = frozenset({"a"})
 
     def _get_youtube_video_info(self, video_id):
         res = requests.get("https://www.youtube.com/oembed", params={
@@ -3,6 +3,8 @@ from ... import description_item
 
 
 class ContentImage(ContentItemABC):
+    match_tags = frozenset({"td"})
+
     def get_ssml(self):
         return []
 
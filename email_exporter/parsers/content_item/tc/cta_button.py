@@ -3,6 +3,7 @@ from ..util import is_only_link
 
 
 class CtaButton(NullContentItem):
+    match_tags = frozenset({"p"})
 
     @staticmethod
     def match_component(component):
@@ -4,6 +4,8 @@ from ... import description_item
 
 
 class Header(ContentItemABC):
+    match_tags = frozenset()
+
     def __init__(self, component, to_item, inbox_item=None):
         super().__init__(component, to_item)
         assert inbox_item, "Header requires inbox_item parameter"
@@ -3,6 +3,8 @@ from ... import description_item
 
 
 class Image(ContentItemABC):
+    match_tags = frozenset({"div"})
+
     def get_ssml(self):
         return []
 
@@ -1,24 +1,22 @@
-from functools import reduce
-import re
+from ..text_normaliser import normalise
+from .node_features import node_features
+
+# Kept in the tag's __dict__: attribute lookups on a Tag fall back to searching its children
+_TEXT_MEMO = "_text_content"
 
 
 def sanitise(text, nl_char):
-    return reduce(
-        lambda txt, c: txt.replace(*c),
-        [
-            ("\n", nl_char), ("\r", ""),
-            ("—", "-"), ("\xa0", " "), ("–", "-"),
-            ("”", '"'), ("“", '"'),
-            ("‘", "'"), ("’", "'"),
-            ("…", "...")
-        ],
-        text).strip()
+    return normalise(text, nl_char)
 
 
 def get_text_content(component, nl_char=""):
     if not hasattr(component, "get_text"):
-        return sanitise(component, nl_char=nl_char)
-    return sanitise(component.get_text(" ", strip=True), nl_char=nl_char)
+        return normalise(component, nl_char)
+    # Asked for repeatedly by matching, ssml, descriptions and reprs; the soup does not change while parsing
+    memo = component.__dict__.setdefault(_TEXT_MEMO, {})
+    if nl_char not in memo:
+        memo[nl_char] = normalise(component.get_text(" ", strip=True), nl_char)
+    return memo[nl_char]
 
 
 def is_only_link(component):
@@ -35,6 +33,5 @@ def get_link_texts(component):
 
 
 def is_tweet(component):
-    spans = component.find_all("span")
-    return any(re.match(r"\d*\sRetweets", s.get_text()) for s in spans) and\
-        any(re.match(r"\d*\sLikes", s.get_text()) for s in spans)
+    features = node_features(component)
+    return features is not None and features.has_retweets and features.has_likes
@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
-from typing import Union
+from typing import Optional, Union
 import bs4
+import copy
 
 
 class DescriptionItemABC(ABC):
@@ -8,22 +9,32 @@ class DescriptionItemABC(ABC):
 
     def __init__(self, content: Union[bs4.element.PageElement, str]):
         self._content = content
+        # Serialised with and without hrefs, keyed by remove_href
+        self._texts: Optional[dict[bool, str]] = None
 
-    def _remove_attrs(self, component, remove_href):
-        attrs_to_keep = [attr for attr in self.attrs_to_keep if attr != "href" or not remove_href]
-        for attr in [attr for attr in component.attrs if attr not in attrs_to_keep]:
-            del component[attr]
+    def _render(self) -> dict[bool, str]:
+        if isinstance(self._content, str):
+            return {False: self._content, True: self._content}
+        if not isinstance(self._content, bs4.element.PageElement):
+            raise RuntimeError(f"Unknown description content: {type(self._content)}")
+
+        # Stripped on a copy, so the soup the content items read is left untouched
+        component = copy.copy(self._content)
+        tags = [component, *component.find_all(True)] if isinstance(component, bs4.Tag) else []
+        for tag in tags:
+            tag.attrs = {attr: value for attr, value in tag.attrs.items() if attr in self.attrs_to_keep}
+        with_href = str(component)
+        for tag in tags:
+            tag.attrs.pop("href", None)
+        return {False: with_href, True: str(component)}
 
     def to_text(self, remove_href: bool = False) -> str:
-        # TODO: this is not great. Replace with building up components, instead of deleting
-        if isinstance(self._content, bs4.element.PageElement):
-            children = [self._content, *self._content.findChildren(recursive=True)]     # type: ignore
-            for child in children:
-                self._remove_attrs(child, remove_href)
-            return str(self._content)
-        if isinstance(self._content, str):
-            return self._content
-        raise RuntimeError(f"Unknown description content: {type(self._content)}")
+        if self._texts is None:
+            self._texts = self._render()
+        return self._texts[remove_href]
+
+    def text_length(self, remove_href: bool = False) -> int:
+        return len(self.to_text(remove_href))
 
     @property
     @abstractmethod
@@ -1,85 +1,108 @@
-from typing import Optional
+from typing import Iterable, Iterator, Optional
 from email_exporter.inbox import InboxItem
 from .content_item import ContentItemABC
+from .description_item import DescriptionItemABC
 from .item_emitter import ItemEmitter
 from .parser_abc import ParserABC
-from functools import reduce
-from ssml import SpeechBuilder, tags, SsmlTagABC, RawText
-from .parsed_item import ParsedItem
-
-
-class PronunciationGuide:
-    pronunciation_replacements = [
-        ("gergely", True, lambda s: tags.Phoneme(RawText(s), alphabet="x-sampa", ph="gergeI")),
-        ("orosz", True, lambda s: tags.Phoneme(RawText(s), alphabet="x-sampa", ph="Or\\:\\os"))
-    ]
-
-    def force_pronunciation(self, ssml: SsmlTagABC):
-        for text, ignore_case, replacer in self.pronunciation_replacements:
-            ssml = ssml.replace_text(text, replacer, ignore_case=ignore_case)
-        return ssml
+from .code_fingerprint import code_fingerprint
+from collections import defaultdict
+from email_exporter.pronunciation_provider import PronunciationGuide
+from ssml import MinifyStats, SpeechBuilder, SsmlTagABC, minify_tags
+from .parsed_item import ParsedItem, StreamedParsedItem
+
+
+def _subclasses(cls: type) -> list[type]:
+    """Every class deriving from cls, directly or not, in a stable order"""
+    subclasses: set[type] = set()
+    stack = [cls]
+    while stack:
+        subclass: type
+        for subclass in stack.pop().__subclasses__():
+            if subclass not in subclasses:
+                subclasses.add(subclass)
+                stack.append(subclass)
+    return sorted(subclasses, key=lambda c: (c.__module__, c.__qualname__))
 
 
 class EmitterParser(ParserABC):
-    def __init__(self, logger, emitter: ItemEmitter):
+    def __init__(self, logger, emitter: ItemEmitter, pronunciation_guide: Optional[PronunciationGuide] = None):
         self._logger = logger
         self._emitter = emitter
-        self._pronunciation_guide = PronunciationGuide()
-        self.speech_limit = 4500
+        self._pronunciation_guide = pronunciation_guide or PronunciationGuide()
         self.description_limit: Optional[int] = None
-
-    def _content_items_to_ssml(self, content_items: list[ContentItemABC]):
-        ssml_tags: list[SsmlTagABC] = reduce(
-            lambda arr, item: [*arr, *item.get_ssml()], content_items, [])
+        # Minify the tags before chunking them; adjacent breaks keep the longest ("max") or their total ("sum")
+        self.minify = True
+        self.merge_breaks = "max"
+
+    def fingerprint(self) -> str:
+        code = code_fingerprint(
+            type(self), type(self._emitter), *_subclasses(ContentItemABC), *_subclasses(DescriptionItemABC))
+        return (f"{code}:{self._pronunciation_guide.fingerprint}:{self.speech_limit}:{self.description_limit}:"
+                f"{self.minify}:{self.merge_breaks}")
+
+    def _content_items_to_ssml(self, content_items: Iterable[ContentItemABC], stats: Optional[MinifyStats] = None):
+        # Lazy, so each chunk is yielded as soon as the items it holds have been emitted
+        ssml_tags: Iterable[SsmlTagABC] = (
+            self._pronunciation_guide.force_pronunciation(tag)
+            for item in content_items
+            for tag in item.get_ssml()
+        )
+        if self.minify:
+            ssml_tags = minify_tags(ssml_tags, stats, self.merge_breaks)
 
         def convert(_ssml_tags: list[SsmlTagABC]):
             speech = SpeechBuilder()
             for item in _ssml_tags:
                 speech.add_tag(item)
-            ssml = speech.speak()
-            ssml = self._pronunciation_guide.force_pronunciation(ssml)
-            return ssml.to_string()
-
-        i = 0
-        while i < len(ssml_tags):
-            j = i
-            while len(convert(ssml_tags[i:j])) <= self.speech_limit and j <= len(ssml_tags):
-                j += 1
-            if i == j:
+            return speech.speak().to_string()
+
+        # Tags serialise independently of each other, so a chunk is as long as its tags plus the <speak> wrapper
+        frame_size = SpeechBuilder().speak().byte_length()
+        chunk: list[SsmlTagABC] = []
+        chunk_size = frame_size
+        for tag in ssml_tags:
+            tag_size = tag.byte_length()
+            if frame_size + tag_size > self.speech_limit:
                 raise Exception("speech item is too long")
-            yield convert(ssml_tags[i:j - 1])
-            i = j - 1
+            if chunk_size + tag_size > self.speech_limit:
+                yield convert(chunk)
+                chunk = []
+                chunk_size = frame_size
+            chunk.append(tag)
+            chunk_size += tag_size
 
-    def _content_items_to_description(self, content_items: list[ContentItemABC], content_type_to_remove: set[str]):
-        return [
-            description
-            for item in content_items
-            for description in item.get_description()
-            if description.content_type not in content_type_to_remove
-        ]
+        if chunk:
+            yield convert(chunk)
 
-    def _get_description(self, content_items, inbox_item):
+    def _content_items_to_description(self, content_items: list[ContentItemABC]) -> list[DescriptionItemABC]:
+        return [description for item in content_items for description in item.get_description()]
+
+    def _get_description(self, content_items: list[ContentItemABC], inbox_item: InboxItem) -> list[str]:
 
         title = f"<h1>{inbox_item.title}</h1>"
 
+        # Each description is rendered once; the search below only adds up the cached lengths
+        all_descriptions = self._content_items_to_description(content_items)
+
         remove_href = False
-        content_type_to_remove = set()
+        content_type_to_remove: set[str] = set()
 
-        while len(descriptions := self._content_items_to_description(content_items, content_type_to_remove)) > 0:
-            desc_text = [d.to_text(remove_href) for d in descriptions]
+        while len(descriptions := [d for d in all_descriptions if d.content_type not in content_type_to_remove]) > 0:
+            # The joined length: the title, each description and a newline before each of them
+            length = len(title) + sum(d.text_length(remove_href) + 1 for d in descriptions)
 
-            if not self.description_limit or len('\n'.join([title, *desc_text])) <= self.description_limit:
-                return desc_text
+            if not self.description_limit or length <= self.description_limit:
+                return [d.to_text(remove_href) for d in descriptions]
 
             remove_href = not remove_href
 
             if remove_href:
                 continue
 
-            len_by_content_type = reduce(lambda d, i: {**d, i.content_type: 0}, descriptions, {})
+            len_by_content_type: dict[str, int] = defaultdict(int)
 
-            for desc, text in zip(descriptions, desc_text):
-                len_by_content_type[desc.content_type] += len(text)
+            for desc in descriptions:
+                len_by_content_type[desc.content_type] += desc.text_length(True)
 
             next_content_type_to_remove = max(len_by_content_type, key=lambda k: len_by_content_type[k])
 
@@ -88,25 +111,55 @@ class EmitterParser(ParserABC):
         return [title]
 
     def parse(self, inbox_item: InboxItem):
-        assert inbox_item.soup is not None, "Soup not provided"
-
-        self._logger.info(f"Getting items for {inbox_item}")
-
-        items = list(self._emitter.get_items(inbox_item))
-
-        if len(items) == 0:
-            # TODO: investigate why this happens
-            raise Exception("No items were generated from inbox_item")
+        streamed = self.parse_stream(inbox_item)
+        ssml = list(streamed.ssml)
+        return ParsedItem(ssml, streamed.description)
 
-        self._logger.info(f"Created {len(items)} content items")
+    def parse_stream(self, inbox_item: InboxItem) -> StreamedParsedItem:
+        strained = False
+        if self._emitter.strainer is not None and not inbox_item.parsed:
+            strained = inbox_item.strain(self._emitter.strainer)
+            if not strained:
+                self._logger.info(f"Content region not found; parsing the whole of {inbox_item}")
 
-        ssml = list(self._content_items_to_ssml(items))
-
-        self._logger.info(f"Created {len(ssml)} SSML lines; total length: {sum(map(len, ssml))}")
-
-        description = self._get_description(items, inbox_item)
-
-        self._logger.info(
-            f"Created {len(description)} description lines; total length: {sum(map(len, description))}")
+        assert inbox_item.soup is not None, "Soup not provided"
 
-        return ParsedItem(ssml, description)
+        items: list[ContentItemABC] = []
+        lengths: list[int] = []
+        stats = MinifyStats()
+
+        def collect_items() -> Iterator[ContentItemABC]:
+            self._logger.info(f"Getting items for {inbox_item}")
+            for item in self._emitter.get_items(inbox_item):
+                items.append(item)
+                yield item
+
+            if strained and not items:
+                # The emitter may fall back to markup outside the strained region
+                self._logger.info(f"No items in the content region; parsing the whole of {inbox_item}")
+                inbox_item.soup = None
+                for item in self._emitter.get_items(inbox_item):
+                    items.append(item)
+                    yield item
+
+        def stream_ssml() -> Iterator[str]:
+            for chunk in self._content_items_to_ssml(collect_items(), stats):
+                lengths.append(len(chunk))
+                yield chunk
+
+            if len(items) == 0:
+                # TODO: investigate why this happens
+                raise Exception("No items were generated from inbox_item")
+
+            self._logger.info(f"Created {len(items)} content items")
+            self._logger.info(f"Created {len(lengths)} SSML lines; total length: {sum(lengths)}")
+            if self.minify:
+                self._logger.info(f"Minified SSML by {stats.saved} characters ({stats.before} -> {stats.after})")
+
+        def get_description() -> list[str]:
+            description = self._get_description(items, inbox_item)
+            self._logger.info(
+                f"Created {len(description)} description lines; total length: {sum(map(len, description))}")
+            return description
+
+        return StreamedParsedItem(stream_ssml(), get_description)
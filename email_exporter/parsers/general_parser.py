@@ -1,28 +1,22 @@
 from .parser_abc import ParserABC
 # from .content_item import ContentItem
-from ssml import SpeechBuilder
+from ssml import RawText, SpeechBuilder, tags
 # import bleach
 # from bs4 import BeautifulSoup
 from functools import reduce
 from .parsed_item import ParsedItem
+from .text_normaliser import normalise
 
 
 class GeneralParser(ParserABC):
     def __init__(self, logger):
         self._logger = logger
-        self.speech_limit = 4500
+
+    def fingerprint(self) -> str:
+        return f"{super().fingerprint()}:{self.speech_limit}"
 
     def _sanitise(self, text):
-        return reduce(
-            lambda txt, c: txt.replace(*c),
-            [
-                ("\n", ""), ("\r", ""),
-                ("—", "-"), ("\xa0", " "), ("–", "-"),
-                ("”", '"'), ("“", '"'),
-                ("‘", "'"), ("’", "'"),
-                ("…", "...")
-            ],
-            text).strip()
+        return normalise(text)
 
     def _remove_forward_header(self, lines):
         if "forward" not in lines[0].lower():
@@ -42,26 +36,34 @@ class GeneralParser(ParserABC):
         return lines[:cpr_line]
 
     def _to_ssms(self, lines, headers):
-        def build_speech(_lines):
+        headers = set(headers)
+
+        def build_speech(_line_tags):
             speech = SpeechBuilder()
-            for line in _lines:
-                if line in headers:
-                    speech.pause(time="1.5s")
-                else:
-                    speech.pause(time="0.75s")
-                speech.add_text(line)
-            return speech
+            for pause, text in _line_tags:
+                speech.add_tag(pause)
+                speech.add_tag(text)
+            return speech.speak().to_string()
+
+        line_tags = [
+            (tags.Break(time="1.5s" if line in headers else "0.75s"), RawText(line))
+            for line in lines
+        ]
+        # A speech is as long as its tags plus the <speak> wrapper, so each line is only measured once
+        frame_size = SpeechBuilder().speak().byte_length()
+        size = frame_size
 
         last_built = 0
-        for i, line in enumerate(lines):
-            speech = build_speech(lines[last_built:i + 1])
-            if len(speech.speak()) > self.speech_limit:
+        for i, (pause, text) in enumerate(line_tags):
+            size += pause.byte_length() + text.byte_length()
+            if size > self.speech_limit:
                 if last_built == i - 1:
                     raise Exception("Single section too long")
 
-                yield build_speech(lines[last_built:i]).speak().to_string()
+                yield build_speech(line_tags[last_built:i])
                 last_built = i
-        yield build_speech(lines[last_built:]).speak().to_string()
+                size = frame_size + pause.byte_length() + text.byte_length()
+        yield build_speech(line_tags[last_built:])
 
     def parse(self, content_item):
         assert content_item.soup is not None
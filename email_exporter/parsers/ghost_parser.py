@@ -1,5 +1,6 @@
 from .item_emitter import ItemEmitter
 from .content_item import ContentItem
+from bs4 import SoupStrainer
 
 
 class GhostItemEmitter(ItemEmitter):
@@ -22,6 +23,8 @@ class GhostItemEmitter(ItemEmitter):
     - footer, footer-powered: footer sections
     """
 
+    strainer = SoupStrainer("td", class_=lambda c: c and "post-content" in c)
+
     def get_items(self, inbox_item):
         # Find the post content section - Ghost uses "post-content-sans-serif" class
         post_content = inbox_item.soup.find("td", class_="post-content-sans-serif")
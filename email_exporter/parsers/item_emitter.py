@@ -1,10 +1,14 @@
 from abc import ABC, abstractmethod
-from typing import Generator
+from bs4 import SoupStrainer
+from typing import Generator, Optional
 from email_exporter.inbox import InboxItem
 from email_exporter.parsers.content_item import ContentItemABC
 
 
 class ItemEmitter(ABC):
+    # The region of the email get_items reads; when set, only that region is parsed into the soup
+    strainer: Optional[SoupStrainer] = None
+
     @abstractmethod
     def get_items(self, inbox_item: InboxItem) -> Generator[ContentItemABC, None, None]:
         raise NotImplementedError()
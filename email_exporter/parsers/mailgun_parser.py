@@ -1,5 +1,6 @@
 from .item_emitter import ItemEmitter
 from .content_item import ContentItem
+from bs4 import SoupStrainer
 
 
 class MailgunItemEmitter(ItemEmitter):
@@ -12,6 +13,8 @@ class MailgunItemEmitter(ItemEmitter):
     - Headers, paragraphs, lists, blockquotes, and images as content
     """
 
+    strainer = SoupStrainer("td", class_=lambda c: c and "post-content" in c)
+
     def get_items(self, inbox_item):
         # Find the post content section
         post_content = inbox_item.soup.find("td", class_="post-content")
@@ -0,0 +1,98 @@
+from email_exporter.cache import BlobCache
+from email_exporter.config import Config
+from email_exporter.inbox import InboxItem
+from logging import Logger
+from typing import Optional
+from .parsed_item import ParsedItem, StreamedParsedItem
+from .parser_abc import ParserABC
+import hashlib
+import json
+
+
+class ParseCache:
+    """
+    Content addressed cache of parse results, keyed by the email's content and the parser's fingerprint: a change to
+    the parser's code, its settings or its pronunciations makes a new key, so stale results are never read.
+
+    Configured with PARSE_CACHE ("disk"; disabled when not set), PARSE_CACHE_FOLDER, PARSE_CACHE_MAX_SIZE_MB and
+    PARSE_CACHE_MAX_AGE_DAYS.
+    """
+
+    def __init__(self, config: Config, logger: Logger) -> None:
+        self._logger = logger
+        self._cache = BlobCache(config, logger, "parse", "parse cache")
+
+    @property
+    def enabled(self) -> bool:
+        return self._cache.enabled
+
+    @staticmethod
+    def key(parser: ParserABC, inbox_item: InboxItem) -> str:
+        digest = hashlib.sha256()
+        # The title is part of the description; the rest of the output only depends on the bodies
+        for part in (parser.fingerprint(), inbox_item.html_parser, inbox_item.title, inbox_item.html, inbox_item.mime):
+            digest.update(part.encode())
+            digest.update(b"\0")
+        return f"{digest.hexdigest()}.json"
+
+    def get(self, key: str) -> Optional[ParsedItem]:
+        return self._cache.get(key, self._deserialise)
+
+    def put(self, key: str, parsed_item: ParsedItem) -> None:
+        if not self.enabled:
+            return
+        self._cache.put(key, json.dumps({
+            "ssml": list(parsed_item.ssml),
+            "description": parsed_item.description,
+        }).encode())
+
+    @staticmethod
+    def _deserialise(data: bytes) -> ParsedItem:
+        d = json.loads(data)
+        return ParsedItem(d["ssml"], d["description"])
+
+    def parse(self, parser: ParserABC, inbox_item: InboxItem) -> ParsedItem:
+        if not self.enabled:
+            return parser.parse(inbox_item)
+        key = self.key(parser, inbox_item)
+        if (cached := self.get(key)) is not None:
+            self._logger.info(f"Using cached parse of {inbox_item}")
+            return cached
+        parsed_item = parser.parse(inbox_item)
+        self.put(key, parsed_item)
+        return parsed_item
+
+    def parse_stream(self, parser: ParserABC, inbox_item: InboxItem) -> ParsedItem:
+        """Like parse, but a miss is streamed; it is stored once its description has been built"""
+        if not self.enabled:
+            return parser.parse_stream(inbox_item)
+        key = self.key(parser, inbox_item)
+        if (cached := self.get(key)) is not None:
+            self._logger.info(f"Using cached parse of {inbox_item}")
+            return cached
+        parsed_item = parser.parse_stream(inbox_item)
+        if not isinstance(parsed_item, StreamedParsedItem):
+            self.put(key, parsed_item)
+            return parsed_item
+
+        streamed = parsed_item
+        ssml: list[str] = []
+
+        def stream_ssml():
+            for chunk in streamed.ssml:
+                ssml.append(chunk)
+                yield chunk
+
+        def get_description() -> list[str]:
+            description = streamed.description
+            self.put(key, ParsedItem(ssml, description))
+            return description
+
+        return StreamedParsedItem(stream_ssml(), get_description)
+
+    def evict(self) -> int:
+        return self._cache.evict()
+
+    @property
+    def stats(self) -> dict[str, int]:
+        return self._cache.stats
@@ -1,3 +1,6 @@
+from typing import Callable, Iterator, Optional
+
+
 class ParsedItem:
     def __init__(self, ssml: list[str], description: list[str] = []):
         self._ssml = ssml
@@ -7,6 +10,35 @@ class ParsedItem:
     def ssml(self):
         return self._ssml
 
+    @property
+    def description(self) -> list[str]:
+        return self._description
+
     @property
     def combined_description(self):
-        return '\n'.join(self._description)
+        return '\n'.join(self.description)
+
+
+class StreamedParsedItem(ParsedItem):
+    """A ParsedItem whose SSML is produced while it is read. The chunks can be read once, and the description is only
+    available after all of them have been"""
+
+    def __init__(self, ssml: Iterator[str], get_description: Callable[[], list[str]]):
+        super().__init__([])
+        self._stream = ssml
+        self._get_description = get_description
+        self._consumed = False
+        self._description_lines: Optional[list[str]] = None
+
+    @property
+    def ssml(self) -> Iterator[str]:
+        yield from self._stream
+        self._consumed = True
+
+    @property
+    def description(self) -> list[str]:
+        if not self._consumed:
+            raise RuntimeError("The description is only available once the SSML has been read")
+        if self._description_lines is None:
+            self._description_lines = self._get_description()
+        return self._description_lines
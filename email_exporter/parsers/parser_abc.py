@@ -1,12 +1,28 @@
 from abc import ABC
 
 from email_exporter.inbox import InboxItem
+from .code_fingerprint import code_fingerprint
 from .parsed_item import ParsedItem
 
 
+# Cloud TTS rejects requests over 5000 bytes
+DEFAULT_SPEECH_LIMIT = 5000
+
+
 class ParserABC(ABC):
+    # The largest SSML chunk, in UTF-8 bytes
+    speech_limit: int = DEFAULT_SPEECH_LIMIT
+
     def __init__(self, *args, **kwargs):
         pass
 
     def parse(self, content_item: InboxItem) -> ParsedItem:
         raise NotImplementedError()
+
+    def parse_stream(self, content_item: InboxItem) -> ParsedItem:
+        """Like parse, but the SSML may be produced while it is read. Parsers that can't stream parse up front"""
+        return self.parse(content_item)
+
+    def fingerprint(self) -> str:
+        """Changes whenever the same email could be parsed differently: with the parser's code or its settings"""
+        return code_fingerprint(type(self))
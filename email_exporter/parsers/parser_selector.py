@@ -3,6 +3,7 @@ from typing import Type
 
 from email_exporter.inbox import InboxItem
 from email_exporter.parsers.parser_abc import ParserABC
+from email_exporter.pronunciation_provider import PronunciationProvider
 from .tc_parser import TcItemEmitter
 from .substack_parser import SubstackItemEmitter
 from .mailgun_parser import MailgunItemEmitter
@@ -13,8 +14,9 @@ from .item_emitter import ItemEmitter
 
 
 class ParserSelector:
-    def __init__(self, logger: Logger):
+    def __init__(self, logger: Logger, pronunciation_provider: PronunciationProvider):
         self._logger = logger
+        self._pronunciation_provider = pronunciation_provider
         self.emitters_by_domain: dict[str, Type[ItemEmitter]] = {
             "techcrunch.com": TcItemEmitter,
             "substack.com": SubstackItemEmitter,
@@ -23,9 +25,9 @@ class ParserSelector:
         }
 
     def get_parser(self, content_item: InboxItem) -> ParserABC:
-        return self._get_parser(content_item.sender)
+        return self._get_parser(content_item.sender, content_item)
 
-    def _get_parser(self, sender: str) -> ParserABC:
+    def _get_parser(self, sender: str, content_item: InboxItem) -> ParserABC:
         self._logger.info(f"Selecting parser for {sender}")
 
         sender_domain = sender.split("@")[-1].rstrip(">")
@@ -33,7 +35,10 @@ class ParserSelector:
         if sender_domain in self.emitters_by_domain:
             self._logger.info(
                 f"Found emitter parser for {sender} ({sender_domain}): {self.emitters_by_domain[sender_domain]}")
-            return EmitterParser(self._logger, self.emitters_by_domain[sender_domain]())
+            return EmitterParser(
+                self._logger,
+                self.emitters_by_domain[sender_domain](),
+                self._pronunciation_provider.get_guide(content_item))
 
         self._logger.info(f"No parser found for {sender} ({sender_domain}): General parser is used")
         return GeneralParser(self._logger)
@@ -1,9 +1,13 @@
 from .item_emitter import ItemEmitter
 from .content_item import ContentItem
+from bs4 import SoupStrainer
 import re
 
 
 class SubstackItemEmitter(ItemEmitter):
+    # While parsing, the strainer sees the whole class attribute rather than each class
+    strainer = SoupStrainer("div", class_=lambda c: c is not None and any(cls.endswith("post") for cls in c.split()))
+
     def get_items(self, inbox_item):
         post_components = inbox_item.soup.find_all("div", class_=re.compile(r"post$"))
         # TODO: Handle preamble.
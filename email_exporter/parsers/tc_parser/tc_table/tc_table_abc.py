@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
 
 from email_exporter.parsers.content_item import ContentItemABC
+from email_exporter.parsers.content_item.node_features import node_features
 
 
 class TcTableABC(ABC):
@@ -19,5 +20,4 @@ class TcTableABC(ABC):
 
     @staticmethod
     def _has_n_child_of_type(_component, _type, n=1) -> bool:
-        contents_without_nl = [content for content in _component.contents if content != "\n"]
-        return len(contents_without_nl) == n and all(c.name == _type for c in contents_without_nl)
+        return node_features(_component).has_children(_type, n)      # type: ignore
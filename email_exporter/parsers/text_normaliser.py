@@ -0,0 +1,29 @@
+# Typography TTS reads out or stumbles on, mapped to plain ASCII
+_REPLACEMENTS = {
+    # Hyphens, dashes and the minus sign
+    "\u2010": "-", "\u2011": "-", "\u2012": "-", "\u2013": "-", "\u2014": "-", "\u2015": "-", "\u2212": "-",
+    # Quotes and primes
+    "\u2018": "'", "\u2019": "'", "\u201a": "'", "\u201b": "'", "\u2032": "'",
+    "\u201c": '"', "\u201d": '"', "\u201e": '"', "\u201f": '"', "\u2033": '"',
+    "\u2026": "...",
+    # No-break, fixed width and narrow spaces
+    "\xa0": " ", "\u2002": " ", "\u2003": " ", "\u2007": " ", "\u2009": " ", "\u200a": " ", "\u202f": " ",
+    # Invisible characters, including the ones newsletters pad their preview text with. The zero width joiner is
+    # kept, as it holds emoji sequences together
+    "\xad": "", "\u034f": "", "\u200b": "", "\u200c": "", "\u2060": "", "\ufeff": "",
+}
+
+
+_REPLACEMENT_ITEMS = tuple(_REPLACEMENTS.items())
+
+
+def normalise(text: str, nl_char: str = "") -> str:
+    """Replaces typographic and invisible characters, newlines with nl_char, and strips the result.
+    Most text nodes are ASCII and skip the table entirely. Otherwise each character is searched for and only the ones
+    present are replaced: in CPython this beats str.translate, which has no fast path for non-ASCII text."""
+    text = text.replace("\n", nl_char).replace("\r", "")
+    if not text.isascii():
+        for char, replacement in _REPLACEMENT_ITEMS:
+            if char in text:
+                text = text.replace(char, replacement)
+    return text.strip()
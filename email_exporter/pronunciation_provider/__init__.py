@@ -0,0 +1,2 @@
+from .pronunciation_guide import Pronunciation, PronunciationGuide                  # noqa: F401
+from .pronunciation_provider import PronunciationProvider                           # noqa: F401
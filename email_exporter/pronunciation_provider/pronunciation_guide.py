@@ -0,0 +1,96 @@
+from ssml import tags, RawText, SsmlTagABC
+from typing import Any, Iterable, Optional
+import hashlib
+import re
+
+
+class Pronunciation:
+    def __init__(self, text: str, ph: str, alphabet: str = "x-sampa", ignore_case: bool = True):
+        self.text = text
+        self.ph = ph
+        self.alphabet = alphabet
+        self.ignore_case = ignore_case
+
+    @staticmethod
+    def from_dict(text: str, value: dict[str, Any]) -> "Pronunciation":
+        return Pronunciation(
+            text,
+            value["ph"],
+            value.get("alphabet", "x-sampa"),
+            value.get("ignore_case", True))
+
+    def __repr__(self):
+        return f"Pronunciation({self.text}, {self.ph})"
+
+
+DEFAULT_PRONUNCIATIONS = [
+    Pronunciation("gergely", "gergeI"),
+    Pronunciation("orosz", "Or\\:\\os"),
+]
+
+
+def _trie_pattern(folded: Iterable[str], exact: Iterable[str]) -> str:
+    """A pattern, to be compiled ignoring case, matching the longest of the texts, with common prefixes shared so a
+    mismatch fails on its first character instead of trying every alternative. An exact text only ends a match in
+    its own case, so the pattern backtracks to a shorter rule rather than matching it in another case."""
+    trie: dict = {}
+    for text, is_exact in [*((text, False) for text in folded), *((text, True) for text in exact)]:
+        node = trie
+        for char in text.lower():
+            node = node.setdefault(char, {})
+        ends = node.setdefault("", set())
+        # None stands for a rule ignoring case, which ends here in any case
+        ends.add(text if is_exact else None)
+
+    def end_pattern(ends: set) -> str:
+        if None in ends:
+            return ""
+        # The exact texts ending on one node are all as long, as a lookbehind needs
+        return f"(?<=(?-i:{'|'.join(sorted(map(re.escape, ends)))}))"
+
+    def to_pattern(node: dict) -> str:
+        # Longer continuations first, so the longest rule wins
+        branches = [re.escape(char) + to_pattern(child) for char, child in node.items() if char]
+        if "" in node:
+            branches.append(end_pattern(node[""]))
+        return branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+
+    return to_pattern(trie)
+
+
+class PronunciationGuide:
+    """Wraps every occurrence of the rules' text in a phoneme. The rules are compiled into a single pattern (longest
+    first) and the SSML tree is rewritten in one traversal, so the number of rules barely matters.
+    When rules share a text, the later one wins; a case sensitive rule wins over one ignoring case."""
+
+    def __init__(self, pronunciations: Iterable[Pronunciation] = DEFAULT_PRONUNCIATIONS):
+        self._exact: dict[str, Pronunciation] = {}
+        self._folded: dict[str, Pronunciation] = {}
+        for pronunciation in pronunciations:
+            if not pronunciation.text:
+                continue
+            if pronunciation.ignore_case:
+                self._folded[pronunciation.text.lower()] = pronunciation
+            else:
+                self._exact[pronunciation.text] = pronunciation
+
+        rules = sorted(
+            (p.text, p.ph, p.alphabet, p.ignore_case) for p in (*self._exact.values(), *self._folded.values()))
+        # Identifies the rules, for caching what they were applied to
+        self.fingerprint = hashlib.sha256(repr(rules).encode()).hexdigest()
+
+        self._pattern: Optional[re.Pattern] = re.compile(
+            _trie_pattern(self._folded, self._exact), re.IGNORECASE) if len(self) else None
+
+    def __len__(self):
+        return len(self._exact) + len(self._folded)
+
+    def _replace(self, match: re.Match) -> SsmlTagABC:
+        text = match.group()
+        pronunciation = self._exact.get(text) or self._folded[text.lower()]
+        return tags.Phoneme(RawText(text), alphabet=pronunciation.alphabet, ph=pronunciation.ph)
+
+    def force_pronunciation(self, ssml: SsmlTagABC) -> SsmlTagABC:
+        if self._pattern is None:
+            return ssml
+        return ssml.replace_re(self._pattern, self._replace)
@@ -0,0 +1,57 @@
+from email_exporter.config import Config
+from email_exporter.inbox import InboxItem
+from google.cloud.firestore import Client as FirestoreClient
+from logging import Logger
+from .pronunciation_guide import DEFAULT_PRONUNCIATIONS, Pronunciation, PronunciationGuide
+import threading
+
+GLOBAL_DOCUMENT = "global"
+
+
+class PronunciationProvider:
+    """Pronunciation rules stored in Firestore, one document per scope: "global" for every email, the sender's domain
+    for its newsletters and the owner's address for their feed. Each field maps a word to its phoneme, as
+    {"ph": ..., "alphabet": "x-sampa", "ignore_case": true}. More specific documents take precedence, and the built in
+    rules apply when no collection is configured."""
+
+    def __init__(
+            self,
+            config: Config,
+            logger: Logger,
+            firestore_client: FirestoreClient) -> None:
+        self.collection = config.get("PRONUNCIATIONS_COLLECTION")
+        self._logger = logger
+        self._db = firestore_client
+        self._default_guide = PronunciationGuide(DEFAULT_PRONUNCIATIONS)
+        self._documents: dict[str, list[Pronunciation]] = {}
+        self._guides: dict[tuple[str, ...], PronunciationGuide] = {}
+        # Parsers run on several pipeline threads; each document is read and each guide compiled once
+        self._lock = threading.Lock()
+
+    def get_guide(self, item: InboxItem) -> PronunciationGuide:
+        if not self.collection:
+            return self._default_guide
+
+        sender_domain = item.sender.split("@")[-1].rstrip(">")
+        document_ids = tuple(key for key in (GLOBAL_DOCUMENT, sender_domain, item.owner) if key and "/" not in key)
+
+        with self._lock:
+            if document_ids not in self._guides:
+                pronunciations = [
+                    *DEFAULT_PRONUNCIATIONS,
+                    *(pronunciation for key in document_ids for pronunciation in self._get_document(key))
+                ]
+                self._guides[document_ids] = PronunciationGuide(pronunciations)
+                self._logger.info(
+                    f"Compiled {len(self._guides[document_ids])} pronunciations for ({item.owner}/{item.sender})")
+            return self._guides[document_ids]
+
+    def _get_document(self, key: str) -> list[Pronunciation]:
+        if key not in self._documents:
+            snapshot = self._db.collection(self.collection).document(key).get()
+            self._documents[key] = [
+                Pronunciation.from_dict(text, value)
+                for text, value in (snapshot.to_dict() or {}).items()
+                if isinstance(value, dict) and "ph" in value
+            ] if snapshot.exists else []
+        return self._documents[key]
@@ -1,3 +1,8 @@
 from .run import (
-    clone_collection, create_example_creator_feed, add_feed_alias, pronounce, test_voice_provider   # noqa: F401
+    clone_collection, create_example_creator_feed, add_feed_alias, parse_archive, pronounce,        # noqa: F401
+    test_voice_provider                                                                             # noqa: F401
+)
+from .benchmarks import (
+    benchmark_chunker, benchmark_html_parsers, benchmark_minify, benchmark_normaliser,              # noqa: F401
+    benchmark_pronunciation, benchmark_ssml_parse                                                   # noqa: F401
 )
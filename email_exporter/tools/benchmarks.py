@@ -0,0 +1,153 @@
+from bs4 import BeautifulSoup
+from logging import Logger
+from ssml import MinifyStats, minify_tags, parse
+from ..parsers.content_item import ContentItem, ContentItemABC
+from ..parsers.emitter_parser import EmitterParser
+from ..parsers.item_emitter import ItemEmitter
+from ..parsers.text_normaliser import normalise
+from ..pronunciation_provider import Pronunciation, PronunciationGuide
+from ..pronunciation_provider.pronunciation_guide import DEFAULT_PRONUNCIATIONS
+from typing import Callable
+import logging
+import time
+import tracemalloc
+
+
+class _ListItemEmitter(ItemEmitter):
+    def __init__(self, items: list[ContentItemABC]):
+        self._items = items
+
+    def get_items(self, inbox_item):
+        yield from self._items
+
+
+def _time(fn: Callable, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _null_logger() -> Logger:
+    logger = logging.getLogger("benchmarks")
+    logger.disabled = True
+    return logger
+
+
+def newsletter_content_items(paragraphs: int = 200) -> list[ContentItemABC]:
+    sentence = "Gergely Orosz writes about engineering culture, hiring and the state of the tech market. "
+    html = ''.join(
+        f"<h2>Section {i}</h2>" if i % 10 == 0 else f"<p>{sentence * (1 + i % 4)}</p>"
+        for i in range(paragraphs))
+    soup = BeautifulSoup(f"<div>{html}</div>", "html.parser")
+    return [ContentItem.to_item(component) for component in soup.div.children]  # type: ignore
+
+
+def benchmark_chunker(paragraphs: int = 200, repeat: int = 3):
+    items = newsletter_content_items(paragraphs)
+    parser = EmitterParser(_null_logger(), _ListItemEmitter(items))
+
+    elapsed = _time(lambda: list(parser._content_items_to_ssml(items)), repeat)
+
+    print(f"SSML chunker, {paragraphs} paragraphs, {len(list(parser._content_items_to_ssml(items)))} chunks")
+    print(f"  {elapsed * 1000:.1f}ms")
+
+
+def newsletter_html(paragraphs: int = 200) -> str:
+    """A substack shaped email, with the table layout and inline styles real newsletters carry"""
+    sentence = "Gergely Orosz writes about engineering culture, hiring and the state of the tech market. "
+    body = ''.join(
+        f"<h2 style=\"font-size: 22px\">Section {i}</h2>" if i % 10 == 0
+        else f"<p style=\"margin: 0 0 20px\">{sentence * (1 + i % 4)}<a href=\"https://example.com/{i}\">link</a></p>"
+        for i in range(paragraphs))
+    return (
+        "<html><head><style>p { color: #333 }</style></head><body>"
+        "<table role=\"presentation\" width=\"100%\"><tr><td>"
+        f"<div class=\"post typography\"><div class=\"body markup\">{body}</div></div>"
+        "</td></tr></table></body></html>")
+
+
+def _peak_memory(fn: Callable) -> int:
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def benchmark_html_parsers(paragraphs: int = 200, repeat: int = 3, html_parsers=("html.parser", "lxml")):
+    html = newsletter_html(paragraphs)
+
+    print(f"BeautifulSoup tree builders, {paragraphs} paragraphs, {len(html) // 1024}KB of html")
+    baseline = None
+    for html_parser in html_parsers:
+        elapsed = _time(lambda: BeautifulSoup(html, html_parser), repeat)
+        peak = _peak_memory(lambda: BeautifulSoup(html, html_parser))
+        baseline = baseline or elapsed
+        print(f"  {html_parser:<12} {elapsed * 1000:.1f}ms ({baseline / elapsed:.1f}x), peak {peak / 1024:.0f}KB")
+
+
+def benchmark_pronunciation(paragraphs: int = 200, rules: int = 300, repeat: int = 3):
+    items = newsletter_content_items(paragraphs)
+    ssml_tags = [tag for item in items for tag in item.get_ssml()]
+    many = PronunciationGuide([
+        *DEFAULT_PRONUNCIATIONS,
+        *(Pronunciation(f"name{i}", f"neIm{i}") for i in range(rules))
+    ])
+
+    def run(guide: PronunciationGuide):
+        return [guide.force_pronunciation(tag).to_string() for tag in ssml_tags]
+
+    two = _time(lambda: run(PronunciationGuide()), repeat)
+    hundreds = _time(lambda: run(many), repeat)
+
+    print(f"Pronunciation, {paragraphs} paragraphs")
+    print(f"  {len(DEFAULT_PRONUNCIATIONS)} rules:   {two * 1000:.1f}ms")
+    print(f"  {len(many)} rules: {hundreds * 1000:.1f}ms")
+
+
+def benchmark_normaliser(nodes: int = 100_000, repeat: int = 3):
+    # Most text nodes are plain; one in five carries typography
+    texts = [
+        f"“Node {i}” – it’s\xa0the {i % 7}th line…\n" if i % 5 == 0 else f"Plain text node number {i}\n"
+        for i in range(nodes)
+    ]
+
+    elapsed = _time(lambda: [normalise(text) for text in texts], repeat)
+
+    print(f"Text normalisation, {nodes} text nodes")
+    print(f"  {elapsed * 1000:.1f}ms")
+
+
+def benchmark_minify(paragraphs: int = 200, repeat: int = 3):
+    items = newsletter_content_items(paragraphs)
+    ssml_tags = [tag for item in items for tag in item.get_ssml()]
+    stats = MinifyStats()
+    list(minify_tags(ssml_tags, stats))
+    parser = EmitterParser(_null_logger(), _ListItemEmitter(items))
+    minified_chunks = len(list(parser._content_items_to_ssml(items)))
+    parser.minify = False
+    chunks = len(list(parser._content_items_to_ssml(items)))
+
+    elapsed = _time(lambda: list(minify_tags(ssml_tags)), repeat)
+
+    print(f"SSML minifier, {paragraphs} paragraphs")
+    print(f"  {stats.before} -> {stats.after} characters ({stats.saved / stats.before:.1%} saved)")
+    print(f"  {chunks} -> {minified_chunks} chunks, in {elapsed * 1000:.1f}ms")
+
+
+def benchmark_ssml_parse(paragraphs: int = 200, repeat: int = 3):
+    parser = EmitterParser(_null_logger(), _ListItemEmitter([]))
+    chunks = list(parser._content_items_to_ssml(newsletter_content_items(paragraphs)))
+
+    assert [parse(chunk).to_string() for chunk in chunks] == chunks, "Parsed SSML does not round trip"
+
+    from_html = _time(lambda: list(parser._content_items_to_ssml(newsletter_content_items(paragraphs))), repeat)
+    from_ssml = _time(lambda: [parse(chunk).to_string() for chunk in chunks], repeat)
+
+    print(f"Rebuilding SSML trees, {paragraphs} paragraphs, {len(chunks)} chunks")
+    print(f"  from html: {from_html * 1000:.1f}ms")
+    print(f"  from ssml: {from_ssml * 1000:.1f}ms ({from_html / from_ssml:.1f}x faster)")
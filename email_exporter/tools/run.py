@@ -5,6 +5,9 @@ from ..shared import Dependencies
 from firebase_admin import firestore
 from ..feed_management import Feed, FeedProvider
 from ..cloud import StorageProvider, TextToSpeech
+from ..backfill import BackfillParser, read_archive
+from ..config import Config
+from logging import Logger
 
 import uuid
 
@@ -77,6 +80,14 @@ def add_feed_alias():
     feed_provider.add_feed_alias("SYhLtwlSg98XUBhaPUtB", "tituszban")
 
 
+def parse_archive(folder: str):
+    deps = Dependencies.default()
+
+    backfill_parser = BackfillParser(deps.get(Config), deps.get(Logger))
+
+    print(backfill_parser.parse(read_archive(folder)))
+
+
 def test_voice_provider():
     deps = Dependencies.default()
 
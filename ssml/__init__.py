@@ -1,2 +1,5 @@
 from .builder import SpeechBuilder
 from .tags import SsmlTagABC, RawText
+from .minify import MinifyStats, minify, minify_tags
+from .reader import parse
+from .prose import to_prose
@@ -0,0 +1,124 @@
+from typing import Iterable, Iterator, Optional
+from . import tags
+import re
+
+# Tags that say nothing without content. Break, mark and audio are empty by design and always kept
+_CONTAINERS = frozenset({"p", "s", "emphasis", "prosody", "say-as", "sub", "phoneme", "lang", "voice"})
+_time_re = re.compile(r"^(\d+(?:\.\d+)?)(ms|s)$")
+_whitespace_re = re.compile(r"\s{2,}|[\t\n\r\f\v]")
+
+
+class MinifyStats:
+    """The characters going in and out of minify_tags, for reporting what a pass saved"""
+
+    def __init__(self) -> None:
+        self.before = 0
+        self.after = 0
+
+    @property
+    def saved(self) -> int:
+        return self.before - self.after
+
+    def __repr__(self):
+        return f"MinifyStats(before={self.before}, after={self.after}, saved={self.saved})"
+
+
+def _break_ms(tag: tags.SsmlTagABC) -> Optional[float]:
+    """The duration of a timed break, None for anything else"""
+    if not isinstance(tag, tags.SsmlTag) or not tag.is_tag("break"):
+        return None
+    args = tag.tag_args
+    if args.get("strength") or (match := _time_re.match(args.get("time") or "")) is None:
+        return None
+    value = float(match.group(1))
+    return value if match.group(2) == "ms" else value * 1000
+
+
+def _merged_break(breaks: list[tags.SsmlTagABC], durations: list[float], merge: str) -> tags.SsmlTagABC:
+    duration = max(durations) if merge == "max" else sum(durations)
+    # Kept as written when one of the breaks is already long enough
+    return next((tag for tag, d in zip(breaks, durations) if d == duration), None) or tags.Break(time=f"{duration:g}ms")
+
+
+def _merge_breaks(content: Iterable[tags.SsmlTagABC], merge: str) -> Iterator[tags.SsmlTagABC]:
+    """Adjacent timed breaks become one. A lone break is kept as it is"""
+    pending: list[tags.SsmlTagABC] = []
+    durations: list[float] = []
+    for tag in content:
+        if (duration := _break_ms(tag)) is not None:
+            pending.append(tag)
+            durations.append(duration)
+            continue
+        if pending:
+            yield pending[0] if len(pending) == 1 else _merged_break(pending, durations, merge)
+            pending, durations = [], []
+        yield tag
+    if pending:
+        yield pending[0] if len(pending) == 1 else _merged_break(pending, durations, merge)
+
+
+def _flatten(content: Iterable[tags.SsmlTagABC]) -> Iterator[tags.SsmlTagABC]:
+    for tag in content:
+        if isinstance(tag, tags.TagArray):
+            yield from _flatten(tag.content)
+        else:
+            yield tag
+
+
+def _minify_content(content: Iterable[tags.SsmlTagABC], merge: str) -> list[tags.SsmlTagABC]:
+    minified = (_minify(tag, merge) for tag in _flatten(content))
+    return list(_merge_breaks((tag for tag in minified if tag is not None), merge))
+
+
+def _minify(tag: tags.SsmlTagABC, merge: str) -> Optional[tags.SsmlTagABC]:
+    """The smallest tag that says the same, or None when it says nothing"""
+    if isinstance(tag, tags.RawText):
+        text = _whitespace_re.sub(" ", tag.text)
+        if not text:
+            return None
+        return tag if text == tag.text else tags.RawText(text)
+
+    if isinstance(tag, tags.TagArray):
+        content = _minify_content(tag.content, merge)
+        if all(new is old for new, old in zip(content, tag.content)) and len(content) == len(tag.content):
+            return tag
+        return tags.TagArray(content)
+
+    if not isinstance(tag, tags.SsmlTag) or tag.content is None:
+        return tag
+
+    content = _minify_content(tag.content.content, merge)
+    if tag.tag_name in _CONTAINERS and not any(not isinstance(c, tags.RawText) or c.text.strip() for c in content):
+        return None
+    # A paragraph of one sentence needs no sentence: <p><s>...</s></p> reads as <p>...</p>
+    if tag.is_tag("p") and len(content) == 1 and content[0].is_tag("s"):
+        content = list(content[0].content.content)      # type: ignore
+    elif all(new is old for new, old in zip(content, tag.content.content)) and len(content) == len(tag.content.content):
+        return tag
+    return tags.SsmlTag(content, tag.tag_name, tag.tag_args)
+
+
+def minify(tag: tags.SsmlTagABC, merge_breaks: str = "max") -> tags.SsmlTagABC:
+    """Drops what changes nothing in the speech: empty containers, sentence wrappers of single sentence paragraphs
+    and repeated whitespace, and merges adjacent breaks, keeping the longest ("max") or their total ("sum")."""
+    return _minify(tag, merge_breaks) or tags.TagArray([])
+
+
+def minify_tags(
+        ssml_tags: Iterable[tags.SsmlTagABC],
+        stats: Optional[MinifyStats] = None,
+        merge_breaks: str = "max") -> Iterator[tags.SsmlTagABC]:
+    """minify over a sequence of tags, as they are chunked: breaks are merged across neighbouring tags too.
+    Lazy, holding back at most a run of breaks"""
+    assert merge_breaks in ("max", "sum"), "Breaks are merged by their max or their sum"
+    stats = stats if stats is not None else MinifyStats()
+
+    def minified() -> Iterator[tags.SsmlTagABC]:
+        for tag in ssml_tags:
+            stats.before += len(tag)
+            if (result := _minify(tag, merge_breaks)) is not None:
+                yield from _flatten([result])
+
+    for tag in _merge_breaks(minified(), merge_breaks):
+        stats.after += len(tag)
+        yield tag
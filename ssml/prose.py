@@ -0,0 +1,58 @@
+from typing import Optional
+from . import tags
+import re
+
+# Pauses, in ms, at or over which a break is read as an ellipsis, and as a new paragraph
+_ELLIPSIS_MS = 300
+_PARAGRAPH_MS = 1000
+_STRENGTH_MS = {"none": 0, "x-weak": 100, "weak": 250, "medium": 500, "strong": 1000, "x-strong": 2000}
+_time_re = re.compile(r"^(\d+(?:\.\d+)?)(ms|s)$")
+_spaces_re = re.compile(r"\s+")
+_paragraphs_re = re.compile(r"\s*\n\s*\n\s*")
+# A paragraph left with only the ellipses of breaks next to it, which would be read out as text
+_pause_only_re = re.compile(r"^[.\s]*$")
+# Tags whose text is not what is said: sub says its alias, desc describes audio that is played instead
+_SILENT = frozenset({"desc", "mark"})
+
+
+def _pause_ms(args: dict[str, Optional[str]]) -> float:
+    if (match := _time_re.match(args.get("time") or "")) is not None:
+        value = float(match.group(1))
+        return value if match.group(2) == "ms" else value * 1000
+    return _STRENGTH_MS.get(args.get("strength") or "medium", 500)
+
+
+def _pause(ms: float) -> str:
+    if ms >= _PARAGRAPH_MS:
+        return "\n\n"
+    return " ... " if ms >= _ELLIPSIS_MS else " "
+
+
+def _write(tag: tags.SsmlTagABC, out: list[str]) -> None:
+    if isinstance(tag, tags.RawText):
+        out.append(tag.text)
+    elif isinstance(tag, tags.TagArray):
+        for child in tag.content:
+            _write(child, out)
+    elif isinstance(tag, tags.SsmlTag):
+        if tag.is_tag("break"):
+            out.append(_pause(_pause_ms(tag.tag_args)))
+        elif tag.is_tag("sub"):
+            out.append(tag.tag_args.get("alias") or "")
+        elif tag.tag_name not in _SILENT and tag.content is not None:
+            # Paragraphs and sentences keep their own lines, the rest reads inline
+            separator = "\n\n" if tag.is_tag("p") else " " if tag.is_tag("s") else ""
+            out.append(separator)
+            _write(tag.content, out)
+            out.append(separator)
+
+
+def to_prose(tag: tags.SsmlTagABC) -> str:
+    """The text of an SSML tree as plain prose, for providers that read text rather than SSML. Paragraphs are
+    separated by blank lines and breaks become pauses in the punctuation: an ellipsis, or a new paragraph for a
+    second or more. Breaks between paragraphs are left to the paragraph break. What only SSML can say, such as
+    phonemes and prosody, is read as the text it wraps."""
+    out: list[str] = []
+    _write(tag, out)
+    paragraphs = (_spaces_re.sub(" ", paragraph).strip() for paragraph in _paragraphs_re.split("".join(out)))
+    return "\n\n".join(paragraph for paragraph in paragraphs if not _pause_only_re.match(paragraph))
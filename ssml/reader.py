@@ -0,0 +1,63 @@
+from lxml import etree
+from typing import Optional
+from . import tags
+import re
+
+# tags renders text and attribute values as they are, so a literal & or < has to be escaped before lxml reads it
+_bare_lt_re = re.compile(r"<(?![A-Za-z_/])")
+_self_closing_re = re.compile(r"<([A-Za-z_][^\s<>/]*)([^<>]*?) />")
+# Prefixes tags writes on attributes, declared on the root so lxml can read them. xml is always declared
+_NAMESPACES = {
+    "xml": "http://www.w3.org/XML/1998/namespace",
+    "google": "https://cloud.google.com/text-to-speech/docs/ssml",
+}
+_PREFIXES = {f"{{{uri}}}": prefix for prefix, uri in _NAMESPACES.items()}
+_ROOT = "ssml-root"
+_ROOT_ATTRIBUTES = "".join(f' xmlns:{prefix}="{uri}"' for prefix, uri in _NAMESPACES.items() if prefix != "xml")
+# Stands in for the content of a self closing tag, which lxml can't tell apart from an empty one
+_VOID = "ssml-void"
+
+
+def _escape(ssml: str) -> str:
+    ssml = _bare_lt_re.sub("&lt;", ssml.replace("&", "&amp;")).replace("]]>", "]]&gt;")
+    if " />" in ssml:
+        ssml = _self_closing_re.sub(rf"<\1\2><{_VOID}/></\1>", ssml)
+    return f"<{_ROOT}{_ROOT_ATTRIBUTES}>{ssml}</{_ROOT}>"
+
+
+def _arg_name(name: str) -> str:
+    if not name.startswith("{"):
+        return name
+    namespace, _, local_name = name.partition("}")
+    return f"{_PREFIXES[namespace + '}']}:{local_name}"
+
+
+def _content(element) -> list[tags.SsmlTagABC]:
+    content: list[tags.SsmlTagABC] = [tags.RawText(element.text)] if element.text else []
+    for child in element:
+        content.append(_tag(child))
+        if child.tail:
+            content.append(tags.RawText(child.tail))
+    return content
+
+
+def _tag(element) -> tags.SsmlTagABC:
+    content: Optional[list[tags.SsmlTagABC]] = None
+    if len(element) != 1 or element[0].tag != _VOID or element.text:
+        content = _content(element)
+    args: dict[str, Optional[str]] = {_arg_name(name): value for name, value in element.attrib.items()}
+    return tags.SsmlTag(content, element.tag, args)
+
+
+def parse(ssml: str) -> tags.SsmlTagABC:
+    """The tree of an SSML string, such as a stored chunk, so it can be pronounced or chunked again without the email.
+    Rendering the tree gives back the string. A single tag is returned as an SsmlTag of its name, anything else as a
+    TagArray. Text that looks like markup (a < directly followed by a letter) can't be told apart from it."""
+    parser = etree.XMLParser(resolve_entities=False, huge_tree=True, remove_comments=True, remove_pis=True)
+    try:
+        root = etree.fromstring(_escape(ssml), parser)
+    except etree.XMLSyntaxError as e:
+        raise ValueError(f"Invalid SSML: {e}") from e
+
+    content = _content(root)
+    return content[0] if len(content) == 1 and isinstance(content[0], tags.SsmlTag) else tags.TagArray(content)
@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
 import re
-from typing import Callable, Generator, NewType, Optional, Union
+from typing import Callable, Generator, Iterable, NewType, Optional, Union
 
 SsmlStr = NewType("SsmlStr", str)
 
@@ -9,8 +9,51 @@ SsmlStr = NewType("SsmlStr", str)
 # Partial support for: https://docs.aws.amazon.com/polly/latest/dg/supportedtags.html
 
 class SsmlTagABC(ABC):
-    @abstractmethod
+    """A node of an SSML tree. Nodes are immutable, so each renders its string once and shares it, and its length,
+    with every tree it is part of. Replacing text returns the unchanged subtrees as they are."""
+
+    __slots__ = ("_string", "_byte_length")
+
+    _string: Optional[SsmlStr]
+    _byte_length: Optional[int]
+
+    def __init__(self) -> None:
+        object.__setattr__(self, "_string", None)
+        object.__setattr__(self, "_byte_length", None)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __len__(self) -> int:
+        return len(self.to_string())
+
+    def __bool__(self) -> bool:
+        # A tag is there even when it renders to nothing
+        return True
+
     def to_string(self) -> SsmlStr:
+        if self._string is None:
+            object.__setattr__(self, "_string", self._render())
+        return self._string     # type: ignore
+
+    def byte_length(self) -> int:
+        """The length of the rendered string in UTF-8, which is what TTS providers limit"""
+        if self._byte_length is None:
+            string = self.to_string()
+            object.__setattr__(self, "_byte_length", len(string) if string.isascii() else len(string.encode()))
+        return self._byte_length     # type: ignore
+
+    @abstractmethod
+    def _render(self) -> SsmlStr:
         raise NotImplementedError()
 
     @abstractmethod
@@ -20,21 +63,33 @@ class SsmlTagABC(ABC):
                      *, ignore_case: bool = False) -> "SsmlTagABC":
         raise NotImplementedError()
 
+    @abstractmethod
+    def replace_re(self,
+                   pattern: re.Pattern,
+                   replacer: Callable[[re.Match], "SsmlTagABC"]) -> "SsmlTagABC":
+        """Replaces every match of pattern in the text, in one pass. Tags without matches are returned as they are"""
+        raise NotImplementedError()
+
     @abstractmethod
     def is_tag(self, tag_name: str):
         raise NotImplementedError()
 
 
 class TagArray(SsmlTagABC):
-    def __init__(self, content: list[SsmlTagABC]) -> None:
-        self._content = content
+    __slots__ = ("_content",)
+
+    _content: tuple[SsmlTagABC, ...]
+
+    def __init__(self, content: Iterable[SsmlTagABC]) -> None:
+        super().__init__()
+        object.__setattr__(self, "_content", tuple(content))
 
     @property
     def content(self):
         return self._content
 
-    def to_string(self) -> SsmlStr:
-        return SsmlStr(''.join(map(lambda c: c.to_string(), self._content)))
+    def _render(self) -> SsmlStr:
+        return SsmlStr(''.join([c.to_string() for c in self._content]))
 
     @classmethod
     def from_array_or_list(cls, tag_array_or_list: "TagArrayOrList") -> Optional["TagArray"]:
@@ -48,15 +103,25 @@ class TagArray(SsmlTagABC):
             return TagArray(tag_array_or_list)
         raise TypeError(f"Invalid type for tag, array or list: {type(tag_array_or_list)}")
 
+    def _with_content(self, content: list[SsmlTagABC]) -> "TagArray":
+        if all(new is old for new, old in zip(content, self._content)):
+            return self
+        return TagArray(content)
+
     def replace_text(self,
                      text: str,
                      replacer: Callable[[str], "SsmlTagABC"],
                      *, ignore_case: bool = False) -> "SsmlTagABC":
-        return TagArray([
+        return self._with_content([
             tag.replace_text(text, replacer, ignore_case=ignore_case)
             for tag in self._content
         ])
 
+    def replace_re(self,
+                   pattern: re.Pattern,
+                   replacer: Callable[[re.Match], "SsmlTagABC"]) -> "SsmlTagABC":
+        return self._with_content([tag.replace_re(pattern, replacer) for tag in self._content])
+
     def is_tag(self, tag_name: str):
         return False
 
@@ -65,20 +130,28 @@ TagArrayOrList = Union[Optional[SsmlTagABC], Optional[TagArray], list[SsmlTagABC
 
 
 class RawText(SsmlTagABC):
+    __slots__ = ("_text",)
+
+    _text: str
+
     def __init__(self, text: str) -> None:
-        self._text = text
+        super().__init__()
+        object.__setattr__(self, "_text", text)
+
+    @property
+    def text(self) -> str:
+        return self._text
 
     def _santise(self, text: str) -> SsmlStr:
         return SsmlStr(text)     # TODO: sanitise user text
 
-    def to_string(self) -> SsmlStr:
+    def _render(self) -> SsmlStr:
         return self._santise(self._text)
 
     def replace_text(self,
                      text: str,
                      replacer: Callable[[str], "SsmlTagABC"],
                      *, ignore_case: bool = False) -> "SsmlTagABC":
-        # TODO: support replace_re
         def _split(spliter: str, original_text: str) -> Generator[tuple[str, bool], None, None]:
             spliter = spliter.lower() if ignore_case else spliter
             search_text = original_text.lower() if ignore_case else original_text
@@ -94,7 +167,7 @@ class RawText(SsmlTagABC):
                     search_text = search_text[i:]
             yield (original_text, False)
 
-        if (splt := list(_split(text, self._text))) == 0:
+        if len(splt := list(_split(text, self._text))) == 1:
             return self
 
         replaced_content: list[SsmlTagABC] = []
@@ -105,59 +178,104 @@ class RawText(SsmlTagABC):
                 replaced_content.append(replacer(text))
         return TagArray(replaced_content)
 
+    def replace_re(self,
+                   pattern: re.Pattern,
+                   replacer: Callable[[re.Match], "SsmlTagABC"]) -> "SsmlTagABC":
+        replaced_content: list[SsmlTagABC] = []
+        end = 0
+        for match in pattern.finditer(self._text):
+            if match.start() > end:
+                replaced_content.append(RawText(self._text[end:match.start()]))
+            replaced_content.append(replacer(match))
+            end = match.end()
+
+        if not replaced_content:
+            return self
+        if end < len(self._text):
+            replaced_content.append(RawText(self._text[end:]))
+        return TagArray(replaced_content)
+
     def is_tag(self, tag_name: str):
         return False
 
 
 class SsmlTag(SsmlTagABC):
+    __slots__ = ("_content", "_tag_name", "_tag_args")
+
+    _content: Optional[TagArray]
+    _tag_name: str
+    _tag_args: dict[str, Optional[str]]
+
     def __init__(self, content: TagArrayOrList, tag_name: str, tag_args: dict[str, Optional[str]]):
-        self._content = TagArray.from_array_or_list(content)
-        self._tag_name = tag_name
-        self._tag_args = tag_args
+        super().__init__()
+        object.__setattr__(self, "_content", TagArray.from_array_or_list(content))
+        object.__setattr__(self, "_tag_name", tag_name)
+        # Copied, so the caller's dictionary can't change the tag
+        object.__setattr__(self, "_tag_args", dict(tag_args))
 
-    def to_string(self) -> SsmlStr:
-        args_to_str = ' '.join(["", *[f'{key}="{value}"' for key, value in self._tag_args.items() if value]])
+    @property
+    def content(self) -> Optional[TagArray]:
+        return self._content
+
+    @property
+    def tag_name(self) -> str:
+        return self._tag_name
+
+    @property
+    def tag_args(self) -> dict[str, Optional[str]]:
+        return dict(self._tag_args)
+
+    def _render(self) -> SsmlStr:
+        args_to_str = ''.join([f' {key}="{value}"' for key, value in self._tag_args.items() if value])
 
-        if self._content:
-            return SsmlStr("<{tag}{args}>{content}</{tag}>".format(
-                tag=self._tag_name,
-                args=args_to_str,
-                content=self._content.to_string()
-            ))
+        if self._content is not None:
+            return SsmlStr(f"<{self._tag_name}{args_to_str}>{self._content.to_string()}</{self._tag_name}>")
 
-        return SsmlStr("<{tag}{args} />".format(
-            tag=self._tag_name,
-            args=args_to_str,
-        ))
+        return SsmlStr(f"<{self._tag_name}{args_to_str} />")
+
+    def _with_content(self, content: SsmlTagABC) -> "SsmlTagABC":
+        if content is self._content:
+            return self
+        return SsmlTag(content, self._tag_name, self._tag_args)
 
     def replace_text(self,
                      text: str,
                      replacer: Callable[[str], "SsmlTagABC"],
                      *, ignore_case: bool = False) -> "SsmlTagABC":
-        if not self._content:
+        if self._content is None:
             return self
 
-        return SsmlTag(
-            self._content.replace_text(text, replacer, ignore_case=ignore_case),
-            self._tag_name,
-            self._tag_args
-        )
+        return self._with_content(self._content.replace_text(text, replacer, ignore_case=ignore_case))
+
+    def replace_re(self,
+                   pattern: re.Pattern,
+                   replacer: Callable[[re.Match], "SsmlTagABC"]) -> "SsmlTagABC":
+        if self._content is None:
+            return self
+
+        return self._with_content(self._content.replace_re(pattern, replacer))
 
     def is_tag(self, tag_name: str):
         return self._tag_name == tag_name
 
 
 class Speak(SsmlTag):
+    __slots__ = ()
+
     def __init__(self, content: TagArrayOrList):
         super().__init__(content, "speak", {})
 
 
 class Empty(SsmlTag):
+    __slots__ = ()
+
     def __init__(self, tag_name: str, tag_args: dict[str, Optional[str]]):
         super().__init__([], tag_name, tag_args)
 
 
 class Break(Empty):
+    __slots__ = ()
+
     def __init__(self, *, time: Optional[str] = None, strength: Optional[str] = None):
         assert time or strength, "Either time or strength must be set"
         super().__init__("break", {
@@ -167,6 +285,8 @@ class Break(Empty):
 
 
 class SayAs(SsmlTag):
+    __slots__ = ()
+
     VALID_INTERPRET_AS = (
         "currency",
         "telephone",
@@ -189,11 +309,15 @@ class SayAs(SsmlTag):
 
 
 class SayAsCurrency(SayAs):
+    __slots__ = ()
+
     def __init__(self, content: TagArrayOrList, *, language: str):
         super().__init__(content, "currency", {"language": language})
 
 
 class SayAsTelephone(SayAs):
+    __slots__ = ()
+
     def __init__(self, content: TagArrayOrList, *, format: Optional[str] = None, style: Optional[str] = None):
         super().__init__(content, "telephone", {
             "format": format,
@@ -202,51 +326,71 @@ class SayAsTelephone(SayAs):
 
 
 class SayAsVerbatim(SayAs):
+    __slots__ = ()
+
     def __init__(self, content: TagArrayOrList):
         super().__init__(content, "verbatim")
 
 
 class SayAsDate(SayAs):
+    __slots__ = ()
+
     def __init__(self, content: TagArrayOrList, *, format: str, detail: str):
         super().__init__(content, "date", {"format": format, "detail": detail})
 
 
 class SayAsCharacters(SayAs):
+    __slots__ = ()
+
     def __init__(self, content: TagArrayOrList):
         super().__init__(content, "characters")
 
 
 class SayAsCardinal(SayAs):
+    __slots__ = ()
+
     def __init__(self, content: TagArrayOrList):
         super().__init__(content, "cardinal")
 
 
 class SayAsOrdinal(SayAs):
+    __slots__ = ()
+
     def __init__(self, content: TagArrayOrList):
         super().__init__(content, "ordinal")
 
 
 class SayAsFraction(SayAs):
+    __slots__ = ()
+
     def __init__(self, content: TagArrayOrList):
         super().__init__(content, "fraction")
 
 
 class SayAsExpletive(SayAs):
+    __slots__ = ()
+
     def __init__(self, content: TagArrayOrList):
         super().__init__(content, "expletive")
 
 
 class SayAsUnit(SayAs):
+    __slots__ = ()
+
     def __init__(self, content: TagArrayOrList):
         super().__init__(content, "unit")
 
 
 class SayAsTime(SayAs):
+    __slots__ = ()
+
     def __init__(self, content: TagArrayOrList, *, format: str):
         super().__init__(content, "time", {"format": format})
 
 
 class Audio(SsmlTag):
+    __slots__ = ()
+
     def __init__(self,
                  src: str,
                  *,
@@ -277,26 +421,36 @@ class Audio(SsmlTag):
 
 
 class P(SsmlTag):
+    __slots__ = ()
+
     def __init__(self, content: TagArrayOrList):
         super().__init__(content, "p", {})
 
 
 class S(SsmlTag):
+    __slots__ = ()
+
     def __init__(self, content: TagArrayOrList):
         super().__init__(content, "s", {})
 
 
 class Sub(SsmlTag):
+    __slots__ = ()
+
     def __init__(self, content: TagArrayOrList, *, alias: str):
         super().__init__(content, "sub", {"alias": alias})
 
 
 class Mark(Empty):
+    __slots__ = ()
+
     def __init__(self, name: str):
         super().__init__("mark", {"name": name})
 
 
 class Prosody(SsmlTag):
+    __slots__ = ()
+
     VALID_PROSODY_ATTRIBUTES = {
         'rate': ('x-slow', 'slow', 'medium', 'fast', 'x-fast'),
         'pitch': ('x-low', 'low', 'medium', 'high', 'x-high'),
@@ -329,6 +483,8 @@ class Prosody(SsmlTag):
 
 
 class Emphasis(SsmlTag):
+    __slots__ = ()
+
     VALID_EMPHASIS_ATTRIBUTES = [
         "strong", "moderate", "none", "reduced"
     ]
@@ -341,16 +497,22 @@ class Emphasis(SsmlTag):
 
 
 class Par(SsmlTag):
+    __slots__ = ()
+
     def __init__(self, content: TagArrayOrList):
         super().__init__(content, "par", {})
 
 
 class Seq(SsmlTag):
+    __slots__ = ()
+
     def __init__(self, content: TagArrayOrList):
         super().__init__(content, "seq", {})
 
 
 class Media(SsmlTag):
+    __slots__ = ()
+
     def __init__(self,
                  media_content: SsmlTagABC,
                  *,
@@ -378,6 +540,8 @@ class Media(SsmlTag):
 
 
 class Phoneme(SsmlTag):
+    __slots__ = ()
+
     SUPPORTED_PHONETIC_ALPHABETS = ["ipa", "x-sampa"]
 
     def __init__(self, content: TagArrayOrList, *, alphabet: str, ph: str):
@@ -389,6 +553,8 @@ class Phoneme(SsmlTag):
 
 
 class Voice(SsmlTag):
+    __slots__ = ()
+
     def __init__(self,
                  content: TagArrayOrList,
                  *,
@@ -415,6 +581,8 @@ class Voice(SsmlTag):
 
 
 class Lang(SsmlTag):
+    __slots__ = ()
+
     def __init__(self, content: TagArrayOrList, *, lang: str):
         # TODO: assert lang is BCP-47 lang
         super().__init__(content, "lang", {
@@ -423,20 +591,28 @@ class Lang(SsmlTag):
 
 
 class PS(P):
+    __slots__ = ()
+
     def __init__(self, content: TagArrayOrList):
         super().__init__(S(content))
 
 
 class PSText(PS):
+    __slots__ = ()
+
     def __init__(self, content: str):
         super().__init__(RawText(content))
 
 
 class PText(P):
+    __slots__ = ()
+
     def __init__(self, content: str):
         super().__init__(RawText(content))
 
 
 class SText(S):
+    __slots__ = ()
+
     def __init__(self, content: str):
         super().__init__(RawText(content))
@@ -0,0 +1,100 @@
+from concurrent.futures import Future
+from mock import Mock
+from pathlib import Path
+from email_exporter.backfill import ArchiveInbox, BackfillParser, read_archive
+from email_exporter.backfill.backfill_parser import _batches, _ordered_map
+from email_exporter.config import Config
+from tests.inbox.imap_server import raw_email
+
+FIXTURES = Path(__file__).parent.parent / "parsers" / "fixtures"
+
+
+def _messages():
+    return [
+        ("substack.eml", raw_email(
+            "Substack", "Writer <writer@substack.com>", html=(FIXTURES / "substack.html").read_text())),
+        ("ghost.eml", raw_email(
+            "Ghost", "Platformer <news@platformer.news>", html=(FIXTURES / "ghost.html").read_text())),
+        ("empty.eml", raw_email("Empty", "Writer <writer@substack.com>", html="<p></p>")),
+        ("general.eml", raw_email(
+            "General", "Someone <someone@example.com>", html=(FIXTURES / "general.html").read_text())),
+    ]
+
+
+def _parse(workers: int):
+    config = Config().add_dictionary({"BACKFILL_WORKERS": workers, "BACKFILL_CHUNK_SIZE": 1})
+    return BackfillParser(config, Mock()).parse(_messages())
+
+
+def _output(report):
+    return [
+        (result.position, result.source, result.error is None,
+         result.parsed_item and (result.parsed_item.ssml, result.parsed_item.combined_description))
+        for result in report.results
+    ]
+
+
+def test_process_pool_matches_a_single_process_in_order():
+    pooled = _parse(workers=2)
+
+    assert [result.source for result in pooled.results] == [source for source, _ in _messages()]
+    assert _output(pooled) == _output(_parse(workers=1))
+    assert pooled.results[0].parsed_item.ssml
+
+
+def test_failures_are_reported_without_stopping_the_run():
+    report = _parse(workers=2)
+
+    assert [result.source for result in report.failed] == ["empty.eml"]
+    assert "No items were generated" in report.failed[0].error
+    assert report.results[3].parsed_item is not None
+    assert "4 emails" in str(report) and "1 failed" in str(report)
+    assert report.total_bytes == sum(len(raw) for _, raw in _messages())
+
+
+def test_archive_is_read_in_path_order(tmp_path):
+    for name, raw in _messages():
+        (tmp_path / name).write_bytes(raw)
+    (tmp_path / "notes.txt").write_text("not an email")
+
+    archive = list(read_archive(str(tmp_path)))
+    inbox = ArchiveInbox(Config().add_dictionary({"EMAIL_LOGIN": "inbox@example.com"}), str(tmp_path))
+
+    assert [Path(source).name for source, _ in archive] == ["empty.eml", "general.eml", "ghost.eml", "substack.eml"]
+    assert [message["Subject"] for _, message in inbox.get_messages()] == ["Empty", "General", "Ghost", "Substack"]
+    assert inbox.email_address == "inbox@example.com"
+
+
+def test_archive_inbox_reads_one_message_at_a_time(tmp_path):
+    (tmp_path / "a.eml").write_bytes(raw_email("First", "Sender <sender@example.com>"))
+    (tmp_path / "b.eml").write_bytes(raw_email("Second", "Sender <sender@example.com>"))
+    messages = ArchiveInbox(Config(), str(tmp_path)).get_messages()
+
+    assert next(messages)[1]["Subject"] == "First"
+
+    (tmp_path / "b.eml").write_bytes(raw_email("Rewritten", "Sender <sender@example.com>"))
+
+    assert next(messages)[1]["Subject"] == "Rewritten"
+
+
+def test_ordered_map_bounds_the_batches_in_flight():
+    read = []
+
+    class _Executor:
+        def submit(self, fn, batch):
+            future = Future()
+            future.set_result(fn(batch))
+            return future
+
+    def items():
+        for i in range(20):
+            read.append(i)
+            yield i
+
+    results = []
+    for result in _ordered_map(_Executor(), lambda batch: [i * 2 for i in batch], _batches(items(), 2), 3):
+        results.append(result)
+        # The 3 batches in flight, and the one read while waiting for the first of them
+        assert len(read) <= len(results) - 1 + (3 + 1) * 2
+
+    assert results == [i * 2 for i in range(20)]
@@ -0,0 +1,92 @@
+from mock import Mock
+import datetime
+import os
+import time
+from email_exporter.cache import BlobCache, BucketCacheBackend, DiskCacheBackend
+from email_exporter.config import Config
+
+
+def test_disk_cache_ignores_expired_entries(tmp_path):
+    sut = DiskCacheBackend(str(tmp_path), max_age=60)
+    sut.put("a.mp3", b"data")
+    old = time.time() - 120
+    os.utime(tmp_path / "a.mp3", (old, old))
+
+    assert sut.get("a.mp3") is None
+    assert sut.evict() == 1
+    assert not (tmp_path / "a.mp3").exists()
+
+
+def test_disk_cache_evicts_least_recently_used_over_size(tmp_path):
+    sut = DiskCacheBackend(str(tmp_path), max_size=10)
+    for i, name in enumerate(["a.mp3", "b.mp3", "c.mp3"]):
+        sut.put(name, b"12345")
+        timestamp = time.time() - 100 + i
+        os.utime(tmp_path / name, (timestamp, timestamp))
+
+    # Reading a refreshes it, so b is the least recently used
+    assert sut.get("a.mp3") == b"12345"
+
+    assert sut.evict() == 1
+    assert sorted(os.listdir(tmp_path)) == ["a.mp3", "c.mp3"]
+
+
+def test_bucket_cache_evicts_old_blobs():
+    now = datetime.datetime.now(datetime.timezone.utc)
+
+    def _blob(name, age_days, size):
+        blob = Mock()
+        blob.name = name
+        blob.time_created = now - datetime.timedelta(days=age_days)
+        blob.size = size
+        return blob
+
+    bucket = Mock()
+    bucket.list_blobs.return_value = [
+        _blob("t2s_cache/old.mp3", 40, 10),
+        _blob("t2s_cache/new.mp3", 1, 10),
+    ]
+    sut = BucketCacheBackend(bucket, "t2s_cache/", max_age=30 * 24 * 60 * 60)
+
+    assert sut.evict() == 1
+
+    bucket.list_blobs.assert_called_once_with("t2s_cache/")
+    bucket.delete_blob.assert_called_once_with("t2s_cache/old.mp3")
+
+
+def test_bucket_cache_uses_prefix():
+    bucket = Mock()
+    bucket.get_blob.return_value.download_as_bytes.return_value = b"data"
+    sut = BucketCacheBackend(bucket, "prefix/")
+
+    sut.put("a.mp3", b"data")
+
+    assert sut.get("a.mp3") == b"data"
+    bucket.upload_bytes.assert_called_once_with("prefix/a.mp3", b"data")
+    bucket.get_blob.assert_called_once_with("prefix/a.mp3")
+
+
+def test_bucket_cache_ignores_expired_blobs():
+    now = datetime.datetime.now(datetime.timezone.utc)
+    bucket = Mock()
+    bucket.get_blob.return_value.time_created = now - datetime.timedelta(days=40)
+    sut = BucketCacheBackend(bucket, "prefix/", max_age=30 * 24 * 60 * 60)
+
+    assert sut.get("a.mp3") is None
+    bucket.get_blob.return_value.download_as_bytes.assert_not_called()
+
+    bucket.get_blob.return_value = None
+    assert sut.get("a.mp3") is None
+
+
+def test_blob_cache_counts_undecodable_blobs_as_misses(tmp_path):
+    sut = BlobCache(Config().add_dictionary({"NAME_CACHE": "disk", "NAME_CACHE_FOLDER": str(tmp_path)}), Mock(), "name",
+                    "name cache")
+    sut.put("a", b"data")
+
+    def fail(data):
+        raise ValueError("corrupt")
+
+    assert sut.get("a", fail) is None
+    assert sut.get("a", bytes.decode) == "data"
+    assert sut.stats == {"hits": 1, "misses": 1}
@@ -0,0 +1,239 @@
+from mock import Mock, patch
+import threading
+import time
+import pytest
+from email_exporter.config import Config
+from email_exporter.cloud.t2s import TextToSpeech, Mp3T2SOutput
+from email_exporter.cloud.t2s_cache import T2SCache
+
+
+def _create_t2s(cache=None, **config):
+    cache = cache or T2SCache(Config(), Mock(), Mock())
+    with patch("email_exporter.cloud.t2s.texttospeech"), patch("email_exporter.cloud.t2s.genai"):
+        return TextToSpeech(Config().add_dictionary(config), Mock(), cache)
+
+
+def test_lines_to_speech_keeps_order():
+    sut = _create_t2s(T2S_CONCURRENCY="4")
+
+    def _classical_t2s(text, voice):
+        # Later lines finish first
+        time.sleep(0.01 * (5 - int(text)))
+        return Mp3T2SOutput(text.encode())
+
+    sut._classical_t2s = _classical_t2s
+
+    result = sut.lines_to_speech(["0", "1", "2", "3", "4"], "en-US-Wavenet-A")
+
+    assert result.audio_content == b"01234"
+
+
+def test_lines_to_speech_runs_chunks_concurrently():
+    sut = _create_t2s(T2S_CONCURRENCY="3")
+    lock = threading.Lock()
+    in_flight = []
+    max_in_flight = []
+
+    def _classical_t2s(text, voice):
+        with lock:
+            in_flight.append(text)
+            max_in_flight.append(len(in_flight))
+        time.sleep(0.02)
+        with lock:
+            in_flight.remove(text)
+        return Mp3T2SOutput(text.encode())
+
+    sut._classical_t2s = _classical_t2s
+
+    sut.lines_to_speech([str(i) for i in range(9)], "en-US-Wavenet-A")
+
+    assert max(max_in_flight) == 3
+
+
+def test_lines_to_speech_respects_provider_limit():
+    sut = _create_t2s(T2S_CONCURRENCY="8", T2S_CONCURRENCY_GEMINI="2", T2S_PROSE_LIMIT_GEMINI="0")
+    lock = threading.Lock()
+    in_flight = []
+    max_in_flight = []
+
+    def _gemini_t2s(text, voice):
+        with lock:
+            in_flight.append(text)
+            max_in_flight.append(len(in_flight))
+        time.sleep(0.02)
+        with lock:
+            in_flight.remove(text)
+        return Mp3T2SOutput(text.encode())
+
+    sut._gemini_t2s = _gemini_t2s
+
+    sut.lines_to_speech([str(i) for i in range(6)], "Charon")
+
+    assert max(max_in_flight) == 2
+
+
+def test_lines_to_speech_sequential_with_concurrency_of_one():
+    sut = _create_t2s(T2S_CONCURRENCY="1")
+    threads = set()
+
+    def _classical_t2s(text, voice):
+        threads.add(threading.get_ident())
+        return Mp3T2SOutput(text.encode())
+
+    sut._classical_t2s = _classical_t2s
+
+    result = sut.lines_to_speech(["a", "b", "c"], "en-US-Wavenet-A")
+
+    assert result.audio_content == b"abc"
+    assert threads == {threading.get_ident()}
+
+
+def test_lines_to_speech_raises_chunk_error():
+    sut = _create_t2s(T2S_CONCURRENCY="2")
+
+    def _classical_t2s(text, voice):
+        if text == "bad":
+            raise RuntimeError("synthesis failed")
+        return Mp3T2SOutput(text.encode())
+
+    sut._classical_t2s = _classical_t2s
+
+    with pytest.raises(RuntimeError):
+        sut.lines_to_speech(["a", "bad", "c"], "en-US-Wavenet-A")
+
+
+def test_lines_to_speech_starts_before_the_lines_are_all_produced():
+    sut = _create_t2s(T2S_CONCURRENCY="2")
+    first_synthesised = threading.Event()
+
+    def _classical_t2s(text, voice):
+        if text == "a":
+            first_synthesised.set()
+        return Mp3T2SOutput(text.encode())
+
+    sut._classical_t2s = _classical_t2s
+
+    def lines():
+        yield "a"
+        # The second chunk isn't produced until the first one has been synthesised
+        assert first_synthesised.wait(timeout=5)
+        yield "b"
+
+    result = sut.lines_to_speech(lines(), "en-US-Wavenet-A")
+
+    assert result.audio_content == b"ab"
+
+
+def test_lines_to_speech_packs_prose_for_gemini():
+    sut = _create_t2s(T2S_CONCURRENCY="1", T2S_PROSE_LIMIT_GEMINI="60")
+    synthesised = []
+
+    def _gemini_t2s(text, voice):
+        synthesised.append(text)
+        return Mp3T2SOutput(text.encode())
+
+    sut._gemini_t2s = _gemini_t2s
+    lines = [
+        '<speak><p><s>First paragraph.</s></p><break time="500ms"></break><p>Second</p></speak>',
+        '<speak><p><phoneme alphabet="x-sampa" ph="gergeI">Gergely</phoneme> writes.</p></speak>',
+        f'<speak><p>{"Long " * 20}</p><p>Last</p></speak>',
+    ]
+
+    sut.lines_to_speech(lines, "Charon")
+
+    assert synthesised == [
+        "First paragraph.\n\nSecond\n\nGergely writes.",
+        ("Long " * 20).strip(),
+        "Last",
+    ]
+    assert all("<" not in text for text in synthesised)
+
+
+def test_lines_to_speech_sends_unparsable_lines_to_gemini_as_they_are():
+    sut = _create_t2s(T2S_CONCURRENCY="1", T2S_PROSE_LIMIT_GEMINI="5000")
+    synthesised = []
+
+    def _gemini_t2s(text, voice):
+        synthesised.append(text)
+        return Mp3T2SOutput(text.encode())
+
+    sut._gemini_t2s = _gemini_t2s
+    lines = ["<speak><p>Use the <div> element</p></speak>", "<p>a<b</p>", "<speak><p>Fine</p></speak>"]
+
+    sut.lines_to_speech(lines, "Charon")
+
+    assert synthesised == ["<speak><p>Use the <div> element</p></speak>\n\n<p>a<b</p>\n\nFine"]
+
+
+def test_lines_to_speech_sends_ssml_to_classic_voices():
+    sut = _create_t2s(T2S_CONCURRENCY="1")
+    synthesised = []
+
+    def _classical_t2s(text, voice):
+        synthesised.append(text)
+        return Mp3T2SOutput(text.encode())
+
+    sut._classical_t2s = _classical_t2s
+    lines = ["<speak><p>a</p></speak>", "<speak><p>b</p></speak>"]
+
+    sut.lines_to_speech(lines, "en-US-Wavenet-A")
+
+    assert synthesised == lines
+
+
+def test_speech_limit_is_configured_per_provider():
+    sut = _create_t2s(T2S_SPEECH_LIMIT_GEMINI="8000")
+
+    assert sut.speech_limit("en-US-Wavenet-A") == 5000
+    assert sut.speech_limit("Charon") == 8000
+    assert sut.speech_limit() == 5000
+    with pytest.raises(ValueError):
+        sut.speech_limit("unknown")
+
+
+def test_t2s_uses_cache(tmp_path):
+    cache = T2SCache(Config().add_dictionary({"T2S_CACHE": "disk", "T2S_CACHE_FOLDER": str(tmp_path)}), Mock(), Mock())
+    sut = _create_t2s(cache, T2S_CONCURRENCY="1")
+    synthesised = []
+
+    def _classical_t2s(text, voice):
+        synthesised.append(text)
+        return Mp3T2SOutput(text.encode())
+
+    sut._classical_t2s = _classical_t2s
+
+    first = sut.lines_to_speech(["a", "b", "a"], "en-US-Wavenet-A")
+    second = sut.t2s("b", "en-US-Wavenet-A")
+
+    assert first.audio_content == b"aba"
+    assert second.audio_content == b"b"
+    assert synthesised == ["a", "b"]
+    assert cache.stats == {"hits": 2, "misses": 2}
+
+
+def test_lines_to_speech_logs_cache_counts_of_the_call(tmp_path):
+    cache = T2SCache(Config().add_dictionary({"T2S_CACHE": "disk", "T2S_CACHE_FOLDER": str(tmp_path)}), Mock(), Mock())
+    sut = _create_t2s(cache, T2S_CONCURRENCY="2")
+    sut._classical_t2s = lambda text, voice: Mp3T2SOutput(text.encode())
+
+    sut.lines_to_speech(["a", "b"], "en-US-Wavenet-A")
+    sut.lines_to_speech(["a", "b", "c"], "en-US-Wavenet-A")
+
+    sut._logger.info.assert_any_call("T2S cache: 0 hits, 2 misses")
+    sut._logger.info.assert_any_call("T2S cache: 2 hits, 1 misses")
+
+
+def test_t2s_cache_is_keyed_by_voice(tmp_path):
+    cache = T2SCache(Config().add_dictionary({"T2S_CACHE": "disk", "T2S_CACHE_FOLDER": str(tmp_path)}), Mock(), Mock())
+    sut = _create_t2s(cache)
+    synthesised = []
+
+    def _classical_t2s(text, voice):
+        synthesised.append(voice)
+        return Mp3T2SOutput(voice.encode())
+
+    sut._classical_t2s = _classical_t2s
+
+    assert sut.t2s("a", "en-US-Wavenet-A").audio_content == b"en-US-Wavenet-A"
+    assert sut.t2s("a", "en-US-Wavenet-B").audio_content == b"en-US-Wavenet-B"
+    assert synthesised == ["en-US-Wavenet-A", "en-US-Wavenet-B"]
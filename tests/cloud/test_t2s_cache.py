@@ -0,0 +1,37 @@
+from mock import Mock
+import pytest
+from email_exporter.config import Config
+from email_exporter.cloud.t2s_cache import T2SCache
+
+
+def _disk_cache(folder, **config):
+    return T2SCache(
+        Config().add_dictionary({"T2S_CACHE": "disk", "T2S_CACHE_FOLDER": str(folder), **config}),
+        Mock(), Mock())
+
+
+def test_disabled_cache_never_hits():
+    sut = T2SCache(Config(), Mock(), Mock())
+
+    sut.put("text", "voice", "mp3", b"data")
+
+    assert not sut.enabled
+    assert sut.get("text", "voice", "mp3") is None
+    assert sut.stats == {"hits": 0, "misses": 0}
+
+
+def test_unknown_backend_raises():
+    with pytest.raises(ValueError):
+        T2SCache(Config().add_dictionary({"T2S_CACHE": "unknown"}), Mock(), Mock())
+
+
+def test_disk_cache_roundtrip_and_stats(tmp_path):
+    sut = _disk_cache(tmp_path)
+
+    assert sut.get("text", "voice", "mp3") is None
+    sut.put("text", "voice", "mp3", b"data")
+
+    assert sut.get("text", "voice", "mp3") == b"data"
+    assert sut.get("text", "other_voice", "mp3") is None
+    assert sut.get("other_text", "voice", "mp3") is None
+    assert sut.stats == {"hits": 1, "misses": 3}
@@ -1,6 +1,13 @@
+import pytest
 from mock import Mock
 from email_exporter.email_exporter import EmailExporter
-from email_exporter.parsers import ParsedItem
+from email_exporter.email_exporter.email_exporter import PreparedMessage
+from email_exporter.config import Config
+from email_exporter.parsers import ParseCache, ParsedItem, StreamedParsedItem
+
+
+def _parse_cache():
+    return ParseCache(Config(), Mock())
 
 
 def test_email_exporter_message_handler_returns_true_if_feed_is_None():
@@ -9,7 +16,7 @@ def test_email_exporter_message_handler_returns_true_if_feed_is_None():
     parser_selector = Mock()
 
     sut = EmailExporter(
-        Mock(), feed_provider, Mock(), parser_selector, Mock(), Mock())
+        Mock(), feed_provider, Mock(), parser_selector, Mock(), Mock(), _parse_cache())
 
     owner = "content_item_owner"
     content_item = Mock()
@@ -31,7 +38,7 @@ def test_email_exporter_message_handler_returns_false_if_feed_bucket_is_None():
     parser_selector = Mock()
 
     sut = EmailExporter(
-        Mock(), feed_provider, Mock(), parser_selector, Mock(), Mock())
+        Mock(), feed_provider, Mock(), parser_selector, Mock(), Mock(), _parse_cache())
 
     owner = "content_item_owner"
     content_item = Mock()
@@ -55,7 +62,7 @@ def test_email_exporter_message_handler_calls_dependencies():
     ssml = "ssml"
     description = ["description1", "description2"]
     parser = Mock()
-    parser.parse.return_value = (ParsedItem(ssml, description))
+    parser.parse_stream.return_value = (ParsedItem(ssml, description))
     parser_selector = Mock()
     parser_selector.get_parser.return_value = parser
 
@@ -68,9 +75,10 @@ def test_email_exporter_message_handler_calls_dependencies():
     t2s_output.extension = "mp3"
     t2s = Mock()
     t2s.lines_to_speech.return_value = t2s_output
+    t2s.speech_limit.return_value = 4000
 
     sut = EmailExporter(
-        Mock(), feed_provider, t2s, parser_selector, Mock(), voice_provider)
+        Mock(), feed_provider, t2s, parser_selector, Mock(), voice_provider, _parse_cache())
 
     content_item = Mock()
     content_item.owner = "content_item_owner"
@@ -83,8 +91,10 @@ def test_email_exporter_message_handler_calls_dependencies():
     feed_provider.get_feed.assert_called_once_with(content_item.owner)
 
     parser_selector.get_parser.assert_called_once_with(content_item)
-    parser.parse.assert_called_once_with(content_item)
+    parser.parse_stream.assert_called_once_with(content_item)
     voice_provider.get_voice.assert_called_once_with(content_item)
+    t2s.speech_limit.assert_called_once_with(voice)
+    assert parser.speech_limit == 4000
     t2s.lines_to_speech.assert_called_once_with(ssml, voice)
     feed.add_item_bytes.assert_called_once_with(
         title=content_item.title,
@@ -96,3 +106,72 @@ def test_email_exporter_message_handler_calls_dependencies():
     )
 
     assert result is True
+
+
+def test_email_exporter_synthesises_while_parsing_and_describes_afterwards():
+    feed = Mock()
+    feed_provider = Mock()
+    feed_provider.get_feed.return_value = feed
+    events = []
+
+    def ssml():
+        events.append("parse first chunk")
+        yield "chunk1"
+        events.append("parse second chunk")
+        yield "chunk2"
+
+    def get_description():
+        events.append("describe")
+        return ["description"]
+
+    parser = Mock()
+    parser.parse_stream.return_value = StreamedParsedItem(ssml(), get_description)
+    parser_selector = Mock()
+    parser_selector.get_parser.return_value = parser
+
+    def lines_to_speech(lines, voice):
+        for line in lines:
+            events.append(f"synthesise {line}")
+        return Mock(extension="mp3")
+
+    t2s = Mock()
+    t2s.lines_to_speech = lines_to_speech
+    content_item = Mock()
+
+    sut = EmailExporter(Mock(), feed_provider, t2s, parser_selector, Mock(), Mock(), _parse_cache())
+
+    assert sut.message_handler(content_item) is True
+
+    parser.parse.assert_not_called()
+    assert events == [
+        "parse first chunk", "synthesise chunk1", "parse second chunk", "synthesise chunk2", "describe"]
+    assert feed.add_item_bytes.call_args.kwargs["description"] == "description"
+    content_item.release.assert_called_once_with()
+
+
+def test_email_exporter_pipeline_parses_before_synthesis():
+    feed_provider = Mock()
+    parser = Mock()
+    parser.parse.return_value = ParsedItem(["ssml"], ["description"])
+    parser_selector = Mock()
+    parser_selector.get_parser.return_value = parser
+    content_item = Mock()
+
+    sut = EmailExporter(Mock(), feed_provider, Mock(), parser_selector, Mock(), Mock(), _parse_cache())
+
+    prepared = sut.pipeline_stages().prepare(content_item)
+
+    parser.parse_stream.assert_not_called()
+    assert prepared.parsed_item is parser.parse.return_value
+    content_item.release.assert_called_once_with()
+
+
+def test_email_exporter_publish_message_requires_synthesis():
+    feed = Mock()
+    sut = EmailExporter(Mock(), Mock(), Mock(), Mock(), Mock(), Mock(), _parse_cache())
+    prepared = PreparedMessage(Mock(), feed, ParsedItem(["ssml"], ["description"]), "voice")
+
+    with pytest.raises(AssertionError, match="Message not synthesised"):
+        sut.publish_message(prepared)
+
+    feed.add_item_bytes.assert_not_called()
@@ -609,3 +609,30 @@ def test_get_feed_uses_collection_for_items():
 
     assert len(feed.items) == 1
     assert feed.items[0].idx == item_idx
+
+
+def test_existing_feeds_reads_uncached_keys_in_one_request():
+    db_client = Mock()
+    db_client.document.side_effect = lambda key: key
+    firestore_client = Mock()
+    firestore_client.collection.return_value = db_client
+    firestore_client.get_all.side_effect = lambda refs: [
+        Mock(id=ref, exists=ref in ("a@example.com", "alias@example.com")) for ref in refs
+    ]
+    config = Mock()
+    config.get.return_value = "collection_name"
+
+    sut = FeedProvider(
+        config, firestore_client,
+        Mock(), Mock()
+    )
+    sut._feed_cache["cached@example.com"] = Mock()
+
+    existing = sut.existing_feeds([
+        "a@example.com", "alias@example.com", "unknown@example.com", "cached@example.com", "", "a/b"])
+
+    firestore_client.get_all.assert_called_once()
+    assert sorted(firestore_client.get_all.call_args[0][0]) == [
+        "a@example.com", "alias@example.com", "unknown@example.com"]
+    assert existing == {"a@example.com", "alias@example.com", "cached@example.com"}
+    sut._feed_cache.clear()
@@ -0,0 +1,305 @@
+"""A minimal in-process IMAP server standing in for Gmail in the inbox tests. It speaks just enough of the
+protocol for imaplib and GmailInbox: LOGIN, LIST, SELECT, UID SEARCH, UID FETCH, UID STORE and LOGOUT."""
+from email import message_from_bytes
+from email.message import EmailMessage, Message
+from itertools import chain
+from typing import Callable, Iterator
+import re
+import socketserver
+import threading
+
+_fetch_item_re = re.compile(r"BODY(?:\.PEEK)?\[[^\]]*\](?:<\d+\.\d+>)?|[A-Z0-9.]+", re.IGNORECASE)
+
+
+def _parse_set(uid_set: str, uids: list[int]) -> set[int]:
+    selected: set[int] = set()
+    highest = max(uids, default=0)
+    for part in uid_set.split(","):
+        start, _, end = part.partition(":")
+        first = highest if start == "*" else int(start)
+        last = first if not end else (highest if end == "*" else int(end))
+        first, last = min(first, last), max(first, last)
+        selected.update(uid for uid in uids if first <= uid <= last)
+    return selected
+
+
+def _normalise_flag(flag: str) -> str:
+    return "\\" + flag[1:].capitalize() if flag.startswith("\\") else flag
+
+
+def _split_message(raw: bytes) -> tuple[bytes, bytes]:
+    separator = raw.find(b"\r\n\r\n")
+    if separator < 0:
+        return raw, b""
+    return raw[:separator + 4], raw[separator + 4:]
+
+
+def _quote(value) -> str:
+    return "NIL" if value is None else '"' + str(value).replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def _body_structure(part: Message) -> str:
+    if part.is_multipart():
+        children = "".join(_body_structure(child) for child in part.get_payload())
+        boundary = f'("BOUNDARY" {_quote(part.get_boundary())})'
+        return f"({children} {_quote(part.get_content_subtype().upper())} {boundary} NIL NIL)"
+
+    params = part.get_params()[1:] if part.get_params() else []
+    params_list = "NIL" if not params else \
+        "(" + " ".join(f"{_quote(key.upper())} {_quote(value)}" for key, value in params) + ")"
+    body = _section_body(part)
+    disposition = part.get_content_disposition()
+    disposition_list = "NIL" if disposition is None else \
+        f"({_quote(disposition.upper())} (\"FILENAME\" {_quote(part.get_filename())}))"
+    fields = [
+        _quote(part.get_content_maintype().upper()),
+        _quote(part.get_content_subtype().upper()),
+        params_list,
+        "NIL",
+        "NIL",
+        _quote(part.get("Content-Transfer-Encoding", "7BIT").upper()),
+        str(len(body)),
+    ]
+    if part.get_content_maintype() == "text":
+        fields.append(str(body.count(b"\n")))
+    fields += ["NIL", disposition_list, "NIL", "NIL"]
+    return "(" + " ".join(fields) + ")"
+
+
+def _section_body(part: Message) -> bytes:
+    payload = part.get_payload()
+    return payload.encode("utf-8", "surrogateescape").replace(b"\r\n", b"\n").replace(b"\n", b"\r\n")
+
+
+def _section(message: Message, section: str) -> Message:
+    part = message
+    for number in section.split("."):
+        if part.is_multipart():
+            part = part.get_payload()[int(number) - 1]
+    return part
+
+
+def raw_email(subject: str, sender: str, to: str = "owner@example.com", html: str = "<p>Paragraph</p>") -> bytes:
+    message = EmailMessage()
+    message["Subject"] = subject
+    message["From"] = sender
+    message["To"] = to
+    message["Date"] = "Mon, 1 Jan 2024 08:00:00 +0000"
+    message["Message-ID"] = f"<{abs(hash((subject, sender, to)))}@example.com>"
+    message.set_content(f"Plain text of {subject}")
+    message.add_alternative(f"<html><body>{html}</body></html>", subtype="html")
+    return message.as_bytes()
+
+
+class ImapStandIn:
+    def __init__(
+            self,
+            messages: list[bytes],
+            all_mail_folder: str = "[Gmail]/All Mail",
+            uid_last: bool = False,
+            condstore: bool = False):
+        self.all_mail_folder = all_mail_folder
+        self.uid_validity = 1
+        self.uid_last = uid_last
+        self.condstore = condstore
+        self.messages: dict[int, bytes] = {}
+        self.flags: dict[int, set[str]] = {}
+        self.modseqs: dict[int, int] = {}
+        self.highest_modseq = 1
+        self.commands: list[str] = []
+        self.bytes_sent = 0
+        for raw in messages:
+            self.append(raw)
+
+    def append(self, raw: bytes) -> int:
+        uid = max(self.messages, default=0) + 1
+        self.messages[uid] = raw.replace(b"\r\n", b"\n").replace(b"\n", b"\r\n")
+        self.flags[uid] = set()
+        self._touch(uid)
+        return uid
+
+    def _touch(self, uid: int):
+        self.highest_modseq += 1
+        self.modseqs[uid] = self.highest_modseq
+
+    def set_flags(self, uid: int, *flags: str):
+        self.flags[uid] = set(flags)
+        self._touch(uid)
+
+    def commands_named(self, name: str) -> list[str]:
+        return [command for command in self.commands if command.upper().startswith(name.upper())]
+
+    # Server lifecycle
+
+    def __enter__(self):
+        stand_in = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                try:
+                    stand_in._handle(self.rfile, self.wfile)
+                except ConnectionError:
+                    pass
+
+        self._server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, args=(0.05,), daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *_):
+        self._server.shutdown()
+        self._server.server_close()
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    # Protocol
+
+    def _handle(self, rfile, wfile):
+        wfile.write(b"* OK IMAP4rev1 stand-in ready\r\n")
+        while (line := rfile.readline()):
+            tag, _, command = line.decode().rstrip("\r\n").partition(" ")
+            self.commands.append(command)
+            name, _, args = command.partition(" ")
+            name = name.upper()
+            if name == "UID":
+                name, _, args = args.partition(" ")
+                name = f"UID {name.upper()}"
+
+            handler = getattr(self, "_cmd_" + name.lower().replace(" ", "_"), None)
+            if handler is None:
+                wfile.write(f"{tag} BAD unknown command {name}\r\n".encode())
+                continue
+            untagged, status = handler(args)
+            for response in untagged:
+                wfile.write(b"* " + response + b"\r\n")
+                self.bytes_sent += len(response) + 4
+            wfile.write(f"{tag} {status}\r\n".encode())
+            if name == "LOGOUT":
+                return
+
+    def _sequence_numbers(self) -> dict[int, int]:
+        return {uid: seq for seq, uid in enumerate(sorted(self.messages), start=1)}
+
+    def _cmd_capability(self, args):
+        capabilities = "IMAP4rev1 CONDSTORE" if self.condstore else "IMAP4rev1"
+        return [f"CAPABILITY {capabilities}".encode()], "OK CAPABILITY completed"
+
+    def _cmd_login(self, args):
+        return [], "OK LOGIN completed"
+
+    def _cmd_logout(self, args):
+        return [b"BYE"], "OK LOGOUT completed"
+
+    def _cmd_list(self, args):
+        return [
+            b'LIST (\\HasNoChildren) "/" "INBOX"',
+            f'LIST (\\All \\HasNoChildren) "/" "{self.all_mail_folder}"'.encode(),
+        ], "OK LIST completed"
+
+    def _cmd_select(self, args):
+        if args.strip('"') != self.all_mail_folder:
+            return [], "NO no such mailbox"
+        responses = [
+            f"{len(self.messages)} EXISTS".encode(),
+            f"OK [UIDVALIDITY {self.uid_validity}] UIDs valid".encode(),
+            f"OK [UIDNEXT {max(self.messages, default=0) + 1}] Predicted next UID".encode(),
+        ]
+        if self.condstore:
+            responses.append(f"OK [HIGHESTMODSEQ {self.highest_modseq}] Highest".encode())
+        return responses, "OK [READ-WRITE] SELECT completed"
+
+    def _search_key(self, tokens: Iterator[str]) -> Callable[[int], bool]:
+        token = next(tokens).upper()
+        if token == "OR":
+            left, right = self._search_key(tokens), self._search_key(tokens)
+            return lambda uid: left(uid) or right(uid)
+        if token == "ALL":
+            return lambda uid: True
+        if token == "UNFLAGGED":
+            return lambda uid: "\\Flagged" not in self.flags[uid]
+        if token == "FLAGGED":
+            return lambda uid: "\\Flagged" in self.flags[uid]
+        if token == "MODSEQ" and self.condstore:
+            modseq = int(next(tokens))
+            return lambda uid: self.modseqs[uid] >= modseq
+        if token == "UID":
+            token = next(tokens)
+        if re.match(r"^[\d*:,]+$", token):
+            uids = _parse_set(token, list(self.messages))
+            return lambda uid: uid in uids
+        raise ValueError(f"Unsupported search criteria {token}")
+
+    def _cmd_uid_search(self, args):
+        tokens = iter(args.split())
+        keys = [self._search_key(chain([token], tokens)) for token in tokens]
+        uids = [uid for uid in sorted(self.messages) if all(key(uid) for key in keys)]
+        response = b" ".join([b"SEARCH", *(str(uid).encode() for uid in uids)])
+        if "MODSEQ" in args.upper() and uids:
+            response += f" (MODSEQ {max(self.modseqs[uid] for uid in uids)})".encode()
+        return [response], "OK SEARCH completed"
+
+    def _cmd_uid_store(self, args):
+        uid_set, action, flags = args.split(" ", 2)
+        responses = []
+        sequence_numbers = self._sequence_numbers()
+        for uid in sorted(_parse_set(uid_set, list(self.messages))):
+            changed = {_normalise_flag(flag) for flag in flags.strip("()").split()}
+            if action.upper().startswith("+"):
+                self.flags[uid] |= changed
+            elif action.upper().startswith("-"):
+                self.flags[uid] -= changed
+            self._touch(uid)
+            responses.append(
+                f"{sequence_numbers[uid]} FETCH (UID {uid} FLAGS ({' '.join(sorted(self.flags[uid]))}))".encode())
+        return responses, "OK STORE completed"
+
+    def _fetch_item(self, uid: int, item: str) -> tuple[bytes, bytes, bool]:
+        """Returns the response name, value and whether the value is sent as a literal"""
+        raw = self.messages[uid]
+        header, text = _split_message(raw)
+        name = item.upper().replace("BODY.PEEK[", "BODY[")
+        if name == "RFC822":
+            return b"RFC822", raw, True
+        if name == "FLAGS":
+            return b"FLAGS", f"({' '.join(sorted(self.flags[uid]))})".encode(), False
+        if name == "RFC822.SIZE":
+            return b"RFC822.SIZE", str(len(raw)).encode(), False
+        if name == "BODYSTRUCTURE":
+            return b"BODYSTRUCTURE", _body_structure(message_from_bytes(raw)).encode(), False
+        if (match := re.match(r"^BODY\[(?P<section>\d+(?:\.\d+)*)\]$", name)):
+            return name.encode(), _section_body(_section(message_from_bytes(raw), match.group("section"))), True
+        if name == "BODY[HEADER]":
+            return name.encode(), header, True
+        if name == "BODY[TEXT]":
+            return name.encode(), text, True
+        if (match := re.match(r"^BODY\[HEADER\.FIELDS \((?P<fields>[^)]*)\)\]$", name)):
+            message = message_from_bytes(raw)
+            lines = [
+                f"{field}: {value}\r\n"
+                for field in match.group("fields").split()
+                for value in message.get_all(field, [])
+            ]
+            return name.encode(), "".join(lines).encode() + b"\r\n", True
+        raise ValueError(f"Unsupported fetch item {item}")
+
+    def _cmd_uid_fetch(self, args):
+        uid_set, _, items = args.partition(" ")
+        requested = [item for item in _fetch_item_re.findall(items.strip()[1:-1]) if item.upper() != "UID"]
+        sequence_numbers = self._sequence_numbers()
+
+        responses = []
+        for uid in sorted(_parse_set(uid_set, list(self.messages))):
+            parts = []
+            for item in requested:
+                name, value, literal = self._fetch_item(uid, item)
+                if literal:
+                    parts.append(name + b" {" + str(len(value)).encode() + b"}\r\n" + value)
+                else:
+                    parts.append(name + b" " + value)
+            uid_part = f"UID {uid}".encode()
+            parts = [*parts, uid_part] if self.uid_last else [uid_part, *parts]
+            responses.append(f"{sequence_numbers[uid]} FETCH (".encode() + b" ".join(parts) + b")")
+        return responses, "OK FETCH completed"
@@ -0,0 +1,302 @@
+from email.message import EmailMessage
+import imaplib
+import pytest
+from mock import Mock
+from email_exporter.config import Config
+from email_exporter.inbox import Inbox, InboxProcessor, InboxStateStore
+from email_exporter.inbox.body_structure import body_parts, parse_list, text_parts
+from email_exporter.inbox.imap_fetch import parse_fetch_response
+from .imap_server import ImapStandIn, raw_email
+
+
+def _raw_email(i: int) -> bytes:
+    return raw_email(f"Newsletter {i}", f"Sender {i} <sender{i}@example.com>", html=f"<p>Paragraph {i}</p>")
+
+
+@pytest.fixture
+def imap_server(monkeypatch):
+    with ImapStandIn([_raw_email(i) for i in range(7)]) as server:
+        monkeypatch.setattr(imaplib, "IMAP4_SSL", lambda host: imaplib.IMAP4(host, server.port))
+        yield server
+
+
+def _create_inbox(state_store=None, **config) -> Inbox:
+    return Inbox(Config().add_dictionary({
+        "EMAIL_SERVER": "127.0.0.1",
+        "EMAIL_LOGIN": "inbox@example.com",
+        "EMAIL_PASSWORD": "password",
+        **config
+    }), Mock(), state_store or InboxStateStore.disabled())
+
+
+class FakeFirestore:
+    def __init__(self):
+        self.documents = {}
+
+    def collection(self, collection):
+        firestore = self
+
+        class Document:
+            def __init__(self, key):
+                self.key = (collection, key)
+
+            def get(self):
+                data = firestore.documents.get(self.key)
+                return Mock(exists=data is not None, to_dict=lambda: dict(data))
+
+            def set(self, data):
+                firestore.documents[self.key] = data
+
+        return Mock(document=Document)
+
+
+def _state_store():
+    return InboxStateStore(Config().add_dictionary({"INBOX_STATE_COLLECTION": "inbox_state"}), FakeFirestore())
+
+
+def _process(inbox, discard=()):
+    processed = []
+    for idx, _ in inbox.get_messages():
+        processed.append(idx)
+        if idx in discard:
+            inbox.discard_message(idx)
+    inbox.commit()
+    return processed
+
+
+@pytest.mark.parametrize("batch_size,fetches", [("1", 7), ("3", 3), ("20", 1)])
+def test_get_messages_fetches_in_batches(imap_server, batch_size, fetches):
+    inbox = _create_inbox(IMAP_FETCH_BATCH_SIZE=batch_size)
+
+    messages = list(inbox.get_messages())
+
+    assert [idx for idx, _ in messages] == [str(uid) for uid in range(1, 8)]
+    assert [message["Subject"] for _, message in messages] == [f"Newsletter {i}" for i in range(7)]
+    assert len(imap_server.commands_named("UID FETCH")) == fetches
+
+
+def test_get_messages_is_lazy_per_batch(imap_server):
+    inbox = _create_inbox(IMAP_FETCH_BATCH_SIZE="3")
+
+    messages = inbox.get_messages()
+    next(messages)
+    next(messages)
+    next(messages)
+
+    assert imap_server.commands_named("UID FETCH") == ["UID FETCH 1,2,3 (RFC822)"]
+
+    next(messages)
+
+    assert imap_server.commands_named("UID FETCH")[-1] == "UID FETCH 4,5,6 (RFC822)"
+
+
+def test_get_messages_uses_search_criteria(imap_server):
+    inbox = _create_inbox()
+    for idx, _ in inbox.get_messages():
+        if idx in ("2", "5"):
+            inbox.discard_message(idx)
+
+    remaining = [idx for idx, _ in inbox.get_messages()]
+
+    assert remaining == ["1", "3", "4", "6", "7"]
+
+
+def test_get_messages_handles_uid_after_literal(monkeypatch):
+    with ImapStandIn([_raw_email(i) for i in range(3)], uid_last=True) as server:
+        monkeypatch.setattr(imaplib, "IMAP4_SSL", lambda host: imaplib.IMAP4(host, server.port))
+
+        messages = list(_create_inbox().get_messages())
+
+    assert [(idx, message["Subject"]) for idx, message in messages] == [
+        ("1", "Newsletter 0"), ("2", "Newsletter 1"), ("3", "Newsletter 2")]
+
+
+def test_parse_fetch_response():
+    data = [
+        (b"1 (UID 10 FLAGS (\\Seen) BODY[HEADER] {5}", b"head\n"),
+        (b" BODY[TEXT] {4}", b"text"),
+        b")",
+        (b"2 (RFC822 {3}", b"raw"),
+        b" UID 11)",
+        b"3 (UID 12 FLAGS ())",
+    ]
+
+    fetched = parse_fetch_response(data)
+
+    assert [message.uid for message in fetched] == ["10", "11", "12"]
+    assert fetched[0].items == {"BODY[HEADER]": b"head\n", "BODY[TEXT]": b"text"}
+    assert b"FLAGS (\\Seen)" in fetched[0].text
+    assert fetched[1].items == {"RFC822": b"raw"}
+    assert fetched[2].items == {}
+
+
+def test_checkpoint_limits_search_to_new_and_pending(imap_server):
+    state_store = _state_store()
+
+    assert _process(_create_inbox(state_store), discard=("1", "3", "4", "5", "6", "7")) == [
+        "1", "2", "3", "4", "5", "6", "7"]
+    checkpoint = state_store.load("inbox@example.com")
+    assert (checkpoint.last_uid, checkpoint.pending) == (7, ["2"])
+
+    imap_server.append(_raw_email(7))
+    imap_server.append(_raw_email(8))
+    imap_server.commands.clear()
+
+    assert _process(_create_inbox(state_store), discard=("2", "8")) == ["2", "8", "9"]
+    assert imap_server.commands_named("UID SEARCH") == ["UID SEARCH UID 2,8:* UNFLAGGED"]
+    assert imap_server.commands_named("LIST") == []
+    checkpoint = state_store.load("inbox@example.com")
+    assert (checkpoint.last_uid, checkpoint.pending) == (9, ["9"])
+
+
+def test_checkpoint_keeps_messages_that_were_not_reached(imap_server):
+    state_store = _state_store()
+    inbox = _create_inbox(state_store, IMAP_FETCH_BATCH_SIZE="2")
+    messages = inbox.get_messages()
+
+    next(messages)
+    messages.close()
+    inbox.commit()
+
+    assert state_store.load("inbox@example.com").pending == ["1", "2", "3", "4", "5", "6", "7"]
+
+
+def test_checkpoint_is_dropped_when_uid_validity_changes(imap_server):
+    state_store = _state_store()
+    _process(_create_inbox(state_store), discard=("1", "2"))
+
+    imap_server.uid_validity = 2
+    imap_server.commands.clear()
+
+    assert _process(_create_inbox(state_store)) == ["3", "4", "5", "6", "7"]
+    assert imap_server.commands_named("UID SEARCH") == ["UID SEARCH UNFLAGGED"]
+    assert state_store.load("inbox@example.com").uid_validity == "2"
+
+
+def test_checkpoint_is_not_used_for_other_searches(imap_server):
+    state_store = _state_store()
+
+    inbox = _create_inbox(state_store)
+    list(inbox.get_messages("ALL"))
+    inbox.commit()
+
+    assert state_store.load("inbox@example.com") is None
+
+
+def test_condstore_skips_search_when_mailbox_is_unchanged(monkeypatch):
+    state_store = _state_store()
+    with ImapStandIn([_raw_email(i) for i in range(4)], condstore=True) as server:
+        monkeypatch.setattr(imaplib, "IMAP4_SSL", lambda host: imaplib.IMAP4(host, server.port))
+        server.set_flags(1, "\\Flagged")
+        server.set_flags(2, "\\Flagged")
+
+        assert _process(_create_inbox(state_store)) == ["3", "4"]
+        server.commands.clear()
+
+        assert _process(_create_inbox(state_store)) == ["3", "4"]
+        assert server.commands_named("UID SEARCH") == []
+
+        server.set_flags(1)
+
+        assert _process(_create_inbox(state_store)) == ["1", "3", "4"]
+        assert server.commands_named("UID SEARCH")[-1].endswith("UNFLAGGED OR UID 3,4,5:* MODSEQ 8")
+
+
+def test_checkpoint_is_saved_on_commit(imap_server):
+    state_store = _state_store()
+    inbox = _create_inbox(state_store)
+
+    for idx, _ in inbox.get_messages():
+        inbox.discard_message(idx)
+
+    assert state_store.load("inbox@example.com") is None
+
+    inbox.commit()
+
+    assert state_store.load("inbox@example.com").pending == []
+
+
+def test_condstore_skips_search_after_a_run_that_discarded(monkeypatch):
+    state_store = _state_store()
+    with ImapStandIn([_raw_email(i) for i in range(4)], condstore=True) as server:
+        monkeypatch.setattr(imaplib, "IMAP4_SSL", lambda host: imaplib.IMAP4(host, server.port))
+
+        assert _process(_create_inbox(state_store), discard=("1", "2")) == ["1", "2", "3", "4"]
+        assert state_store.load("inbox@example.com").highest_modseq == server.highest_modseq
+        server.commands.clear()
+
+        assert _process(_create_inbox(state_store)) == ["3", "4"]
+        assert server.commands_named("UID SEARCH") == []
+
+
+def test_condstore_keeps_the_selected_modseq_when_others_changed(monkeypatch):
+    state_store = _state_store()
+    with ImapStandIn([_raw_email(i) for i in range(4)], condstore=True) as server:
+        monkeypatch.setattr(imaplib, "IMAP4_SSL", lambda host: imaplib.IMAP4(host, server.port))
+        selected_modseq = server.highest_modseq
+        inbox = _create_inbox(state_store)
+
+        for idx, _ in inbox.get_messages():
+            if idx == "1":
+                inbox.discard_message(idx)
+                server.set_flags(2, "\\Seen")
+        inbox.commit()
+
+        assert state_store.load("inbox@example.com").highest_modseq == selected_modseq
+
+
+def _email_with_attachment(i: int) -> bytes:
+    message = EmailMessage()
+    message["Subject"] = f"Forwarded {i}"
+    message["From"] = "Owner <owner@example.com>"
+    message["To"] = "inbox@example.com"
+    message["Date"] = "Mon, 1 Jan 2024 08:00:00 +0000"
+    message.set_content(f"---------- Forwarded message ---------\nFrom: Writer <writer{i}@substack.com>\nCafé {i}",
+                        cte="quoted-printable")
+    message.add_alternative(f"<html><body><p>Café au lait {i}</p></body></html>", subtype="html", cte="8bit")
+    message.add_attachment(b"IDAT" * 25000, maintype="image", subtype="png", filename="large.png")
+    return message.as_bytes()
+
+
+def test_body_structure_text_parts():
+    structure, _ = parse_list(
+        b'((("TEXT" "PLAIN" ("CHARSET" "utf-8") NIL NIL "QUOTED-PRINTABLE" 120 4 NIL NIL NIL NIL)'
+        b'("TEXT" "HTML" ("CHARSET" "utf-8") NIL NIL "8BIT" 300 2 NIL NIL NIL NIL) "ALTERNATIVE" ("BOUNDARY" "b1")'
+        b' NIL NIL)("IMAGE" "PNG" NIL NIL NIL "BASE64" 1000 NIL ("ATTACHMENT" ("FILENAME" "a.png")) NIL NIL)'
+        b'("TEXT" "PLAIN" NIL NIL NIL "7BIT" 10 1 NIL ("ATTACHMENT" ("FILENAME" "notes.txt")) NIL NIL)'
+        b' "MIXED" ("BOUNDARY" "b0") NIL NIL)')
+
+    assert [(part.section, part.content_type) for part in body_parts(structure)] == [
+        ("1.1", "text/plain"), ("1.2", "text/html"), ("2", "image/png"), ("3", "text/plain")]
+    assert [(part.section, part.encoding, part.params) for part in text_parts(structure)] == [
+        ("1.1", "quoted-printable", {"charset": "utf-8"}), ("1.2", "8bit", {"charset": "utf-8"})]
+
+
+def test_text_parts_mode_only_downloads_text_sections(monkeypatch):
+    emails = [_email_with_attachment(i) for i in range(3)]
+    results = {}
+    for mode in ("rfc822", "text_parts"):
+        with ImapStandIn(emails) as server:
+            monkeypatch.setattr(imaplib, "IMAP4_SSL", lambda host: imaplib.IMAP4(host, server.port))
+            inbox = _create_inbox(IMAP_FETCH_MODE=mode)
+            processor = InboxProcessor(Config(), Mock(), inbox)
+
+            items = [processor.process_email(message) for _, message in inbox.get_messages()]
+
+            results[mode] = (server.bytes_sent, server.commands_named("UID FETCH"), items)
+
+    full_bytes, _, full_items = results["rfc822"]
+    text_bytes, text_fetches, text_items = results["text_parts"]
+
+    assert text_fetches == ["UID FETCH 1,2,3 (BODYSTRUCTURE BODY.PEEK[HEADER])",
+                            "UID FETCH 1,2,3 (BODY.PEEK[1.1] BODY.PEEK[1.2])"]
+    assert text_bytes * 5 < full_bytes
+    assert [(item.title, item.owner, item.html) for item in text_items] == \
+        [(item.title, item.owner, item.html) for item in full_items]
+    assert text_items[0].sender == "writer0@substack.com"
+    assert "Café au lait 0" in text_items[0].html
+
+
+def test_unknown_fetch_mode_raises():
+    with pytest.raises(ValueError):
+        _create_inbox(IMAP_FETCH_MODE="headers")
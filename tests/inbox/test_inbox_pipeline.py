@@ -0,0 +1,151 @@
+import random
+import threading
+import time
+from mock import Mock
+from email_exporter.config import Config
+from email_exporter.inbox import InboxProcessor, PipelineStages
+from email_exporter.inbox.inbox_pipeline import InboxPipeline
+
+
+class Recorder:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.published = []
+        self.discarded = []
+        self.discard_threads = set()
+        self.active = 0
+        self.max_active = 0
+
+    def discard(self, idx):
+        self.discarded.append(idx)
+        self.discard_threads.add(threading.current_thread().name)
+
+    def synthesise(self, job):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(random.uniform(0, 0.01))
+        with self.lock:
+            self.active -= 1
+        if job["fail"] == "synthesise":
+            raise RuntimeError("TTS failed")
+        return job
+
+    def publish(self, job):
+        if job["fail"] == "publish":
+            raise RuntimeError("Upload failed")
+        self.published.append((job["feed"], job["idx"]))
+        return True
+
+
+def _prepare(item):
+    idx, feed, fail = item
+    if fail == "prepare":
+        raise RuntimeError("Parse failed")
+    if feed is None:
+        return fail == "discard"
+    return {"idx": idx, "feed": feed, "fail": fail}
+
+
+def _run(messages, **config):
+    recorder = Recorder()
+    pipeline = InboxPipeline(Config().add_dictionary(config), Mock(), lambda message: message, recorder.discard)
+    pipeline.run(messages, PipelineStages(_prepare, recorder.synthesise, recorder.publish, lambda job: job["feed"]))
+    return recorder
+
+
+def test_pipeline_discards_only_after_publishing():
+    messages = [
+        (0, (0, "a", None)),
+        (1, (1, "b", "prepare")),
+        (2, (2, "a", "synthesise")),
+        (3, (3, None, "discard")),
+        (4, (4, None, "keep")),
+        (5, (5, "b", "publish")),
+        (6, (6, "b", None)),
+    ]
+
+    recorder = _run(messages, PIPELINE_SYNTHESISE_WORKERS="3")
+
+    assert sorted(recorder.discarded) == [0, 3, 6]
+    assert sorted(recorder.published) == [("a", 0), ("b", 6)]
+    assert recorder.discard_threads == {threading.current_thread().name}
+
+
+def test_pipeline_publishes_each_feed_in_inbox_order():
+    random.seed(1)
+    messages = [(i, (i, f"feed{i % 3}", None)) for i in range(60)]
+
+    recorder = _run(messages, PIPELINE_SYNTHESISE_WORKERS="4", PIPELINE_PUBLISH_WORKERS="2")
+
+    for feed in ("feed0", "feed1", "feed2"):
+        published = [idx for key, idx in recorder.published if key == feed]
+        assert published == sorted(published)
+        assert len(published) == 20
+    assert sorted(recorder.discarded) == list(range(60))
+    assert recorder.max_active > 1
+
+
+def test_pipeline_bounds_messages_in_flight():
+    pulled = []
+    recorder = Recorder()
+    pipeline = InboxPipeline(
+        Config().add_dictionary({"PIPELINE_MAX_IN_FLIGHT": "3"}), Mock(), lambda message: message, recorder.discard)
+
+    def messages():
+        for i in range(20):
+            pulled.append(i)
+            assert len(pulled) - len(recorder.discarded) <= 4
+            yield i, (i, "feed", None)
+
+    pipeline.run(messages(), PipelineStages(_prepare, recorder.synthesise, recorder.publish, lambda job: job["feed"]))
+
+    assert sorted(recorder.discarded) == list(range(20))
+
+
+def test_pipeline_is_used_when_enabled():
+    inbox = Mock()
+    inbox.get_messages.return_value = iter([(0, (0, "a", None))])
+    recorder = Recorder()
+    config = Config().add_dictionary({"PIPELINE_ENABLED": "true"})
+    callback = Mock()
+
+    processor = InboxProcessor(config, Mock(), inbox)
+    processor.process_email = lambda message: message
+    processor.process_inbox(
+        callback, stages=PipelineStages(_prepare, recorder.synthesise, recorder.publish, lambda job: job["feed"]))
+
+    callback.assert_not_called()
+    assert recorder.published == [("a", 0)]
+    inbox.discard_message.assert_called_once_with(0)
+    assert [name for name, _, _ in inbox.method_calls][-2:] == ["discard_message", "commit"]
+
+
+def test_pipeline_raises_when_discarding_fails():
+    published = []
+
+    def discard(idx):
+        raise RuntimeError("STORE failed")
+
+    def publish(job):
+        published.append(job["idx"])
+        return True
+
+    pipeline = InboxPipeline(
+        Config().add_dictionary({"PIPELINE_MAX_IN_FLIGHT": "1"}), Mock(), lambda message: message, discard)
+    messages = [(i, (i, "a", None)) for i in range(5)]
+    result = []
+
+    def run():
+        try:
+            pipeline.run(messages, PipelineStages(_prepare, lambda job: job, publish, lambda job: job["feed"]))
+        except RuntimeError as e:
+            result.append(e)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    thread.join(timeout=10)
+
+    assert not thread.is_alive(), "run did not return"
+    assert str(result[0]) == "STORE failed"
+    assert len(published) < 5
@@ -0,0 +1,133 @@
+from email import message_from_bytes
+from email.message import EmailMessage
+import imaplib
+import pytest
+from bs4 import BeautifulSoup
+from mock import Mock
+from email_exporter.config import Config
+from email_exporter.inbox import Inbox, InboxProcessor, InboxStateStore
+from email_exporter.inbox import inbox_item
+from .imap_server import ImapStandIn, raw_email
+
+INBOX_ADDRESS = "inbox@example.com"
+
+
+@pytest.fixture
+def imap_server(monkeypatch):
+    messages = [
+        raw_email("For alice", "Substack <news@substack.com>", to="alice@example.com"),
+        raw_email("Spam", "Spammer <spam@example.net>", to="nobody@example.com"),
+        raw_email("Forwarded by bob", "Bob <bob@example.com>", to=INBOX_ADDRESS),
+        raw_email("For mallory", "Substack <news@substack.com>", to="mallory@example.com"),
+    ]
+    with ImapStandIn(messages) as server:
+        monkeypatch.setattr(imaplib, "IMAP4_SSL", lambda host: imaplib.IMAP4(host, server.port))
+        yield server
+
+
+def _create_processor(**extra_config) -> InboxProcessor:
+    config = Config().add_dictionary({
+        "EMAIL_SERVER": "127.0.0.1",
+        "EMAIL_LOGIN": INBOX_ADDRESS,
+        "EMAIL_PASSWORD": "password",
+        **extra_config
+    })
+    return InboxProcessor(config, Mock(), Inbox(config, Mock(), InboxStateStore.disabled()))
+
+
+def test_process_inbox_only_downloads_routable_messages(imap_server):
+    handled = []
+    resolved = []
+
+    def is_routable(owners):
+        resolved.append(set(owners))
+        return {"alice@example.com", "bob@example.com"}
+
+    _create_processor().process_inbox(lambda item: handled.append(item) or True, is_routable)
+
+    assert [(item.title, item.owner) for item in handled] == [
+        ("For alice", "alice@example.com"), ("Forwarded by bob", "bob@example.com")]
+    assert resolved == [{"alice@example.com", "nobody@example.com", "bob@example.com", "mallory@example.com"}]
+    assert imap_server.commands_named("UID FETCH")[-1] == "UID FETCH 1,3 (RFC822)"
+    assert all("\\Flagged" in flags for flags in imap_server.flags.values())
+
+
+def test_process_inbox_downloads_everything_when_routing_fails(imap_server):
+    handled = []
+
+    def is_routable(owners):
+        raise RuntimeError("Firestore unavailable")
+
+    _create_processor().process_inbox(lambda item: handled.append(item.title) or False, is_routable)
+
+    assert handled == ["For alice", "Spam", "Forwarded by bob", "For mallory"]
+    assert not any(imap_server.flags.values())
+
+
+def test_process_inbox_without_routing_downloads_everything(imap_server):
+    handled = []
+
+    _create_processor().process_inbox(lambda item: handled.append(item.title) or False)
+
+    assert handled == ["For alice", "Spam", "Forwarded by bob", "For mallory"]
+    assert imap_server.commands_named("UID FETCH") == ["UID FETCH 1,2,3,4 (RFC822)"]
+
+
+def test_process_inbox_routes_on_full_headers_in_text_parts_mode(imap_server):
+    handled = []
+
+    _create_processor(IMAP_FETCH_MODE="text_parts").process_inbox(
+        lambda item: handled.append(item) or True, lambda owners: {"alice@example.com", "bob@example.com"})
+
+    assert [(item.title, item.owner, item.sender) for item in handled] == [
+        ("For alice", "alice@example.com", "news@substack.com"), ("Forwarded by bob", "bob@example.com", "")]
+    assert handled[0].html.strip() == "<html><body><p>Paragraph</p></body></html>"
+    assert imap_server.commands_named("UID FETCH") == [
+        "UID FETCH 1,2,3,4 (BODYSTRUCTURE BODY.PEEK[HEADER])",
+        "UID FETCH 1,3 (BODY.PEEK[1] BODY.PEEK[2])",
+    ]
+
+
+def _message(html: str, plain: str = "Plain text", attachment: bytes = b""):
+    message = EmailMessage()
+    message["Subject"] = "Subject"
+    message["From"] = "Writer <writer@substack.com>"
+    message["To"] = "alice@example.com"
+    message["Date"] = "Mon, 1 Jan 2024 08:00:00 +0000"
+    message.set_content(plain)
+    message.add_alternative(html, subtype="html")
+    if attachment:
+        message.add_attachment(attachment, maintype="image", subtype="png", filename="image.png")
+    return message_from_bytes(message.as_bytes())
+
+
+def test_process_email_parses_soup_lazily_once(monkeypatch):
+    parsed = []
+    monkeypatch.setattr(inbox_item, "BeautifulSoup", lambda html, parser: parsed.append(html) or BeautifulSoup(
+        html, parser))
+
+    item = InboxProcessor(Config(), Mock(), Mock()).process_email(_message("<div><p>Hello</p></div>", "<p>Plain</p>"))
+
+    assert parsed == []
+    assert item.soup is item.soup
+    assert item.soup.p.text == "Hello"
+    assert parsed == [item.html]
+
+
+def test_process_email_selects_parts_by_content_type():
+    item = InboxProcessor(Config(), Mock(), Mock()).process_email(
+        _message("<table><tr><td>No paragraphs</td></tr></table>", attachment=bytes(range(256))))
+
+    assert "No paragraphs" in item.html
+    assert item.mime.strip() == "Plain text"
+    assert item.soup.td.text == "No paragraphs"
+
+
+def test_release_drops_the_raw_bodies_and_the_soup():
+    item = InboxProcessor(Config(), Mock(), Mock()).process_email(_message("<p>Hello</p>"))
+    assert item.soup.p.text == "Hello"
+
+    item.release()
+
+    assert (item.html, item.mime) == ("", "")
+    assert item.soup is None
@@ -0,0 +1,81 @@
+from bs4 import BeautifulSoup
+import pytest
+from email_exporter.parsers.content_item import ContentItem
+from email_exporter.parsers.content_item import generic, ghost, mailgun, substack, tc
+
+SNIPPETS = [
+    "<p>Hello world</p>",
+    "<p> </p>",
+    "<h2>Header</h2>",
+    "<ul><li>One</li><li>Two</li></ul>",
+    "<blockquote><p>Quote</p></blockquote>",
+    "<div><hr/></div>",
+    "<div class=\"tweet\"><p>tweet</p></div>",
+    "<div><img alt=\"Twitter avatar for @someone\" src=\"a.png\"/></div>",
+    "<div class=\"captioned-image-container-static\"><img src=\"a.png\"/></div>",
+    "<p><a class=\"button\" href=\"#\"><span>Subscribe</span></a></p>",
+    "<a class=\"youtube-wrap\" href=\"#\"><img src=\"a/b\"/></a>",
+    "<table class=\"kg-cta-card\"><tr><td>cta</td></tr></table>",
+    "<div class=\"kg-image-card\"><img src=\"a.png\"/></div>",
+    "<td class=\"footer\">footer</td>",
+    "<table class=\"img-container\"><tr><td><img src=\"a.png\"/></td></tr></table>",
+    "<table class=\"button\"><tr><td>Subscribe</td></tr></table>",
+    "<td><img src=\"a.png\"/><p>caption</p></td>",
+    "<div><img src=\"a.png\"/></div>",
+    "<p><a href=\"#\">Read more</a></p>",
+    "<div><blockquote class=\"twitter-tweet\"><p>tweet</p></blockquote></div>",
+    "<span>loose span</span>",
+]
+
+
+def _components():
+    for snippet in SNIPPETS:
+        soup = BeautifulSoup(f"<section>{snippet} text</section>", "html.parser")
+        yield from soup.section.contents
+
+
+def _linear_to_item(component, content_items):
+    return next(item for item in content_items if item.match_component(component))
+
+
+@pytest.mark.parametrize("component", list(_components()), ids=str)
+def test_to_item_matches_linear_scan(component):
+    item = ContentItem.to_item(component)
+
+    assert type(item) is _linear_to_item(component, ContentItem.content_items)
+
+
+def test_cross_platform_matchers_keep_their_priority():
+    button = BeautifulSoup(
+        "<blockquote><p><a class=\"button\" href=\"#\">x</a> Quoted</p></blockquote>", "html.parser").blockquote
+    read_more = BeautifulSoup("<p><a href=\"#\">Read more</a></p>", "html.parser").p
+    footer = BeautifulSoup("<td class=\"footer\">footer</td>", "html.parser").td
+
+    assert type(ContentItem.to_item(button)) is substack.Button
+    assert type(ContentItem.to_item(read_more)) is tc.CtaButton
+    assert type(ContentItem.to_item(footer)) is mailgun.Footer
+
+
+def test_match_tags_are_respected():
+    all_items = [*tc.items, *substack.items, *mailgun.items, *ghost.items, *generic.items]
+    for component in _components():
+        for content_item in all_items:
+            if content_item.match_tags is not None and component.name not in content_item.match_tags:
+                assert not content_item.match_component(component), (content_item, component)
+
+
+def test_match_stats():
+    ContentItem.match_stats.reset()
+    ContentItem.match_stats.enabled = True
+    try:
+        ContentItem.to_item(BeautifulSoup("<h3>Header</h3>", "html.parser").h3)
+    finally:
+        ContentItem.match_stats.enabled = False
+
+    report = {row["matcher"]: row for row in ContentItem.match_stats.report()}
+    ContentItem.match_stats.reset()
+
+    assert report["generic.Header"]["hits"] == 1
+    assert report["substack.Tweet"]["calls"] == 1
+    assert "generic.Paragraph" not in report
+    assert "mailgun.Footer" not in report
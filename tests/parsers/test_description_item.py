@@ -0,0 +1,88 @@
+from bs4 import BeautifulSoup
+from mock import Mock
+from email_exporter.parsers import description_item
+from email_exporter.parsers.content_item import ContentItem
+from email_exporter.parsers.description_item.description_item_abc import DescriptionItemABC
+from email_exporter.parsers.emitter_parser import EmitterParser
+
+HTML = (
+    "<div>"
+    "<p class=\"intro\" style=\"color: red\">Read <a href=\"https://example.com/a\" target=\"_blank\">this</a></p>"
+    "<div class=\"captioned-image-container-static\"><img src=\"https://example.com/i.png\" alt=\"Chart\""
+    " width=\"600\"/></div>"
+    "<p>Second <a href=\"https://example.com/b\">link</a></p>"
+    "</div>")
+
+
+def _content_items():
+    soup = BeautifulSoup(HTML, "html.parser")
+    return soup, [ContentItem.to_item(component) for component in soup.div.children]
+
+
+def test_to_text_does_not_modify_the_soup():
+    soup, _ = _content_items()
+    before = str(soup)
+    description = description_item.Text(soup.p)
+
+    assert description.to_text() == "<p>Read <a href=\"https://example.com/a\">this</a></p>"
+    assert description.to_text(remove_href=True) == "<p>Read <a>this</a></p>"
+    assert str(soup) == before
+
+
+def test_to_text_renders_once(monkeypatch):
+    rendered = []
+    render = DescriptionItemABC._render
+    monkeypatch.setattr(DescriptionItemABC, "_render", lambda self: rendered.append(self) or render(self))
+    soup, _ = _content_items()
+    description = description_item.Text(soup.p)
+
+    for remove_href in (False, True, False, True):
+        description.to_text(remove_href)
+
+    assert rendered == [description]
+    assert description.text_length(True) == len("<p>Read <a>this</a></p>")
+
+
+def test_get_description_without_limit_keeps_hrefs():
+    soup, items = _content_items()
+    sut = EmitterParser(Mock(), Mock())
+
+    result = sut._get_description(items, Mock(title="Title"))
+
+    assert result == [
+        "<p>Read <a href=\"https://example.com/a\">this</a></p>",
+        "<img alt=\"Chart\" src=\"https://example.com/i.png\"/>",
+        "<p>Second <a href=\"https://example.com/b\">link</a></p>",
+    ]
+
+
+def test_get_description_drops_hrefs_then_largest_content_type():
+    _, items = _content_items()
+    sut = EmitterParser(Mock(), Mock())
+    title = "<h1>Title</h1>"
+
+    without_href = sut._get_description(items, Mock(title="Title"))
+    sut.description_limit = len("\n".join([title, *without_href])) - 1
+    result = sut._get_description(items, Mock(title="Title"))
+
+    assert result == [
+        "<p>Read <a>this</a></p>",
+        "<img alt=\"Chart\" src=\"https://example.com/i.png\"/>",
+        "<p>Second <a>link</a></p>",
+    ]
+
+    sut.description_limit = len("\n".join([title, *result])) - 1
+
+    # The images are the largest content type; with them gone the hrefs are tried again, then dropped
+    assert sut._get_description(items, Mock(title="Title")) == [
+        "<p>Read <a>this</a></p>",
+        "<p>Second <a>link</a></p>",
+    ]
+
+
+def test_get_description_returns_title_when_nothing_fits():
+    _, items = _content_items()
+    sut = EmitterParser(Mock(), Mock())
+    sut.description_limit = 1
+
+    assert sut._get_description(items, Mock(title="Title")) == ["<h1>Title</h1>"]
@@ -0,0 +1,173 @@
+from bs4 import BeautifulSoup
+from mock import Mock
+import pytest
+from email_exporter.inbox import InboxItem
+from email_exporter.parsers.content_item import ContentItem
+from email_exporter.parsers.emitter_parser import EmitterParser
+from ssml import MinifyStats
+from email_exporter.tools.benchmarks import newsletter_content_items
+from functools import reduce
+from ssml import RawText, SpeechBuilder, SsmlTagABC, tags
+
+# The pronunciations and chunker of the baseline EmitterParser, frozen as the reference the chunker has to match
+BASELINE_PRONUNCIATIONS = [
+    ("gergely", True, lambda s: tags.Phoneme(RawText(s), alphabet="x-sampa", ph="gergeI")),
+    ("orosz", True, lambda s: tags.Phoneme(RawText(s), alphabet="x-sampa", ph="Or\\:\\os"))
+]
+
+
+def baseline_content_items_to_ssml(content_items, speech_limit):
+    ssml_tags: list[SsmlTagABC] = reduce(
+        lambda arr, item: [*arr, *item.get_ssml()], content_items, [])
+
+    def convert(_ssml_tags: list[SsmlTagABC]):
+        speech = SpeechBuilder()
+        for item in _ssml_tags:
+            speech.add_tag(item)
+        ssml = speech.speak()
+        for text, ignore_case, replacer in BASELINE_PRONUNCIATIONS:
+            ssml = ssml.replace_text(text, replacer, ignore_case=ignore_case)
+        return ssml.to_string()
+
+    i = 0
+    while i < len(ssml_tags):
+        j = i
+        while len(convert(ssml_tags[i:j])) <= speech_limit and j <= len(ssml_tags):
+            j += 1
+        if i == j:
+            raise Exception("speech item is too long")
+        yield convert(ssml_tags[i:j - 1])
+        i = j - 1
+
+
+@pytest.mark.parametrize("speech_limit", [800, 1500, 4500])
+def test_content_items_to_ssml_matches_baseline_chunker(speech_limit):
+    items = newsletter_content_items(60)
+    sut = EmitterParser(Mock(), Mock())
+    sut.speech_limit = speech_limit
+    # The baseline neither minified nor counted bytes, which are the characters of this ascii text
+    sut.minify = False
+
+    result = list(sut._content_items_to_ssml(items))
+
+    assert result == list(baseline_content_items_to_ssml(items, speech_limit))
+    assert all(len(chunk.encode()) <= speech_limit for chunk in result)
+
+
+@pytest.mark.parametrize("speech_limit", [800, 1500])
+def test_content_items_to_ssml_packs_utf8_bytes(speech_limit):
+    html = ''.join(f"<p>{'Привет, мир! 👋 ' * (1 + i % 5)}</p>" for i in range(40))
+    soup = BeautifulSoup(f"<div>{html}</div>", "html.parser")
+    items = [ContentItem.to_item(component) for component in soup.div.children]
+    sut = EmitterParser(Mock(), Mock())
+    sut.speech_limit = speech_limit
+
+    result = list(sut._content_items_to_ssml(items))
+    sut.speech_limit = 100_000
+    whole = list(sut._content_items_to_ssml(items))
+
+    def inner(chunk):
+        return chunk[len("<speak>"):-len("</speak>")]
+
+    assert "".join(map(inner, result)) == inner(whole[0])
+    assert all(len(chunk.encode()) <= speech_limit for chunk in result)
+    # Measured in characters, the chunks would be well under the limit
+    assert max(len(chunk) for chunk in result) < speech_limit * 2 // 3
+
+
+def test_content_items_to_ssml_without_minify_matches_baseline_chunker():
+    items = newsletter_content_items(50)
+    sut = EmitterParser(Mock(), Mock())
+    sut.minify = False
+
+    result = list(sut._content_items_to_ssml(items))
+
+    assert result == list(baseline_content_items_to_ssml(items, sut.speech_limit))
+    assert "<p><s>Section 0</s></p>" in result[0]
+
+
+def test_content_items_to_ssml_minifies_and_counts_savings():
+    items = newsletter_content_items(50)
+    sut = EmitterParser(Mock(), Mock())
+    stats = MinifyStats()
+
+    result = list(sut._content_items_to_ssml(items, stats))
+
+    assert "<p>Section 0</p>" in result[0]
+    assert stats.saved == len("<s></s>") * 5
+    assert stats.after == sum(len(chunk) - len("<speak></speak>") for chunk in result)
+
+
+def test_content_items_to_ssml_applies_pronunciation():
+    items = newsletter_content_items(2)
+    sut = EmitterParser(Mock(), Mock())
+
+    result = list(sut._content_items_to_ssml(items))
+
+    assert len(result) == 1
+    assert '<phoneme alphabet="x-sampa" ph="gergeI">Gergely</phoneme>' in result[0]
+
+
+def test_content_items_to_ssml_no_items():
+    sut = EmitterParser(Mock(), Mock())
+
+    assert list(sut._content_items_to_ssml([])) == []
+
+
+def test_content_items_to_ssml_item_too_long_raises():
+    items = newsletter_content_items(4)
+    sut = EmitterParser(Mock(), Mock())
+    sut.speech_limit = 100
+
+    with pytest.raises(Exception, match="speech item is too long"):
+        list(sut._content_items_to_ssml(items))
+
+
+def _streaming_parser(items, emitted):
+    emitter = Mock(strainer=None)
+
+    def get_items(inbox_item):
+        for item in items:
+            emitted.append(item)
+            yield item
+
+    emitter.get_items = get_items
+    sut = EmitterParser(Mock(), emitter)
+    sut.speech_limit = 800
+    return sut
+
+
+def _inbox_item():
+    return InboxItem("Title", "date", "", "", BeautifulSoup("<p></p>", "lxml"), ("to@example.com", "from@example.com"))
+
+
+def test_parse_stream_yields_chunks_before_all_items_are_emitted():
+    items = newsletter_content_items(60)
+    emitted: list = []
+    parsed_item = _streaming_parser(items, emitted).parse_stream(_inbox_item())
+
+    first = next(iter(parsed_item.ssml))
+
+    assert first == list(_streaming_parser(items, [])._content_items_to_ssml(items))[0]
+    assert 0 < len(emitted) < len(items)
+
+
+def test_parse_stream_matches_parse():
+    items = newsletter_content_items(60)
+    streamed = _streaming_parser(items, []).parse_stream(_inbox_item())
+
+    with pytest.raises(RuntimeError):
+        streamed.combined_description
+
+    ssml = list(streamed.ssml)
+    parsed = _streaming_parser(items, []).parse(_inbox_item())
+
+    assert ssml == parsed.ssml
+    assert streamed.combined_description == parsed.combined_description
+
+
+def test_parse_stream_without_items_raises():
+    parsed_item = _streaming_parser([], []).parse_stream(_inbox_item())
+
+    with pytest.raises(Exception, match="No items were generated"):
+        list(parsed_item.ssml)
@@ -0,0 +1,45 @@
+from mock import Mock
+import pytest
+import random
+from ssml import SpeechBuilder
+from email_exporter.parsers.general_parser import GeneralParser
+
+
+def _reference_to_ssms(speech_limit, lines, headers):
+    """The chunker as it was before each line was measured once: the whole speech is rendered after each line"""
+    def build_speech(_lines):
+        speech = SpeechBuilder()
+        for line in _lines:
+            speech.pause(time="1.5s" if line in headers else "0.75s")
+            speech.add_text(line)
+        return speech
+
+    last_built = 0
+    for i, line in enumerate(lines):
+        if len(build_speech(lines[last_built:i + 1]).speak().to_string().encode()) > speech_limit:
+            if last_built == i - 1:
+                raise Exception("Single section too long")
+            yield build_speech(lines[last_built:i]).speak().to_string()
+            last_built = i
+    yield build_speech(lines[last_built:]).speak().to_string()
+
+
+def _chunks(to_ssms):
+    try:
+        return list(to_ssms)
+    except Exception as e:
+        return str(e)
+
+
+@pytest.mark.parametrize("speech_limit", [200, 500, 4500])
+def test_to_ssms_matches_reference_chunker(speech_limit):
+    sut = GeneralParser(Mock())
+    sut.speech_limit = speech_limit
+    rng = random.Random(speech_limit)
+
+    for _ in range(50):
+        lines = [rng.choice(["word ", "слово ", "👋 "]) * rng.randint(1, 25) for _ in range(rng.randint(0, 40))]
+        headers = rng.sample(lines, min(3, len(lines)))
+
+        assert _chunks(sut._to_ssms(lines, headers)) == \
+            _chunks(_reference_to_ssms(speech_limit, lines, headers))
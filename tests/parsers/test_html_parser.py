@@ -0,0 +1,54 @@
+from mock import Mock
+from pathlib import Path
+import pytest
+from email_exporter.inbox import InboxItem
+from email_exporter.parsers.emitter_parser import EmitterParser
+from email_exporter.parsers.general_parser import GeneralParser
+from email_exporter.parsers.ghost_parser import GhostItemEmitter
+from email_exporter.parsers.mailgun_parser import MailgunItemEmitter
+from email_exporter.parsers.substack_parser import SubstackItemEmitter
+from email_exporter.parsers.tc_parser import TcItemEmitter
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+PARSERS = {
+    "substack": lambda: EmitterParser(Mock(), SubstackItemEmitter()),
+    "tc": lambda: EmitterParser(Mock(), TcItemEmitter()),
+    "ghost": lambda: EmitterParser(Mock(), GhostItemEmitter()),
+    "mailgun": lambda: EmitterParser(Mock(), MailgunItemEmitter()),
+    "general": lambda: GeneralParser(Mock()),
+}
+
+
+def _parse(fixture: str, html_parser: str):
+    html = (FIXTURES / f"{fixture}.html").read_text()
+    inbox_item = InboxItem("Week in review", "date", html, "", None, ("to@example.com", "from@example.com"),
+                           html_parser=html_parser)
+    parsed_item = PARSERS[fixture]().parse(inbox_item)
+    return parsed_item.ssml, parsed_item.combined_description
+
+
+@pytest.mark.parametrize("fixture", list(PARSERS))
+def test_lxml_and_html_parser_produce_the_same_output(fixture):
+    ssml, description = _parse(fixture, "html.parser")
+
+    assert ssml, "fixture produced no speech"
+    assert _parse(fixture, "lxml") == (ssml, description)
+
+
+def test_inbox_item_defaults_to_lxml():
+    inbox_item = InboxItem("t", "d", "<p>Hello</p>", "", None, ("to", None))
+
+    assert inbox_item.html_parser == "lxml"
+    assert inbox_item.soup.html is not None, "lxml wraps fragments in a document"
+
+
+def test_lxml_closes_implied_list_items():
+    html = "<div class=\"post\"><div><ul><li>One<li>Two</ul></div></div>"
+
+    def items(html_parser):
+        inbox_item = InboxItem("t", "d", html, "", None, ("to", None), html_parser=html_parser)
+        return [li.get_text() for li in inbox_item.soup.find_all("li")]
+
+    assert items("lxml") == ["One", "Two"]
+    assert items("html.parser") == ["OneTwo", "Two"]
@@ -0,0 +1,101 @@
+from bs4 import BeautifulSoup
+from pathlib import Path
+import pytest
+import re
+from email_exporter.parsers.content_item import node_features as node_features_module
+from email_exporter.parsers.content_item.node_features import node_features
+from email_exporter.parsers.content_item.substack.captioned_image import CaptionedImage
+from email_exporter.parsers.content_item.substack.tweet import Tweet
+from email_exporter.parsers.content_item.util import is_tweet
+from email_exporter.parsers.tc_parser.tc_table.tc_table_abc import TcTableABC
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+TWEET = (
+    "<div><a><div><img alt=\"Twitter avatar for @someone\" src=\"a.png\"/><span>Someone</span><span>@someone"
+    "</span></div><div><p><span>12 Retweets</span><span>40 Likes</span></p></div></a></div>")
+GMAIL_IMAGE = "<div><table><tr><td></td><td><img src=\"a.png\"/></td><td>caption</td></tr></table></div>"
+
+
+def _tweet_reference(component):
+    if not hasattr(component, "attrs"):
+        return False
+    if "class" in component.attrs and "tweet" in component["class"]:
+        return True
+    return component.name == "div" and any([
+        img["alt"].startswith("Twitter avatar for")
+        for img in component.find_all("img")
+        if "alt" in img.attrs and img["alt"]])
+
+
+def _captioned_image_reference(component):
+    if not hasattr(component, "attrs"):
+        return False
+    if "class" in component.attrs and "captioned-image-container-static" in component["class"]:
+        return True
+    return component.name == "div" and \
+        len(component.find_all("table")) == 1 and \
+        len(component.table.find_all("td")) == 3 and \
+        len(component.table.find_all("img")) == 1
+
+
+def _is_tweet_reference(component):
+    spans = component.find_all("span")
+    return any(re.match(r"\d*\sRetweets", s.get_text()) for s in spans) and \
+        any(re.match(r"\d*\sLikes", s.get_text()) for s in spans)
+
+
+def _has_n_child_of_type_reference(component, _type, n=1):
+    contents_without_nl = [content for content in component.contents if content != "\n"]
+    return len(contents_without_nl) == n and all(c.name == _type for c in contents_without_nl)
+
+
+def _documents():
+    yield from (FIXTURES / fixture for fixture in sorted(FIXTURES.iterdir()))
+    yield TWEET
+    yield GMAIL_IMAGE
+
+
+@pytest.mark.parametrize("document", list(_documents()), ids=str)
+def test_predicates_match_subtree_walks(document):
+    html = document.read_text() if isinstance(document, Path) else document
+    soup = BeautifulSoup(html, "html.parser")
+
+    for node in [soup, *soup.descendants]:
+        assert Tweet.match_component(node) == _tweet_reference(node)
+        assert CaptionedImage.match_component(node) == _captioned_image_reference(node)
+        if hasattr(node, "find_all"):
+            assert is_tweet(node) == _is_tweet_reference(node)
+            for name in ("tr", "td", "table", "p"):
+                for n in (1, 2, 3):
+                    assert TcTableABC._has_n_child_of_type(node, name, n) == \
+                        _has_n_child_of_type_reference(node, name, n)
+
+
+def test_fingerprints_are_recognised():
+    assert Tweet.match_component(BeautifulSoup(TWEET, "html.parser").div)
+    assert is_tweet(BeautifulSoup(TWEET, "html.parser").div)
+    assert CaptionedImage.match_component(BeautifulSoup(GMAIL_IMAGE, "html.parser").div)
+
+
+def test_features_are_computed_once_per_node(monkeypatch):
+    built = []
+    features_type = node_features_module.NodeFeatures
+    monkeypatch.setattr(node_features_module, "NodeFeatures", lambda tag: built.append(tag) or features_type(tag))
+    soup = BeautifulSoup(TWEET, "html.parser")
+
+    node_features(soup.span)
+    node_features(soup.div)
+    node_features(soup.div)
+    for node in soup.descendants:
+        node_features(node)
+
+    assert len(built) == len(soup.find_all(True))
+    assert len(set(map(id, built))) == len(built)
+
+
+def test_features_of_text_is_none():
+    soup = BeautifulSoup("<p>text</p>", "html.parser")
+
+    assert node_features(soup.p.contents[0]) is None
+    assert node_features(soup.p).child_names == (None,)
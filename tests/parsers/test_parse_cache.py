@@ -0,0 +1,106 @@
+from mock import Mock
+from pathlib import Path
+import sys
+import types
+from email_exporter.config import Config
+from email_exporter.inbox import InboxItem
+from email_exporter.parsers import ParseCache, StreamedParsedItem
+from email_exporter.parsers.code_fingerprint import code_fingerprint
+from email_exporter.parsers.emitter_parser import EmitterParser
+from email_exporter.parsers.ghost_parser import GhostItemEmitter
+from email_exporter.parsers.substack_parser import SubstackItemEmitter
+from email_exporter.pronunciation_provider import Pronunciation, PronunciationGuide
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def _inbox_item(html=None):
+    html = html or (FIXTURES / "substack.html").read_text()
+    return InboxItem("Title", "date", html, "", None, ("to@example.com", "writer@substack.com"))
+
+
+def _cache(tmp_path):
+    return ParseCache(Config().add_dictionary({"PARSE_CACHE": "disk", "PARSE_CACHE_FOLDER": str(tmp_path)}), Mock())
+
+
+def _spied_parser(**kwargs):
+    sut = EmitterParser(Mock(), SubstackItemEmitter(), **kwargs)
+    sut.parse = Mock(wraps=sut.parse)
+    return sut
+
+
+def test_hit_returns_the_stored_parse(tmp_path):
+    parser = _spied_parser()
+    expected = EmitterParser(Mock(), SubstackItemEmitter()).parse(_inbox_item())
+
+    first = _cache(tmp_path).parse(parser, _inbox_item())
+    cache = _cache(tmp_path)
+    second = cache.parse(parser, _inbox_item())
+
+    assert parser.parse.call_count == 1
+    assert (first.ssml, first.description) == (expected.ssml, expected.description)
+    assert (second.ssml, second.combined_description) == (expected.ssml, expected.combined_description)
+    assert cache.stats == {"hits": 1, "misses": 0}
+
+
+def test_disabled_cache_always_parses():
+    parser = _spied_parser()
+    cache = ParseCache(Config(), Mock())
+
+    cache.parse(parser, _inbox_item())
+    cache.parse(parser, _inbox_item())
+
+    assert not cache.enabled
+    assert parser.parse.call_count == 2
+
+
+def test_key_follows_content_settings_and_pronunciations():
+    def key(parser=None, html=None):
+        return ParseCache.key(parser or EmitterParser(Mock(), SubstackItemEmitter()), _inbox_item(html))
+
+    limited = EmitterParser(Mock(), SubstackItemEmitter())
+    limited.speech_limit = 800
+    guide = PronunciationGuide([Pronunciation("writer", "raIt@r")])
+
+    assert key() == key()
+    assert len({
+        key(),
+        key(html="<div class=\"post\"><p>Other</p></div>"),
+        key(limited),
+        key(EmitterParser(Mock(), SubstackItemEmitter(), guide)),
+        key(EmitterParser(Mock(), GhostItemEmitter())),
+    }) == 5
+
+
+def test_code_fingerprint_changes_with_the_source(tmp_path):
+    source = tmp_path / "probe.py"
+    source.write_text("class Probe:\n    pass\n")
+    module = types.ModuleType("email_exporter.parsers._fingerprint_probe")
+    module.__file__ = str(source)
+    exec(source.read_text(), module.__dict__)
+    module.Probe.__module__ = module.__name__
+    sys.modules[module.__name__] = module
+    try:
+        before = code_fingerprint(module.Probe)
+        source.write_text("class Probe:\n    speech_limit = 1\n")
+        code_fingerprint.cache_clear()
+
+        assert code_fingerprint(module.Probe) != before
+    finally:
+        del sys.modules[module.__name__]
+        code_fingerprint.cache_clear()
+
+
+def test_streamed_miss_is_stored_once_described(tmp_path):
+    parser = EmitterParser(Mock(), SubstackItemEmitter())
+    streamed = _cache(tmp_path).parse_stream(parser, _inbox_item())
+
+    assert isinstance(streamed, StreamedParsedItem)
+    ssml = list(streamed.ssml)
+    assert _cache(tmp_path).get(ParseCache.key(parser, _inbox_item())) is None
+
+    description = streamed.combined_description
+    cached = _cache(tmp_path).parse_stream(parser, _inbox_item())
+
+    assert not isinstance(cached, StreamedParsedItem)
+    assert (cached.ssml, cached.combined_description) == (ssml, description)
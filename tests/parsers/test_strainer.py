@@ -0,0 +1,79 @@
+from bs4 import BeautifulSoup
+from mock import Mock
+from pathlib import Path
+import pytest
+from email_exporter.inbox import InboxItem
+from email_exporter.parsers.emitter_parser import EmitterParser
+from email_exporter.parsers.ghost_parser import GhostItemEmitter
+from email_exporter.parsers.mailgun_parser import MailgunItemEmitter
+from email_exporter.parsers.substack_parser import SubstackItemEmitter
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+EMITTERS = {
+    "substack": SubstackItemEmitter,
+    "ghost": GhostItemEmitter,
+    "mailgun": MailgunItemEmitter,
+}
+
+
+def _inbox_item(html, soup=None):
+    return InboxItem("Title", "date", html, "", soup, ("to@example.com", "from@example.com"))
+
+
+def _parse(emitter, inbox_item):
+    parsed_item = EmitterParser(Mock(), emitter()).parse(inbox_item)
+    return parsed_item.ssml, parsed_item.combined_description
+
+
+@pytest.mark.parametrize("fixture", list(EMITTERS))
+def test_strained_parse_matches_full_parse(fixture):
+    html = (FIXTURES / f"{fixture}.html").read_text()
+    strained = _inbox_item(html)
+    full = _inbox_item(html, BeautifulSoup(html, "lxml"))
+
+    assert _parse(EMITTERS[fixture], strained) == _parse(EMITTERS[fixture], full)
+    assert strained.soup.find("body") is None
+    assert len(str(strained.soup)) < len(str(full.soup))
+
+
+def test_strain_falls_back_to_full_parse_when_region_is_missing():
+    html = (
+        "<html><body><div style=\"font-size: 16px; line-height: 26px\"><div>"
+        "<p>Styled post</p></div></div></body></html>")
+    inbox_item = _inbox_item(html)
+
+    ssml, _ = _parse(SubstackItemEmitter, inbox_item)
+
+    assert "Styled post" in ssml[0]
+    assert inbox_item.soup.body is not None
+
+
+def test_strained_parse_falls_back_to_full_parse_when_it_yields_no_items():
+    html = (
+        "<html><body><div class=\"post\"><table><tr><td>Header</td></tr></table></div>"
+        "<div style=\"font-size: 16px; line-height: 26px\"><div><p>Styled post</p></div></div></body></html>")
+    inbox_item = _inbox_item(html)
+
+    ssml, _ = _parse(SubstackItemEmitter, inbox_item)
+
+    assert "Styled post" in ssml[0]
+    assert inbox_item.soup.body is not None
+
+
+def test_region_is_not_reported_missing_for_a_built_soup():
+    html = "<div class=\"post\"><div><p>Hello</p></div></div>"
+    logger = Mock()
+
+    EmitterParser(logger, SubstackItemEmitter()).parse(_inbox_item(html, BeautifulSoup(html, "lxml")))
+
+    assert not any("Content region not found" in call.args[0] for call in logger.info.call_args_list)
+
+
+def test_strain_does_not_replace_a_built_soup():
+    html = "<table><tr><td class=\"post-content\"><p>Hello</p></td></tr></table>"
+    soup = BeautifulSoup(html, "lxml")
+    inbox_item = _inbox_item(html, soup)
+
+    assert inbox_item.strain(MailgunItemEmitter.strainer) is False
+    assert inbox_item.soup is soup
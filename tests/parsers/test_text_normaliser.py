@@ -0,0 +1,56 @@
+from bs4 import BeautifulSoup
+import pytest
+from email_exporter.parsers.content_item.util import get_text_content
+from email_exporter.parsers.text_normaliser import normalise
+from functools import reduce
+
+
+def baseline_sanitise(text, nl_char):
+    """The sanitise the content items and GeneralParser used before text_normaliser, frozen as a reference"""
+    return reduce(
+        lambda txt, c: txt.replace(*c),
+        [
+            ("\n", nl_char), ("\r", ""),
+            ("—", "-"), ("\xa0", " "), ("–", "-"),
+            ("”", '"'), ("“", '"'),
+            ("‘", "'"), ("’", "'"),
+            ("…", "...")
+        ],
+        text).strip()
+
+
+TEXTS = [
+    "Plain text",
+    "  Padded\r\n lines\n",
+    "“Quoted” — and ‘single’ – with\xa0no-break…",
+    "Café au lait",
+    "",
+]
+
+
+@pytest.mark.parametrize("nl_char", ["", " "])
+@pytest.mark.parametrize("text", TEXTS)
+def test_matches_previous_sanitise(text, nl_char):
+    assert normalise(text, nl_char) == baseline_sanitise(text, nl_char)
+
+
+def test_normalises_more_typography():
+    text = "\u034f\u200c Preview\u200b text \u2014 x\u2212y \u201elow\u201c \u2032a\u2033 soft\xadhyphen\ufeff"
+
+    assert normalise(text) == "Preview text - x-y \"low\" 'a\" softhyphen"
+
+
+def test_keeps_zero_width_joiner_in_emoji():
+    family = "\U0001F468\u200d\U0001F469\u200d\U0001F467"
+
+    assert normalise(family) == family
+
+
+def test_text_content_is_cached_per_node():
+    soup = BeautifulSoup("<p>Hello “world”</p>", "html.parser")
+
+    assert get_text_content(soup.p) == "Hello \"world\""
+    soup.p.string = "Changed"
+
+    assert get_text_content(soup.p) == "Hello \"world\""
+    assert get_text_content(soup.p, nl_char=" ") == "Changed"
@@ -0,0 +1,70 @@
+from bs4 import BeautifulSoup
+from email_exporter.parsers.content_item import ContentItem
+from email_exporter.parsers.content_item.substack import tweet
+from email_exporter.parsers.content_item.substack.tweet import Tweet, TweetRecord
+
+REGULAR = (
+    "<div class=\"tweet\"><a href=\"https://twitter.com/x\"><div><img src=\"a.png\"/><span>Gergely Orosz</span>"
+    "<span>@GergelyOrosz</span></div>Hiring is back https://t.co/abc123 says <span>@someone</span>"
+    "<a href=\"https://example.com\"><img src=\"b.png\"/><span>Example title</span><span>example.com</span>"
+    "<span>x</span></a><a><div><p>Sep 13, 2022</p><span><span>1,234</span> Retweets</span>"
+    "<span><span>5,678</span> Likes</span></div></a></a></div>")
+QUOTE = (
+    "<div class=\"tweet\"><a href=\"https://twitter.com/x\"><div><img src=\"a.png\"/><span>Gergely Orosz</span>"
+    "<span>@GergelyOrosz</span></div>Agreed https://t.co/zzz"
+    "<div><p><span>Someone</span><span>@someone</span></p>Original text</div>"
+    "<a><div><p>Sep 14, 2022</p><span><span>12</span> Likes</span></div></a></a></div>")
+BROKEN = "<div class=\"tweet\"><p>Just text</p></div>"
+
+
+def _tweet(html) -> Tweet:
+    item = ContentItem.to_item(BeautifulSoup(html, "html.parser").div)
+    assert isinstance(item, Tweet)
+    return item
+
+
+def _ssml(item):
+    return "".join(tag.to_string() for tag in item.get_ssml())
+
+
+def test_regular_tweet():
+    item = _tweet(REGULAR)
+
+    assert item.record == TweetRecord(
+        "Gergely Orosz", "@GergelyOrosz", "Sep 13, 2022", 1234, 5678, "Hiring is back  says @someone",
+        ("Example title",))
+    assert _ssml(item) == (
+        "<break time=\"500ms\"></break><p><s>Tweet by @GergelyOrosz:</s></p><p>Hiring is back  says @someone</p>"
+        "<p>Linking to: Example title.</p><break time=\"500ms\"></break>")
+
+
+def test_quote_tweet():
+    item = _tweet(QUOTE)
+
+    assert item.record.like_count == 12
+    assert item.record.retweet_count == 0
+    assert item.record.quoted.username == "@someone"
+    assert _ssml(item) == (
+        "<break time=\"500ms\"></break><p><s>Tweet by @someone:</s></p><p>Original text</p>"
+        "<p><s>To which @GergelyOrosz replied:</s></p><p>Agreed </p><break time=\"500ms\"></break>")
+    assert item.record.to_dict()["quoted"]["text"] == "Original text"
+
+
+def test_broken_tweet():
+    item = _tweet(BROKEN)
+
+    assert item.record is None
+    assert _ssml(item) == "<break time=\"500ms\"></break><p><s>Broken tweet: Fix me.</s></p>"
+
+
+def test_tweet_is_decomposed_once(monkeypatch):
+    decomposed = []
+    to_tweet = Tweet.to_tweet
+    monkeypatch.setattr(tweet.Tweet, "to_tweet", staticmethod(lambda c: decomposed.append(c) or to_tweet(c)))
+    item = _tweet(REGULAR)
+
+    _ssml(item)
+    _ssml(item)
+    item.get_description()
+
+    assert len(decomposed) == 1
@@ -0,0 +1,75 @@
+from ssml import tags, RawText
+from email_exporter.pronunciation_provider import Pronunciation, PronunciationGuide
+
+
+def _speech(*texts):
+    return tags.Speak([tags.P(tags.S(RawText(text))) for text in texts])
+
+
+def test_default_rules():
+    sut = PronunciationGuide()
+
+    result = sut.force_pronunciation(_speech("Gergely Orosz here. gergely!"))
+
+    assert result.to_string() == (
+        '<speak><p><s><phoneme alphabet="x-sampa" ph="gergeI">Gergely</phoneme> '
+        '<phoneme alphabet="x-sampa" ph="Or\\:\\os">Orosz</phoneme> here. '
+        '<phoneme alphabet="x-sampa" ph="gergeI">gergely</phoneme>!</s></p></speak>')
+
+
+def test_matches_the_same_as_one_replace_text_per_rule():
+    pronunciations = [Pronunciation("gergely", "gergeI"), Pronunciation("orosz", "Or\\:\\os")]
+    speech = _speech("Gergely Orosz", "No names here", "OROSZ and gergely and Gergely")
+
+    expected = speech
+    for pronunciation in pronunciations:
+        expected = expected.replace_text(
+            pronunciation.text,
+            lambda s, p=pronunciation: tags.Phoneme(RawText(s), alphabet=p.alphabet, ph=p.ph),
+            ignore_case=True)
+
+    assert PronunciationGuide(pronunciations).force_pronunciation(speech).to_string() == expected.to_string()
+
+
+def test_prefers_the_longest_rule():
+    sut = PronunciationGuide([Pronunciation("new", "nju:"), Pronunciation("new york", "nju: jOrk")])
+
+    result = sut.force_pronunciation(RawText("New York is new"))
+
+    assert result.to_string() == (
+        '<phoneme alphabet="x-sampa" ph="nju: jOrk">New York</phoneme> is '
+        '<phoneme alphabet="x-sampa" ph="nju:">new</phoneme>')
+
+
+def test_case_sensitive_rules():
+    sut = PronunciationGuide([Pronunciation("US", "ju: Es", ignore_case=False)])
+
+    result = sut.force_pronunciation(RawText("US news for us"))
+
+    assert result.to_string() == '<phoneme alphabet="x-sampa" ph="ju: Es">US</phoneme> news for us'
+
+
+def test_case_sensitive_rule_in_another_case_leaves_overlapping_rules():
+    sut = PronunciationGuide([
+        Pronunciation("US Open", "ju: Es @Up@n", ignore_case=False),
+        Pronunciation("us", "Vs"),
+        Pronunciation("open", "@Up@n"),
+    ])
+
+    assert sut.force_pronunciation(RawText("US Open")).to_string() == \
+        '<phoneme alphabet="x-sampa" ph="ju: Es @Up@n">US Open</phoneme>'
+    assert sut.force_pronunciation(RawText("us open")).to_string() == (
+        '<phoneme alphabet="x-sampa" ph="Vs">us</phoneme> <phoneme alphabet="x-sampa" ph="@Up@n">open</phoneme>')
+
+
+def test_later_rules_win():
+    sut = PronunciationGuide([Pronunciation("orosz", "a"), Pronunciation("Orosz", "b")])
+
+    assert sut.force_pronunciation(RawText("Orosz")).to_string() == '<phoneme alphabet="x-sampa" ph="b">Orosz</phoneme>'
+
+
+def test_no_match_returns_the_same_tree():
+    speech = _speech("Nothing to see")
+
+    assert PronunciationGuide().force_pronunciation(speech) is speech
+    assert PronunciationGuide([]).force_pronunciation(speech) is speech
@@ -0,0 +1,72 @@
+from mock import Mock
+from email_exporter.config import Config
+from email_exporter.pronunciation_provider import PronunciationProvider
+from email_exporter.pronunciation_provider.pronunciation_provider import GLOBAL_DOCUMENT
+from ssml import RawText
+
+
+def _firestore(documents):
+    def _document(key):
+        snapshot = Mock()
+        snapshot.exists = key in documents
+        snapshot.to_dict.return_value = documents.get(key)
+        document = Mock()
+        document.get.return_value = snapshot
+        return document
+
+    collection = Mock()
+    collection.document = Mock(side_effect=_document)
+    firestore_client = Mock()
+    firestore_client.collection.return_value = collection
+    return firestore_client, collection
+
+
+def _item(owner="owner@example.com", sender="news@platformer.news"):
+    item = Mock()
+    item.owner = owner
+    item.sender = sender
+    return item
+
+
+def _config():
+    return Config().add_dictionary({"PRONUNCIATIONS_COLLECTION": "pronunciations"})
+
+
+def test_without_collection_uses_default_rules():
+    firestore_client, _ = _firestore({})
+    sut = PronunciationProvider(Config(), Mock(), firestore_client)
+
+    guide = sut.get_guide(_item())
+
+    assert "gergeI" in guide.force_pronunciation(RawText("Gergely")).to_string()
+    firestore_client.collection.assert_not_called()
+
+
+def test_merges_global_sender_and_owner_documents():
+    firestore_client, _ = _firestore({
+        GLOBAL_DOCUMENT: {"casey": {"ph": "global"}, "newton": {"ph": "n"}},
+        "platformer.news": {"casey": {"ph": "sender"}, "not a rule": "ignored"},
+        "owner@example.com": {"platformer": {"ph": "plat", "alphabet": "ipa"}},
+    })
+    sut = PronunciationProvider(_config(), Mock(), firestore_client)
+
+    result = sut.get_guide(_item()).force_pronunciation(RawText("Casey Newton, Platformer, Gergely")).to_string()
+
+    assert result == (
+        '<phoneme alphabet="x-sampa" ph="sender">Casey</phoneme> '
+        '<phoneme alphabet="x-sampa" ph="n">Newton</phoneme>, '
+        '<phoneme alphabet="ipa" ph="plat">Platformer</phoneme>, '
+        '<phoneme alphabet="x-sampa" ph="gergeI">Gergely</phoneme>')
+
+
+def test_documents_and_guides_are_cached():
+    firestore_client, collection = _firestore({GLOBAL_DOCUMENT: {"casey": {"ph": "k"}}})
+    sut = PronunciationProvider(_config(), Mock(), firestore_client)
+
+    first = sut.get_guide(_item())
+    second = sut.get_guide(_item())
+    sut.get_guide(_item(owner="other@example.com"))
+
+    assert first is second
+    assert [call.args[0] for call in collection.document.call_args_list] == [
+        GLOBAL_DOCUMENT, "platformer.news", "owner@example.com", "other@example.com"]
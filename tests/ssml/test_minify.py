@@ -0,0 +1,77 @@
+import pytest
+from ssml import tags, RawText, MinifyStats, minify, minify_tags
+
+
+def _render(ssml_tags):
+    return "".join(tag.to_string() for tag in ssml_tags)
+
+
+def test_collapses_single_sentence_paragraphs():
+    assert minify(tags.P(tags.S(RawText("Hello")))).to_string() == "<p>Hello</p>"
+    assert minify(tags.P([tags.S(RawText("a")), tags.S(RawText("b"))])).to_string() == "<p><s>a</s><s>b</s></p>"
+
+
+def test_drops_empty_containers():
+    speech = tags.Speak([tags.P(tags.S(RawText("  "))), tags.Emphasis(RawText(""), level="strong"), RawText("Hello")])
+
+    assert minify(speech).to_string() == "<speak>Hello</speak>"
+
+
+def test_keeps_breaks_and_marks():
+    speech = tags.Speak([tags.Break(strength="strong"), tags.Mark("m")])
+
+    assert minify(speech) is speech
+
+
+def test_collapses_whitespace():
+    assert minify(tags.S(RawText("a  \n b\tc"))).to_string() == "<s>a b c</s>"
+
+
+@pytest.mark.parametrize("merge_breaks,expected", [("max", "1.5s"), ("sum", "2000ms")])
+def test_merges_adjacent_breaks(merge_breaks, expected):
+    ssml_tags = [tags.Break(time="500ms"), tags.Break(time="1.5s"), RawText("Hello"), tags.Break(time="1s")]
+
+    result = list(minify_tags(ssml_tags, merge_breaks=merge_breaks))
+
+    assert _render(result) == f'<break time="{expected}"></break>Hello<break time="1s"></break>'
+
+
+def test_merges_breaks_across_removed_tags():
+    ssml_tags = [tags.Break(time="500ms"), tags.P(tags.S(RawText(""))), tags.Break(time="750ms")]
+
+    assert _render(minify_tags(ssml_tags)) == '<break time="750ms"></break>'
+
+
+def test_does_not_merge_breaks_by_strength():
+    ssml_tags = [tags.Break(strength="weak"), tags.Break(time="500ms")]
+
+    assert _render(minify_tags(ssml_tags)) == _render(ssml_tags)
+
+
+def test_unchanged_tags_are_returned_as_they_are():
+    tag = tags.P([tags.S(RawText("a")), tags.S(RawText("b"))])
+
+    assert minify(tag) is tag
+    assert next(minify_tags([tag])) is tag
+
+
+def test_stats_count_saved_characters():
+    stats = MinifyStats()
+    ssml_tags = [tags.P(tags.S(RawText("Hello"))), tags.Break(time="1s"), tags.Break(time="1s")]
+
+    result = list(minify_tags(ssml_tags, stats))
+
+    assert stats.before == sum(map(len, ssml_tags))
+    assert stats.after == len(_render(result))
+    assert stats.saved == len("<s></s>") + len('<break time="1s"></break>')
+
+
+def test_is_lazy():
+    def ssml_tags():
+        yield RawText("a")
+        yield tags.Break(time="1s")
+        raise AssertionError("Read past the first break")
+
+    stream = minify_tags(ssml_tags())
+
+    assert next(stream).to_string() == "a"
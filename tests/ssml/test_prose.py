@@ -0,0 +1,42 @@
+import pytest
+from ssml import tags, RawText, parse, to_prose
+
+
+def test_paragraphs_and_sentences():
+    speech = tags.Speak([tags.P([tags.SText("One."), tags.SText("Two.")]), tags.PSText("Three.")])
+
+    assert to_prose(speech) == "One. Two.\n\nThree."
+
+
+@pytest.mark.parametrize("break_tag,expected", [
+    (tags.Break(time="100ms"), "a b"),
+    (tags.Break(time="500ms"), "a ... b"),
+    (tags.Break(time="1.5s"), "a\n\nb"),
+    (tags.Break(strength="none"), "a b"),
+    (tags.Break(strength="x-strong"), "a\n\nb"),
+])
+def test_breaks_become_pauses(break_tag, expected):
+    assert to_prose(tags.TagArray([RawText("a"), break_tag, RawText("b")])) == expected
+
+
+def test_reads_what_is_said():
+    speech = parse(
+        '<speak><phoneme alphabet="x-sampa" ph="gergeI">Gergely</phoneme> joined <sub alias="the W 3 C">W3C</sub> '
+        '<mark name="m"></mark><audio src="a.mp3"><desc>A chime</desc>chime</audio> '
+        '<prosody rate="slow"><emphasis level="strong">today</emphasis></prosody></speak>')
+
+    assert to_prose(speech) == "Gergely joined the W 3 C chime today"
+
+
+def test_collapses_whitespace_and_empty_paragraphs():
+    speech = tags.Speak([tags.P(RawText("  a \n  b ")), tags.P(RawText(" ")), tags.Break(time="2s")])
+
+    assert to_prose(speech) == "a b"
+
+
+def test_breaks_between_paragraphs_are_not_read_out():
+    speech = tags.Speak([
+        tags.Break(time="500ms"), tags.PSText("Tweet by @x:"), tags.Break(time="500ms"),
+        tags.PSText("Hello"), tags.Break(strength="medium")])
+
+    assert to_prose(speech) == "Tweet by @x:\n\nHello"
@@ -0,0 +1,88 @@
+from mock import Mock
+from pathlib import Path
+import pytest
+from ssml import tags, RawText, parse
+from email_exporter.inbox import InboxItem
+from email_exporter.parsers.emitter_parser import EmitterParser
+from email_exporter.parsers.general_parser import GeneralParser
+from email_exporter.parsers.substack_parser import SubstackItemEmitter
+from email_exporter.parsers.tc_parser import TcItemEmitter
+from email_exporter.pronunciation_provider import Pronunciation, PronunciationGuide
+
+FIXTURES = Path(__file__).parent.parent / "parsers" / "fixtures"
+
+TAGS = [
+    tags.Speak([tags.PSText("Hello world"), RawText(" between "), tags.Break(time="1s")]),
+    tags.Break(strength="strong"),
+    tags.Mark("here"),
+    tags.SayAsCurrency(RawText("$42.01"), language="en-US"),
+    tags.SayAsTelephone(RawText("+1-800-555-0199"), format="1"),
+    tags.SayAsTelephone(RawText("123"), format="1", style="formal"),
+    tags.SayAsDate(RawText("1960-09-10"), format="yyyymmdd", detail="1"),
+    tags.SayAsCharacters(RawText("can")),
+    tags.SayAsTime(RawText("2:30pm"), format="hms12"),
+    tags.Audio("https://example.com/a.mp3?a=1&b=2", description="A sound", alt="beep", clip_begin="1s"),
+    tags.Sub(RawText("W3C"), alias="World Wide Web Consortium"),
+    tags.Prosody(RawText("slowly"), rate="slow", pitch="+2%", volume="+6dB"),
+    tags.Emphasis(RawText("really"), level="strong"),
+    tags.Par([tags.Media(tags.Speak(RawText("Hi")), xml_id="q", begin="0.5s")]),
+    tags.Seq([tags.Media(tags.Audio("https://example.com/b.mp3"), fade_in_dur="2s")]),
+    tags.Phoneme(RawText("Gergely"), alphabet="x-sampa", ph="gergeI"),
+    tags.Lang(RawText("Bonjour"), lang="fr-FR"),
+    tags.SsmlTag(None, "voice", {"gender": "female"}),
+    tags.TagArray([RawText("Top level "), tags.SText("sentence"), RawText(" and text")]),
+    tags.S(RawText("AT&T, a < b, a > b, &amp; stays, ]]> too, “quotes” and émoji 👋")),
+    tags.P(RawText("  \n  whitespace  \t ")),
+]
+
+
+@pytest.mark.parametrize("tag", TAGS, ids=lambda tag: tag.to_string()[:30])
+def test_round_trips_what_tags_emit(tag):
+    parsed = parse(tag.to_string())
+
+    assert parsed.to_string() == tag.to_string()
+    assert parsed.byte_length() == tag.byte_length()
+
+
+def test_google_style_is_read_back_as_its_argument():
+    tag = tags.SayAsTelephone(RawText("123"), format="1", style="formal")
+
+    assert parse(tag.to_string()).tag_args == tag.tag_args == {
+        "interpret-as": "telephone", "format": "1", "google:style": "formal"}
+
+
+def test_single_tag_is_returned_as_the_tag():
+    parsed = parse('<speak><p>Hi</p><break time="1s"></break></speak>')
+
+    assert parsed.is_tag("speak")
+    assert [tag.to_string() for tag in parsed.content.content] == ["<p>Hi</p>", '<break time="1s"></break>']
+
+
+def test_empty_string_is_an_empty_array():
+    assert parse("").to_string() == ""
+
+
+def test_invalid_ssml_raises():
+    with pytest.raises(ValueError, match="Invalid SSML"):
+        parse("<speak><p>unclosed</speak>")
+
+
+@pytest.mark.parametrize("parser,fixture", [
+    (lambda: EmitterParser(Mock(), SubstackItemEmitter()), "substack"),
+    (lambda: EmitterParser(Mock(), TcItemEmitter()), "tc"),
+    (lambda: GeneralParser(Mock()), "general"),
+])
+def test_round_trips_parsed_emails(parser, fixture):
+    html = (FIXTURES / f"{fixture}.html").read_text()
+    inbox_item = InboxItem("Title", "date", html, "", None, ("to@example.com", "from@example.com"))
+
+    for chunk in parser().parse(inbox_item).ssml:
+        assert parse(chunk).to_string() == chunk
+
+
+def test_stored_chunks_can_be_pronounced_again():
+    guide = PronunciationGuide([Pronunciation("hello", "h@loU")])
+
+    result = guide.force_pronunciation(parse("<speak><p>Hello there</p></speak>"))
+
+    assert result.to_string() == '<speak><p><phoneme alphabet="x-sampa" ph="h@loU">Hello</phoneme> there</p></speak>'
@@ -1,3 +1,5 @@
+import re
+import pytest
 from ssml import tags, RawText
 
 
@@ -35,3 +37,69 @@ def test_replace_ignore_case():
 
     assert replaced is not None
     assert replaced.to_string() == '<speak><p><s>Hello <emphasis level="strong">world</emphasis>!</s></p>Hello? <emphasis level="strong">World</emphasis>?<emphasis level="strong">world</emphasis><emphasis level="strong">world</emphasis></speak>'       # noqa: E501
+
+
+def test_replace_re():
+    speech = tags.Speak([
+        tags.P(tags.S(RawText("Hello world!"))),
+        RawText("World?worldworld"),
+        tags.Break(time="1s"),
+    ])
+
+    replaced = speech.replace_re(
+        re.compile("(?i:world)|hello"), lambda m: tags.Emphasis(RawText(m.group()), level="strong"))
+
+    assert replaced.to_string() == '<speak><p><s>Hello <emphasis level="strong">world</emphasis>!</s></p><emphasis level="strong">World</emphasis>?<emphasis level="strong">world</emphasis><emphasis level="strong">world</emphasis><break time="1s"></break></speak>'       # noqa: E501
+
+
+def test_replace_re_without_match_keeps_the_tree():
+    speech = tags.Speak([tags.P(tags.S(RawText("Hello world!")))])
+
+    assert speech.replace_re(re.compile("nothing"), lambda m: RawText("")) is speech
+
+
+def test_tags_are_immutable():
+    tag = tags.P(RawText("Hello"))
+
+    with pytest.raises(AttributeError):
+        tag._tag_name = "s"
+    with pytest.raises(AttributeError):
+        tag.anything = 1
+
+
+def test_to_string_is_rendered_once():
+    speech = tags.Speak([tags.PText("Hello"), tags.Break(time="1s")])
+
+    assert speech.to_string() is speech.to_string()
+    assert len(speech) == len(speech.to_string()) == len("<speak><p>Hello</p><break time=\"1s\"></break></speak>")
+
+
+def test_empty_tags_are_truthy_and_keep_their_closing_tag():
+    assert RawText("")
+    assert len(RawText("")) == 0
+    assert tags.Break(time="1s").to_string() == '<break time="1s"></break>'
+
+
+def test_tag_args_are_copied():
+    args = {"level": "strong"}
+    tag = tags.SsmlTag(RawText("Hi"), "emphasis", args)
+    args["level"] = "none"
+
+    assert tag.to_string() == '<emphasis level="strong">Hi</emphasis>'
+
+
+def test_replace_text_shares_unchanged_subtrees():
+    unchanged = tags.P(tags.S(RawText("Nothing here")))
+    speech = tags.Speak([unchanged, tags.PText("Hello world")])
+
+    replaced = speech.replace_text("world", lambda t: tags.Emphasis(RawText(t), level="strong"))
+
+    assert speech.replace_text("nothing", lambda t: RawText("")) is speech
+    assert replaced._content.content[0] is unchanged
+    assert replaced.to_string() == \
+        '<speak><p><s>Nothing here</s></p><p>Hello <emphasis level="strong">world</emphasis></p></speak>'
+
+
+def test_byte_length_counts_utf8():
+    assert tags.PText("Hello").byte_length() == len("<p>Hello</p>")
+    assert tags.PText("Привет 👋").byte_length() == len("<p>Привет 👋</p>".encode())